@@ -1,24 +1,24 @@
-from typing import Dict, Any
-from groq import Groq
-import os
+from typing import Dict, Any, Iterator
+from agents.llm_client import get_client, get_async_client
+from agents.streaming import stream_events
 
 class DirectAgent:
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        self.client = Groq(api_key=api_key)
+        self.client = get_client()
         self.model = "qwen-qwq-32b"
 
+    def _request(self, user_input: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a helpful AI assistant focused on direct and concise responses."},
+                {"role": "user", "content": user_input}
+            ]
+        }
+
     def process(self, user_input: str) -> Dict[str, Any]:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant focused on direct and concise responses."},
-                    {"role": "user", "content": user_input}
-                ]
-            )
+            response = self.client.chat.completions.create(**self._request(user_input))
             
             return {
                 "success": True,
@@ -30,4 +30,32 @@ class DirectAgent:
                 "success": False,
                 "response": f"Error in DirectAgent: {str(e)}",
                 "agent": "direct_agent"
-            } 
\ No newline at end of file
+            }
+
+    def process_stream(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        try:
+            yield from stream_events(self.client, self._request(user_input),
+                                     {"success": True, "agent": "direct_agent"})
+        except Exception as e:
+            yield {
+                "type": "done",
+                "success": False,
+                "response": f"Error in DirectAgent: {str(e)}",
+                "agent": "direct_agent"
+            }
+
+    async def aprocess(self, user_input: str) -> Dict[str, Any]:
+        try:
+            response = await get_async_client().chat.completions.create(**self._request(user_input))
+            
+            return {
+                "success": True,
+                "response": response.choices[0].message.content,
+                "agent": "direct_agent"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "response": f"Error in DirectAgent: {str(e)}",
+                "agent": "direct_agent"
+            }
@@ -1,40 +1,129 @@
-from typing import Dict, Any
-from groq import Groq
+from typing import Dict, Any, Iterator, List, Tuple
+import asyncio
 import os
+import threading
+from agents.llm_client import get_client, get_async_client
+from agents.streaming import stream_events
 
 class KnowledgeAgent:
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        self.client = Groq(api_key=api_key)
+    def __init__(self, index=None):
+        self.client = get_client()
         self.model = "qwen-qwq-32b"
-        self.knowledge_base = {}
+        # A KnowledgeIndexView over the RAG agent's index; None answers without retrieved context
+        self.index = index
+        self.top_k = int(os.getenv("KNOWLEDGE_TOP_K", "6"))
+        self.context_token_budget = int(os.getenv("KNOWLEDGE_CONTEXT_TOKENS", "400"))
+        # aprocess() only: past this the answer goes ahead ungrounded rather than waiting on
+        # retrieval; generous, since a cold or large index is routinely slower than a warm one
+        self.retrieval_timeout = float(os.getenv("KNOWLEDGE_RETRIEVAL_TIMEOUT", "5"))
+        self.stats = {"retrievals": 0, "timeouts": 0, "without_context": 0}
+        self._stats_lock = threading.Lock()
 
-    def _get_relevant_context(self, query: str) -> str:
-        return "Context: Relevant information from the knowledge base."
+    def _count(self, stat: str):
+        # Retrieval runs on worker threads for aprocess() and for TeamAgent's batches
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _get_relevant_context(self, query: str, chunks: List[Dict] = None) -> List[Dict]:
+        """The best passages for query from the shared index, packed into the context token budget."""
+        if self.index is None:
+            return []
+        if chunks is None:
+            chunks = self.index.search(query, top_k=self.top_k)
+        self._count("retrievals")
+        return self.index.pack(chunks, self.context_token_budget)
+
+    def _base_request(self, user_input: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a knowledgeable AI assistant. Answer accurately and to the point."},
+                {"role": "user", "content": user_input}
+            ]
+        }
+
+    def _with_context(self, request: Dict[str, Any], context: List[Dict]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Insert the packed passages after the system prompt; returns (request kwargs, result fields)."""
+        if context:
+            passages = "\n".join(f"{i + 1}. {chunk['line']}" for i, chunk in enumerate(context))
+            request["messages"].insert(1, {
+                "role": "system",
+                "content": f"Reference passages (use them where relevant; say so if they do not cover the question):\n{passages}"
+            })
+        else:
+            self._count("without_context")
+        return request, {"agent": "knowledge_agent", "knowledge_chunks_used": len(context)}
+
+    def _request(self, user_input: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        return self._with_context(self._base_request(user_input), self._get_relevant_context(user_input))
+
+    def _prepare_batch(self, queries: List[str]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        if self.index is None:
+            return [self._with_context(self._base_request(query), []) for query in queries]
+        batch = self.index.search_batch(queries, top_k=self.top_k)
+        return [self._with_context(self._base_request(query), self._get_relevant_context(query, chunks))
+                for query, chunks in zip(queries, batch)]
+
+    def _complete(self, request: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = self.client.chat.completions.create(**request)
+            return dict(result, success=True, response=response.choices[0].message.content)
+        except Exception as e:
+            return {
+                "success": False,
+                "response": f"Error in KnowledgeAgent: {str(e)}",
+                "agent": "knowledge_agent"
+            }
 
     def process(self, user_input: str) -> Dict[str, Any]:
         try:
-            context = self._get_relevant_context(user_input)
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a knowledgeable AI assistant with access to a vast knowledge base."},
-                    {"role": "system", "content": f"Context: {context}"},
-                    {"role": "user", "content": user_input}
-                ]
-            )
-            
+            request, result = self._request(user_input)
+        except Exception as e:
             return {
-                "success": True,
-                "response": response.choices[0].message.content,
+                "success": False,
+                "response": f"Error in KnowledgeAgent: {str(e)}",
+                "agent": "knowledge_agent"
+            }
+        return self._complete(request, result)
+
+    def process_stream(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        try:
+            request, result = self._request(user_input)
+            yield from stream_events(self.client, request, dict(result, success=True))
+        except Exception as e:
+            yield {
+                "type": "done",
+                "success": False,
+                "response": f"Error in KnowledgeAgent: {str(e)}",
                 "agent": "knowledge_agent"
             }
+
+    async def aprocess(self, user_input: str) -> Dict[str, Any]:
+        try:
+            retrieval = None
+            if self.index is not None:
+                retrieval = asyncio.ensure_future(asyncio.to_thread(self._get_relevant_context, user_input))
+            request = self._base_request(user_input)
+            context = []
+            if retrieval is not None:
+                try:
+                    context = await asyncio.wait_for(retrieval, self.retrieval_timeout)
+                except asyncio.TimeoutError:
+                    self._count("timeouts")
+                    print(f"Knowledge retrieval exceeded {self.retrieval_timeout}s; answering without reference passages")
+            request, result = self._with_context(request, context)
+
+            response = await get_async_client().chat.completions.create(**request)
+
+            return dict(result, success=True, response=response.choices[0].message.content)
         except Exception as e:
             return {
                 "success": False,
                 "response": f"Error in KnowledgeAgent: {str(e)}",
                 "agent": "knowledge_agent"
-            } 
\ No newline at end of file
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return dict(stats, shared_index=self.index is not None, context_token_budget=self.context_token_budget)
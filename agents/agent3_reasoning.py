@@ -1,47 +1,109 @@
-from typing import Dict, Any, List
-from groq import Groq
+from typing import Dict, Any, List, Iterator, Tuple, Callable
 import os
+from agents.history import ConversationHistory, HistoryManager
+from agents.llm_client import get_client, get_async_client
+from agents.streaming import stream_events
 
 class ReasoningAgent:
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        self.client = Groq(api_key=api_key)
+        self.client = get_client()
         self.model = "qwen-qwq-32b"
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history = ConversationHistory()
         self.max_history = 10
+        self.summary_model = os.getenv("REASONING_SUMMARY_MODEL", self.model)
+        self.history_manager = HistoryManager(self._summarize, max_turns=self.max_history)
 
-    def _update_history(self, user_input: str, response: str):
-        self.conversation_history.append({
-            "user": user_input,
-            "assistant": response
-        })
+    def _summarize(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        """Fold turns into the running summary; called off the request path by the history manager."""
+        transcript = "\n".join(f"User: {turn['user']}\nAssistant: {turn['assistant']}" for turn in turns)
+        response = self.client.chat.completions.create(
+            model=self.summary_model,
+            messages=[
+                {"role": "system", "content": f"Update the summary of a conversation with the new exchanges. Keep facts, decisions, names and open questions; drop reasoning steps. Reply with the summary only, under {self.history_manager.summary_budget} tokens."},
+                {"role": "user", "content": f"Summary so far:\n{summary or '(none)'}\n\nNew exchanges:\n{transcript}"}
+            ]
+        )
+        return response.choices[0].message.content.strip()
+
+    def _update_history(self, user_input: str, response: str, history: ConversationHistory = None):
+        if history is None:
+            history = self.conversation_history
         
-        if len(self.conversation_history) > self.max_history:
-            self.conversation_history = self.conversation_history[-self.max_history:]
+        self.history_manager.append(history, user_input, response)
 
-    def process(self, user_input: str) -> Dict[str, Any]:
+    def _request(self, user_input: str, history: ConversationHistory) -> Dict[str, Any]:
+        messages = [
+            {"role": "system", "content": "You are an AI assistant with memory and reasoning capabilities. Use the conversation history to provide contextual and well-reasoned responses."}
+        ]
+        
+        messages.extend(self.history_manager.messages(history))
+        messages.append({"role": "user", "content": user_input})
+        return {"model": self.model, "messages": messages}
+
+    def process(self, user_input: str, history: ConversationHistory = None) -> Dict[str, Any]:
+        """history is the caller's per-session ConversationHistory; it defaults to this agent's own."""
+        if history is None:
+            history = self.conversation_history
+        
         try:
-            messages = [
-                {"role": "system", "content": "You are an AI assistant with memory and reasoning capabilities. Use the conversation history to provide contextual and well-reasoned responses."}
-            ]
-            
-            for interaction in self.conversation_history:
-                messages.extend([
-                    {"role": "user", "content": interaction["user"]},
-                    {"role": "assistant", "content": interaction["assistant"]}
-                ])
+            response = self.client.chat.completions.create(**self._request(user_input, history))
             
-            messages.append({"role": "user", "content": user_input})
+            assistant_response = response.choices[0].message.content
+            self._update_history(user_input, assistant_response, history)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages
-            )
+            return {
+                "success": True,
+                "response": assistant_response,
+                "agent": "reasoning_agent"
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "response": f"Error in ReasoningAgent: {str(e)}",
+                "agent": "reasoning_agent"
+            }
+
+    async def aspeculate(self, user_input: str, history: ConversationHistory = None) -> Tuple[Dict[str, Any], Callable[[], None]]:
+        """Like aprocess(), but returns (result, commit) with the history update deferred to commit()."""
+        if history is None:
+            history = self.conversation_history
+        
+        response = await get_async_client().chat.completions.create(**self._request(user_input, history))
+        assistant_response = response.choices[0].message.content
+        
+        return {
+            "success": True,
+            "response": assistant_response,
+            "agent": "reasoning_agent"
+        }, lambda: self._update_history(user_input, assistant_response, history)
+
+    def process_stream(self, user_input: str, history: ConversationHistory = None) -> Iterator[Dict[str, Any]]:
+        if history is None:
+            history = self.conversation_history
+        
+        try:
+            for event in stream_events(self.client, self._request(user_input, history),
+                                       {"success": True, "agent": "reasoning_agent"}):
+                if event["type"] == "done":
+                    self._update_history(user_input, event["response"], history)
+                yield event
+        except Exception as e:
+            yield {
+                "type": "done",
+                "success": False,
+                "response": f"Error in ReasoningAgent: {str(e)}",
+                "agent": "reasoning_agent"
+            }
+
+    async def aprocess(self, user_input: str, history: ConversationHistory = None) -> Dict[str, Any]:
+        if history is None:
+            history = self.conversation_history
+        
+        try:
+            response = await get_async_client().chat.completions.create(**self._request(user_input, history))
             
             assistant_response = response.choices[0].message.content
-            self._update_history(user_input, assistant_response)
+            self._update_history(user_input, assistant_response, history)
             
             return {
                 "success": True,
@@ -53,4 +115,4 @@ class ReasoningAgent:
                 "success": False,
                 "response": f"Error in ReasoningAgent: {str(e)}",
                 "agent": "reasoning_agent"
-            } 
\ No newline at end of file
+            }
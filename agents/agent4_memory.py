@@ -1,28 +1,63 @@
-from typing import Dict, Any, List
-from groq import Groq
+from typing import Dict, Any, List, Iterator, Tuple, Callable
+from agents.llm_client import get_client, get_async_client
 import os
+import asyncio
+import heapq
 import pickle
+import threading
 import numpy as np
+import time
 from datetime import datetime, timedelta
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from agents.columnar import ColumnarStore, TEXT, TIME, FLOAT, INT, CATEGORY
+from agents.vector_index import IncrementalTfidfIndex
+from agents.retrieval import select_top_k
+from agents.storage import RecordLog, content_hash
+from agents.streaming import stream_events
+from agents.tracing import tracer, traced
+
+MEMORY_SCHEMA = {
+    'content': TEXT,
+    'context': TEXT,
+    'category': CATEGORY,
+    'timestamp': TIME,
+    'importance': FLOAT,
+    'access_count': INT,
+    'last_accessed': TIME,
+    'retention_score': FLOAT
+}
+
+DAY_SECONDS = 86400
 
 class MemoryAgent:
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        self.client = Groq(api_key=api_key)
+        self.client = get_client()
         self.model = "qwen-qwq-32b"
         
-        self.memory_store = []
-        self.vectorizer = TfidfVectorizer(
-            max_features=2000,
-            stop_words='english',
-            ngram_range=(1, 2)
-        )
-        self.memory_vectors = None
+        self.memory_store = self._new_store()
+        self.memory_index = IncrementalTfidfIndex(ngram_range=(1, 2))
         self.memory_file = "memory_store_advanced.pkl"
+        memory_dir = os.getenv("MEMORY_STORE_DIR", "memory_store")
+        self.memory_log = RecordLog(memory_dir)
+        self.compact_every = int(os.getenv("MEMORY_COMPACT_EVERY", "500"))
+        self._lock = threading.RLock()
+        
+        # Hot tier: memory_store/memory_index, trimmed back to hot_limit once it passes the
+        # high-water mark. Evicted memories move to the warm tier, a second record log that is
+        # loaded and searched on demand and capped at warm_limit.
+        self.hot_limit = int(os.getenv("MEMORY_HOT_LIMIT", "100"))
+        self.hot_high_water = int(os.getenv("MEMORY_HOT_HIGH_WATER",
+                                            str(self.hot_limit + max(10, self.hot_limit // 10))))
+        self.warm_limit = int(os.getenv("MEMORY_WARM_LIMIT", "10000"))
+        # "fallback" searches the warm tier when the hot tier has fewer than top_k matches
+        self.warm_search = os.getenv("MEMORY_WARM_SEARCH", "fallback").lower()
+        self.background_compaction = os.getenv("MEMORY_BACKGROUND_COMPACTION", "on").lower() != "off"
+        self.warm_log = RecordLog(os.getenv("MEMORY_WARM_DIR", os.path.join(memory_dir, "warm")))
+        self.warm_store = None
+        self.warm_index = None
+        self._warm_lock = threading.RLock()
+        self._compaction_thread = None
+        # Min-heap of (retention key, row) over the hot tier; entries superseded by an access are skipped on pop
+        self._retention_heap = []
         
         # Simple categories
         self.memory_categories = {
@@ -33,27 +68,71 @@ class MemoryAgent:
         }
         
         self._load_memory()
+    
+    @staticmethod
+    def _new_store(records: List[Dict] = ()) -> ColumnarStore:
+        store = ColumnarStore(MEMORY_SCHEMA, defaults={'category': 'general', 'importance': 0.5})
+        store.extend(records)
+        return store
+        
+    def _load_tier(self, record_log: RecordLog) -> Tuple[ColumnarStore, IncrementalTfidfIndex]:
+        snapshot, appended = record_log.load_records()
+        arrays = record_log.load_arrays(mmap=True)
+        meta = record_log.load_meta()
+        store = self._new_store(snapshot + appended)
+        index = IncrementalTfidfIndex(ngram_range=(1, 2))
+        
+        snapshot_hash = content_hash(mem['content'] for mem in snapshot)
+        index_state = {'doc_freq', 'data', 'indices', 'indptr'}
+        if index_state <= arrays.keys() and meta.get('content_hash') == snapshot_hash:
+            # Snapshot index is reused as-is; only the log tail is hashed
+            index.load_state(arrays)
+            index.add_many([mem['content'] for mem in appended])
+        else:
+            index.rebuild(store.column('content'))
+        return store, index
         
     def _load_memory(self):
         try:
-            if os.path.exists(self.memory_file):
+            if self.memory_log.exists():
+                self.memory_store, self.memory_index = self._load_tier(self.memory_log)
+            elif os.path.exists(self.memory_file):
                 with open(self.memory_file, 'rb') as f:
                     data = pickle.load(f)
-                    self.memory_store = data.get('memories', [])
-                    if self.memory_store:
-                        texts = [mem['content'] for mem in self.memory_store]
-                        self.memory_vectors = self.vectorizer.fit_transform(texts)
-                        print(f"Loaded {len(self.memory_store)} memories")
+                self.memory_store = self._new_store(data.get('memories', []))
+                self.memory_index.rebuild(self.memory_store.column('content'))
+                self._save_memory()
+                print(f"Migrated {self.memory_file} to {self.memory_log.directory}")
+            
+            if self.memory_store:
+                print(f"Loaded {len(self.memory_store)} memories")
         except Exception as e:
             print(f"Memory loading failed: {e}")
-            self.memory_store = []
-            self.memory_vectors = None
+            self.memory_store = self._new_store()
+            self.memory_index.rebuild([])
+        self._reset_retention_heap()
+    
+    @staticmethod
+    def _save_tier(record_log: RecordLog, store: ColumnarStore, index: IncrementalTfidfIndex):
+        """Compact a tier's record log into a snapshot holding the records and the index arrays."""
+        record_log.compact(
+            store.records(),
+            arrays=index.state(),
+            meta={'content_hash': content_hash(store.column('content'))}
+        )
     
     def _save_memory(self):
+        with self._lock:
+            try:
+                self._save_tier(self.memory_log, self.memory_store, self.memory_index)
+            except Exception as e:
+                print(f"Memory saving failed: {e}")
+    
+    def _append_memory(self, memory_entry: Dict):
         try:
-            data = {'memories': self.memory_store}
-            with open(self.memory_file, 'wb') as f:
-                pickle.dump(data, f)
+            self.memory_log.append(memory_entry)
+            if self.memory_log.log_records >= self.compact_every:
+                self._save_memory()
         except Exception as e:
             print(f"Memory saving failed: {e}")
     
@@ -84,90 +163,139 @@ class MemoryAgent:
         return min(importance, 1.0)
     
     def _store_memory(self, content: str, context: str = "", importance: float = None):
-        if importance is None:
-            importance = self._calculate_importance(content, context)
-        
-        category = self._categorize_memory(content)
-        
-        memory_entry = {
-            'content': content,
-            'context': context,
-            'category': category,
-            'timestamp': datetime.now().isoformat(),
-            'importance': importance,
-            'access_count': 0,
-            'last_accessed': None
-        }
-        
-        self.memory_store.append(memory_entry)
-        
-        texts = [mem['content'] for mem in self.memory_store]
-        self.memory_vectors = self.vectorizer.fit_transform(texts)
-        
-        self._save_memory()
-        print(f"Stored memory: {content[:50]}...")
+        with self._lock:
+            if importance is None:
+                importance = self._calculate_importance(content, context)
+            
+            category = self._categorize_memory(content)
+            
+            memory_entry = {
+                'content': content,
+                'context': context,
+                'category': category,
+                'timestamp': datetime.now().isoformat(),
+                'importance': importance,
+                'access_count': 0,
+                'last_accessed': None
+            }
+            
+            self.memory_store.append(memory_entry)
+            self.memory_index.add(content)
+            self._push_retention([len(self.memory_store) - 1])
+            
+            self._append_memory(memory_entry)
+            print(f"Stored memory: {content[:50]}...")
     
     def _retrieve_relevant_memories(self, query: str, top_k: int = 5) -> List[Dict]:
-        if not self.memory_store or self.memory_vectors is None:
-            return []
+        return self._retrieve_relevant_memories_batch([query], top_k)[0]
+
+    @traced("memory.retrieve", lambda results: {"queries": len(results), "memories": sum(map(len, results))})
+    def _retrieve_relevant_memories_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        """Retrieve for many queries with one vectorizer transform and one similarity matrix per tier."""
+        with self._lock:
+            results = self._search_tier(self.memory_store, self.memory_index, queries, top_k)
+            for relevant_memories in results:
+                self._push_retention([mem['index'] for mem in relevant_memories])
+        
+        if self.warm_search == 'off':
+            return results
+        pending = [i for i, relevant_memories in enumerate(results)
+                   if self.warm_search == 'always' or len(relevant_memories) < top_k]
+        if pending:
+            with self._warm_lock:
+                warm_store, warm_index = self._warm_tier()
+                if warm_store is None:
+                    return results
+                warm_results = self._search_tier(warm_store, warm_index, [queries[i] for i in pending], top_k)
+            for i, warm_memories in zip(pending, warm_results):
+                for mem in warm_memories:
+                    mem['tier'] = 'warm'
+                results[i] = sorted(results[i] + warm_memories, key=lambda mem: mem['similarity'], reverse=True)[:top_k]
+        return results
+    
+    def _search_tier(self, store: ColumnarStore, index: IncrementalTfidfIndex, queries: List[str], top_k: int) -> List[List[Dict]]:
+        if not store or len(index) == 0:
+            return [[] for _ in queries]
         
         try:
-            query_vector = self.vectorizer.transform([query])
-            similarities = cosine_similarity(query_vector, self.memory_vectors)[0]
-            similarity_indices = np.argsort(similarities)[::-1]
+            with tracer.span("memory.vectorize", queries=len(queries)):
+                similarity_matrix = index.similarities_batch(queries)
             
-            relevant_memories = []
-            for idx in similarity_indices[:top_k]:
-                similarity_score = similarities[idx]
+            results = []
+            for similarities in similarity_matrix:
+                similarity_indices, scores = select_top_k(similarities, top_k, threshold=0.1)
                 
-                if similarity_score > 0.1:
-                    memory = self.memory_store[idx].copy()
+                relevant_memories = []
+                for idx, similarity_score in zip(similarity_indices, scores):
+                    memory = store[idx]
                     memory['similarity'] = similarity_score
                     memory['index'] = idx
                     relevant_memories.append(memory)
+                
+                store.increment('access_count', similarity_indices)
+                store.assign('last_accessed', similarity_indices, time.time())
+                results.append(relevant_memories)
             
-            for mem in relevant_memories:
-                idx = mem['index']
-                self.memory_store[idx]['access_count'] += 1
-                self.memory_store[idx]['last_accessed'] = datetime.now().isoformat()
-            
-            return relevant_memories
-            
+            return results
+        
         except Exception as e:
             print(f"Memory retrieval failed: {e}")
-            return []
+            return [[] for _ in queries]
 
-    def process(self, user_input: str) -> Dict[str, Any]:
-        try:
+    def _should_store(self, user_input: str) -> bool:
+        memory_triggers = ['remember', 'my name', 'i am', 'i live', 'i work', 'i like']
+        return any(trigger in user_input.lower() for trigger in memory_triggers)
+
+    def _prepare(self, user_input: str, store: bool = True, relevant_memories: List[Dict] = None) -> Tuple[Dict[str, Any], List[Dict]]:
+        """Retrieve and store memories for this turn; returns (request kwargs, memories used)."""
+        if relevant_memories is None:
             relevant_memories = self._retrieve_relevant_memories(user_input)
-            
-            memory_context = ""
-            if relevant_memories:
-                memory_context = "\nRelevant memories:\n"
-                for i, mem in enumerate(relevant_memories):
-                    memory_context += f"{i+1}. {mem['content']}\n"
-            
-            # Check for memory storage requests
-            memory_triggers = ['remember', 'my name', 'i am', 'i live', 'i work', 'i like']
-            should_store = any(trigger in user_input.lower() for trigger in memory_triggers)
-            
-            if should_store:
-                self._store_memory(user_input, "user_statement")
-            
-            system_prompt = f"""You are a personal memory assistant for Mann Gupta in Bangalore, India.
+        
+        memory_context = ""
+        if relevant_memories:
+            memory_context = "\nRelevant memories:\n"
+            for i, mem in enumerate(relevant_memories):
+                memory_context += f"{i+1}. {mem['content']}\n"
+        
+        # Check for memory storage requests
+        if store and self._should_store(user_input):
+            self._store_memory(user_input, "user_statement")
+        
+        system_prompt = f"""You are a personal memory assistant for Mann Gupta in Bangalore, India.
 {memory_context}
 Respond naturally about stored information. If storing new information, confirm what you've learned.
 User input: {user_input}
 """
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "system", "content": system_prompt}],
-                temperature=0.7,
-                max_tokens=800
-            )
+        request = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system_prompt}],
+            "temperature": 0.7,
+            "max_tokens": 800
+        }
+        return request, relevant_memories
+
+    def _prepare_batch(self, queries: List[str]) -> List[Tuple[Dict[str, Any], List[Dict]]]:
+        batch = self._retrieve_relevant_memories_batch(queries)
+        return [self._prepare(query, relevant_memories=memories) for query, memories in zip(queries, batch)]
+
+    def _complete(self, request: Dict[str, Any], relevant_memories: List[Dict]) -> Dict[str, Any]:
+        """LLM half of process(), for requests built by _prepare()/_prepare_batch()."""
+        try:
+            response = self.client.chat.completions.create(**request)
+            return {
+                "response": response.choices[0].message.content,
+                "agent": "memory",
+                "memories_used": len(relevant_memories)
+            }
+        except Exception as e:
+            return {"response": f"Memory processing failed: {str(e)}", "agent": "memory", "error": True}
+
+    def process(self, user_input: str) -> Dict[str, Any]:
+        try:
+            request, relevant_memories = self._prepare(user_input)
+            response = self.client.chat.completions.create(**request)
             
-            if len(self.memory_store) > 100:
-                self._clean_old_memories()
+            self._maybe_compact()
             
             return {
                 "response": response.choices[0].message.content,
@@ -178,43 +306,204 @@ User input: {user_input}
         except Exception as e:
             return {"response": f"Memory processing failed: {str(e)}", "agent": "memory", "error": True}
 
-    def _clean_old_memories(self):
-        if len(self.memory_store) <= 100:
-            return
+    async def aprocess(self, user_input: str) -> Dict[str, Any]:
+        try:
+            # Retrieval and storage are CPU/disk bound, so they run off the event loop
+            request, relevant_memories = await asyncio.to_thread(self._prepare, user_input)
+            response = await get_async_client().chat.completions.create(**request)
+            
+            self._maybe_compact()
+            
+            return {
+                "response": response.choices[0].message.content,
+                "agent": "memory",
+                "memories_used": len(relevant_memories)
+            }
+            
+        except Exception as e:
+            return {"response": f"Memory processing failed: {str(e)}", "agent": "memory", "error": True}
+
+    async def aspeculate(self, user_input: str) -> Tuple[Dict[str, Any], Callable[[], None]]:
+        """Like aprocess(), but returns (result, commit) with memory storage deferred to commit()."""
+        def commit():
+            if self._should_store(user_input):
+                self._store_memory(user_input, "user_statement")
+            self._maybe_compact()
+        
+        request, relevant_memories = await asyncio.to_thread(self._prepare, user_input, False)
+        response = await get_async_client().chat.completions.create(**request)
         
-        for memory in self.memory_store:
-            age_days = (datetime.now() - datetime.fromisoformat(memory['timestamp'])).days
-            access_score = memory.get('access_count', 0) * 0.1
-            importance_score = memory.get('importance', 0.5)
-            recency_score = max(0, 1 - age_days / 365)
+        return {
+            "response": response.choices[0].message.content,
+            "agent": "memory",
+            "memories_used": len(relevant_memories)
+        }, commit
+
+    def process_stream(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        try:
+            request, relevant_memories = self._prepare(user_input)
+            yield from stream_events(self.client, request,
+                                     {"agent": "memory", "memories_used": len(relevant_memories)})
             
-            memory['retention_score'] = (importance_score * 0.5 + 
-                                       access_score * 0.3 + 
-                                       recency_score * 0.2)
+            self._maybe_compact()
+        except Exception as e:
+            yield {"type": "done", "response": f"Memory processing failed: {str(e)}", "agent": "memory", "error": True}
+
+    @staticmethod
+    def _retention_scores(store: ColumnarStore, rows=slice(None)) -> np.ndarray:
+        age_days = np.floor((time.time() - store.column('timestamp')[rows]) / DAY_SECONDS)
+        access_score = store.column('access_count')[rows] * 0.1
+        importance_score = np.nan_to_num(store.column('importance')[rows], nan=0.5)
+        recency_score = np.maximum(0, 1 - age_days / 365)
+        
+        return (importance_score * 0.5 +
+                access_score * 0.3 +
+                recency_score * 0.2)
+    
+    @staticmethod
+    def _retention_keys(store: ColumnarStore, rows=slice(None)) -> np.ndarray:
+        """Retention score with recency measured from the epoch rather than from now.
         
-        self.memory_store.sort(key=lambda x: x['retention_score'], reverse=True)
-        self.memory_store = self.memory_store[:100]
+        Recency decays at the same rate for every memory, so this orders memories as the
+        retention score does at any moment, and heap entries never need re-scoring as time
+        passes; only an access changes a memory's key. Past a year the score's recency stops
+        at 0 while this key keeps falling, so eviction re-scores those memories on the way out.
+        """
+        access_score = store.column('access_count')[rows] * 0.1
+        importance_score = np.nan_to_num(store.column('importance')[rows], nan=0.5)
+        recency_score = store.column('timestamp')[rows] / (365 * DAY_SECONDS)
         
-        if self.memory_store:
-            texts = [mem['content'] for mem in self.memory_store]
-            self.memory_vectors = self.vectorizer.fit_transform(texts)
+        return (importance_score * 0.5 +
+                access_score * 0.3 +
+                recency_score * 0.2)
+    
+    def _reset_retention_heap(self):
+        keys = self._retention_keys(self.memory_store)
+        self._retention_heap = list(zip(keys.tolist(), range(len(keys))))
+        heapq.heapify(self._retention_heap)
+    
+    def _push_retention(self, rows: List[int]):
+        if not len(rows):
+            return
+        rows = np.asarray(rows, dtype=np.int64)
+        for key, row in zip(self._retention_keys(self.memory_store, rows).tolist(), rows.tolist()):
+            heapq.heappush(self._retention_heap, (key, row))
+        # Superseded entries pile up between compactions when memories are read far more than written
+        if len(self._retention_heap) > 4 * len(self.memory_store) + 64:
+            self._reset_retention_heap()
+    
+    def _maybe_compact(self):
+        """Start a compaction once the hot tier passes its high-water mark, in the background by default."""
+        if len(self.memory_store) <= self.hot_high_water:
+            return
+        if not self.background_compaction:
+            self._clean_old_memories()
+            return
+        with self._lock:
+            if self._compaction_thread is not None and self._compaction_thread.is_alive():
+                return
+            self._compaction_thread = threading.Thread(target=self._clean_old_memories,
+                                                       name="memory-compaction", daemon=True)
+            self._compaction_thread.start()
+    
+    def _clean_old_memories(self):
+        """Move the lowest-retention memories beyond hot_limit to the warm tier."""
+        with self._lock:
+            store = self.memory_store
+            excess = len(store) - self.hot_limit
+            if excess <= 0:
+                return
+            
+            scores = self._retention_scores(store)
+            store.column('retention_score')[:] = scores
+            keys = self._retention_keys(store)
+            clamped = np.floor((time.time() - store.column('timestamp')) / DAY_SECONDS) >= 365
+            evicted = np.zeros(len(store), dtype=bool)
+            # Memories over a year old have stopped decaying, so their score is fixed; they
+            # leave the key heap for one ordered by that score and the two heads compete
+            heap, old = self._retention_heap, []
+            while excess:
+                while heap and (evicted[heap[0][1]] or heap[0][0] != keys[heap[0][1]] or clamped[heap[0][1]]):
+                    key, row = heapq.heappop(heap)
+                    if not evicted[row] and key == keys[row]:
+                        heapq.heappush(old, (scores[row], row))
+                while old and evicted[old[0][1]]:
+                    heapq.heappop(old)
+                if not heap and not old:
+                    break
+                if old and (not heap or old[0][0] <= scores[heap[0][1]]):
+                    row = heapq.heappop(old)[1]
+                else:
+                    row = heapq.heappop(heap)[1]
+                evicted[row] = True
+                excess -= 1
+            
+            evicted_memories = [store[i] for i in np.flatnonzero(evicted)]
+            keep = np.flatnonzero(~evicted)
+            store.keep(keep)
+            self.memory_index.keep(keep.tolist())
+            self._retention_heap = list(zip(keys[keep].tolist(), range(len(keep))))
+            heapq.heapify(self._retention_heap)
         
+        # The warm tier is written before the hot snapshot drops these memories, so a crash
+        # in between can duplicate them but never lose them
+        self._evict_to_warm(evicted_memories)
         self._save_memory()
-        print("Cleaned old memories")
+        print(f"Moved {len(evicted_memories)} memories to the warm tier")
+    
+    def _warm_tier(self) -> Tuple[ColumnarStore, IncrementalTfidfIndex]:
+        """The warm tier's records and index, loaded on first use; (None, None) if nothing was evicted yet."""
+        with self._warm_lock:
+            if self.warm_store is None:
+                if not self.warm_log.exists():
+                    return None, None
+                try:
+                    self.warm_store, self.warm_index = self._load_tier(self.warm_log)
+                except Exception as e:
+                    print(f"Warm memory loading failed: {e}")
+                    return None, None
+            return self.warm_store, self.warm_index
+    
+    def _evict_to_warm(self, memories: List[Dict]):
+        if not memories:
+            return
+        with self._warm_lock:
+            try:
+                self.warm_log.append_many(memories)
+                if self.warm_store is not None:
+                    self.warm_store.extend(memories)
+                    self.warm_index.add_many([mem['content'] for mem in memories])
+                if self.warm_log.log_records >= self.compact_every:
+                    self._compact_warm()
+            except Exception as e:
+                print(f"Warm memory saving failed: {e}")
+    
+    def _compact_warm(self):
+        """Snapshot the warm tier, dropping its lowest-retention memories beyond warm_limit."""
+        with self._warm_lock:
+            warm_store, warm_index = self._warm_tier()
+            if warm_store is None:
+                return
+            if len(warm_store) > self.warm_limit:
+                scores = self._retention_scores(warm_store)
+                keep = np.sort(np.argpartition(-scores, self.warm_limit - 1)[:self.warm_limit])
+                warm_store.keep(keep)
+                warm_index.keep(keep.tolist())
+            self._save_tier(self.warm_log, warm_store, warm_index)
 
     def get_memory_stats(self) -> Dict[str, Any]:
-        if not self.memory_store:
-            return {"total_memories": 0, "categories": {}}
-        
-        categories = {}
-        for memory in self.memory_store:
-            category = memory.get('category', 'general')
-            categories[category] = categories.get(category, 0) + 1
-        
-        avg_importance = np.mean([mem.get('importance', 0.5) for mem in self.memory_store])
-        
-        return {
-            "total_memories": len(self.memory_store),
-            "categories": categories,
-            "average_importance": avg_importance
-        }
+        with self._lock:
+            if not self.memory_store:
+                return {"total_memories": 0, "categories": {}}
+            
+            importance = np.nan_to_num(self.memory_store.column('importance'), nan=0.5)
+            
+            warm_store, _ = self._warm_tier()
+            
+            return {
+                "total_memories": len(self.memory_store),
+                "categories": self.memory_store.category_counts('category'),
+                "average_importance": float(np.mean(importance, dtype=np.float64)),
+                "warm_memories": len(warm_store) if warm_store is not None else 0,
+                "hot_limit": self.hot_limit
+            }
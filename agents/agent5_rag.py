@@ -1,47 +1,111 @@
-from typing import Dict, Any, List
-from groq import Groq
+from typing import Dict, Any, List, Iterable, Iterator, Tuple
+from agents.llm_client import get_client, get_async_client
 import os
+import asyncio
+import json
 import pickle
+import threading
 import numpy as np
+import scipy.sparse as sp
 from datetime import datetime
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import TruncatedSVD
+from agents.ann_index import IVFIndex
+from agents.chunking import chunk_text
+from agents.columnar import ColumnarStore, TEXT, OBJECT, TIME, INT, CATEGORY
+from agents.retrieval import QueryVectorCache, normalize_rows, select_top_k
+from agents.storage import RecordLog, content_hash
+from agents.streaming import stream_events
+from agents.tokens import count_tokens, truncate_to_tokens
+from agents.tracing import tracer, traced
+
+KNOWLEDGE_SCHEMA = {
+    'id': TEXT,
+    'title': TEXT,
+    'content': TEXT,
+    'category': CATEGORY,
+    'tags': OBJECT,
+    'created_at': TIME,
+    'access_count': INT
+}
 
 class RAGAgent:
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        self.client = Groq(api_key=api_key)
+        self.client = get_client()
         self.model = "qwen-qwq-32b"
         
-        self.knowledge_store = []
-        self.vectorizer = TfidfVectorizer(
-            max_features=3000,
-            stop_words='english',
-            ngram_range=(1, 3),
-            min_df=1,
-            max_df=0.9
-        )
+        self.knowledge_store = self._new_store()
+        self.vectorizer = self._new_vectorizer()
         self.knowledge_vectors = None
         self.svd = TruncatedSVD(n_components=100, random_state=42)
         self.reduced_vectors = None
         
+        # Vectors are built per chunk; chunk_doc_ids maps each vector row back to its document
+        self.chunk_window = int(os.getenv("RAG_CHUNK_WINDOW", "120"))
+        self.chunk_overlap = int(os.getenv("RAG_CHUNK_OVERLAP", "30"))
+        self.context_token_budget = int(os.getenv("RAG_CONTEXT_TOKENS", "600"))
+        self.chunk_doc_ids = np.zeros(0, dtype=np.int64)
+        self.chunk_starts = np.zeros(0, dtype=np.int64)
+        
+        # Optional IVF index over reduced_vectors; "auto" enables it for large corpora
+        self.ann_mode = os.getenv("RAG_ANN", "auto").lower()
+        self.ann_min_vectors = int(os.getenv("RAG_ANN_MIN_VECTORS", "50000"))
+        self.ann_lists = int(os.getenv("RAG_ANN_LISTS", "0"))
+        self.ann_probes = int(os.getenv("RAG_ANN_PROBES", "8"))
+        self.ann_index = None
+        
+        # Bumped whenever a new index is swapped in, so cached RAG answers can be invalidated
+        self.corpus_version = 0
+        self.query_cache = QueryVectorCache()
+        
         self.knowledge_file = "knowledge_base_advanced.pkl"
+        self.knowledge_log = RecordLog(os.getenv("KNOWLEDGE_STORE_DIR", "knowledge_store"))
+        
+        # Queries hold _index_lock only to read/swap index references, so a rebuild runs
+        # concurrently with retrieval; _write_lock serialises writers.
+        self._index_lock = threading.RLock()
+        self._write_lock = threading.RLock()
         
         self._initialize_knowledge_base()
+    
+    @staticmethod
+    def _new_store(documents: List[Dict] = ()) -> ColumnarStore:
+        store = ColumnarStore(KNOWLEDGE_SCHEMA, defaults={'category': 'general'}, track_lengths=('content',))
+        store.extend(documents)
+        return store
+    
+    def _new_vectorizer(self) -> TfidfVectorizer:
+        return TfidfVectorizer(
+            max_features=3000,
+            stop_words='english',
+            ngram_range=(1, 3),
+            min_df=1,
+            max_df=0.9
+        )
         
     def _initialize_knowledge_base(self):
         try:
-            if os.path.exists(self.knowledge_file):
+            if self.knowledge_log.exists():
+                snapshot, appended = self.knowledge_log.load_records()
+                self.knowledge_store = self._new_store(snapshot + appended)
+                if self.knowledge_store:
+                    restored = not appended and self._restore_index(
+                        self.knowledge_log.load_meta(), self.knowledge_log.load_arrays(mmap=True))
+                    if not restored:
+                        # Documents logged after the last snapshot (e.g. an interrupted ingestion)
+                        self._build_vectors()
+                        self._save_knowledge()
+                    print(f"Loaded {len(self.knowledge_store)} knowledge documents")
+                    return
+            elif os.path.exists(self.knowledge_file):
                 with open(self.knowledge_file, 'rb') as f:
                     data = pickle.load(f)
-                    self.knowledge_store = data.get('knowledge', [])
-                    if self.knowledge_store:
-                        self._build_vectors()
-                        print(f"Loaded {len(self.knowledge_store)} knowledge documents")
-                        return
+                self.knowledge_store = self._new_store(data.get('knowledge', []))
+                if self.knowledge_store:
+                    self._build_vectors(ann_state=data.get('ann_index'))
+                    self._save_knowledge()
+                    print(f"Migrated {self.knowledge_file} to {self.knowledge_log.directory}")
+                    return
         except Exception as e:
             print(f"Knowledge loading failed: {e}")
         
@@ -85,99 +149,348 @@ class RAGAgent:
             kb['id'] = f"kb_{len(self.knowledge_store) + 1}"
             kb['created_at'] = datetime.now().isoformat()
             kb['access_count'] = 0
-            self.knowledge_store.append(kb)
+            with self._index_lock:
+                self.knowledge_store.append(kb)
         
         self._build_vectors()
         self._save_knowledge()
         print(f"Created knowledge base with {len(self.knowledge_store)} documents")
     
-    def _build_vectors(self):
-        if not self.knowledge_store:
+    def _build_chunks(self, titles: List[str], contents: List[str]):
+        texts = []
+        doc_ids = []
+        starts = []
+        for doc_index, (title, content) in enumerate(zip(titles, contents)):
+            for chunk in chunk_text(content, self.chunk_window, self.chunk_overlap):
+                texts.append(f"{title} {chunk['text']}")
+                doc_ids.append(doc_index)
+                starts.append(chunk['start'])
+        return texts, np.array(doc_ids, dtype=np.int64), np.array(starts, dtype=np.int64)
+    
+    def _chunk_text(self, doc_index: int, start: int) -> str:
+        # Chunks are stored as (document, word offset) so the snapshot never duplicates text
+        words = self.knowledge_store.value(doc_index, 'content').split()
+        return ' '.join(words[start:start + self.chunk_window])
+    
+    def _build_vectors(self, ann_state: Dict = None):
+        with self._index_lock:
+            titles = list(self.knowledge_store.column('title'))
+            contents = list(self.knowledge_store.column('content'))
+        if not contents:
+            return
+        
+        texts, chunk_doc_ids, chunk_starts = self._build_chunks(titles, contents)
+        if not texts:
             return
         
-        texts = [f"{doc['title']} {doc['content']}" for doc in self.knowledge_store]
-        self.knowledge_vectors = self.vectorizer.fit_transform(texts)
+        # Fit into fresh objects so in-flight queries keep using the previous index
+        vectorizer = self._new_vectorizer()
+        knowledge_vectors = vectorizer.fit_transform(texts)
+        svd = self.svd
         
-        if self.knowledge_vectors.shape[0] > 1:
-            n_components = min(100, self.knowledge_vectors.shape[1], self.knowledge_vectors.shape[0])
-            self.svd = TruncatedSVD(n_components=n_components, random_state=42)
-            self.reduced_vectors = self.svd.fit_transform(self.knowledge_vectors)
+        if knowledge_vectors.shape[0] > 1:
+            n_components = min(100, knowledge_vectors.shape[1], knowledge_vectors.shape[0])
+            svd = TruncatedSVD(n_components=n_components, random_state=42)
+            # Stored L2-normalised so cosine similarity is a single matrix-vector product
+            reduced_vectors = normalize_rows(svd.fit_transform(knowledge_vectors))
         else:
-            self.reduced_vectors = self.knowledge_vectors.toarray()
+            # Too few rows to fit an SVD; score against the (already l2-normalised) TF-IDF rows
+            reduced_vectors = None
+        
+        ann_index = self._build_ann_index(reduced_vectors, ann_state)
+        
+        with self._index_lock:
+            self.vectorizer = vectorizer
+            self.knowledge_vectors = knowledge_vectors
+            self.svd = svd
+            self.reduced_vectors = reduced_vectors
+            self.chunk_doc_ids = chunk_doc_ids
+            self.chunk_starts = chunk_starts
+            self.ann_index = ann_index
+            self.corpus_version += 1
+    
+    def _build_ann_index(self, reduced_vectors: np.ndarray, ann_state: Dict = None):
+        if reduced_vectors is None or self.ann_mode == 'off':
+            return None
+        if self.ann_mode != 'on' and len(reduced_vectors) < self.ann_min_vectors:
+            return None
+        
+        if ann_state is not None and len(ann_state['ids']) == len(reduced_vectors):
+            ann_index = IVFIndex.from_state(ann_state, reduced_vectors)
+            ann_index.n_probe = self.ann_probes
+            return ann_index
+        
+        ann_index = IVFIndex(n_lists=self.ann_lists or None, n_probe=self.ann_probes).fit(reduced_vectors)
+        print(f"Built ANN index with {ann_index.n_lists} lists")
+        return ann_index
+    
+    def _index_arrays(self) -> Dict[str, np.ndarray]:
+        if self.knowledge_vectors is None:
+            return {}
+        
+        vocabulary = np.empty(len(self.vectorizer.vocabulary_), dtype=object)
+        for term, column in self.vectorizer.vocabulary_.items():
+            vocabulary[column] = term
+        
+        arrays = {
+            'vocabulary': vocabulary.astype(str),
+            'idf': self.vectorizer.idf_,
+            'tfidf_data': self.knowledge_vectors.data,
+            'tfidf_indices': self.knowledge_vectors.indices,
+            'tfidf_indptr': self.knowledge_vectors.indptr,
+            'chunk_doc_ids': self.chunk_doc_ids,
+            'chunk_starts': self.chunk_starts
+        }
+        if self.reduced_vectors is not None:
+            arrays['reduced_vectors'] = self.reduced_vectors
+        if hasattr(self.svd, 'components_'):
+            arrays['svd_components'] = self.svd.components_
+        if self.ann_index is not None:
+            arrays.update({f"ann_{name}": array for name, array in self.ann_index.state().items()})
+        return arrays
+    
+    def _restore_index(self, meta: Dict, arrays: Dict[str, np.ndarray]) -> bool:
+        """Rebuild the fitted vectorizer/SVD and matrices from a snapshot without refitting."""
+        if 'vocabulary' not in arrays:
+            return False
+        if meta.get('model_config') != self._model_config():
+            print("Knowledge index settings changed, refitting")
+            return False
+        if meta.get('content_hash') != self._content_hash():
+            print("Knowledge content changed since the last snapshot, refitting")
+            return False
+        
+        vectorizer = self._new_vectorizer()
+        vectorizer.vocabulary_ = {str(term): column for column, term in enumerate(arrays['vocabulary'])}
+        vectorizer.idf_ = np.array(arrays['idf'])
+        
+        indptr = arrays['tfidf_indptr']
+        knowledge_vectors = sp.csr_matrix(
+            (arrays['tfidf_data'], arrays['tfidf_indices'], indptr),
+            shape=(len(indptr) - 1, len(arrays['vocabulary'])), copy=False
+        )
+        svd = self.svd
+        if 'svd_components' in arrays:
+            components = arrays['svd_components']
+            svd = TruncatedSVD(n_components=components.shape[0], random_state=42)
+            svd.components_ = components
+            svd.n_features_in_ = components.shape[1]
+        
+        ann_state = {name[len('ann_'):]: array for name, array in arrays.items() if name.startswith('ann_')}
+        reduced_vectors = arrays.get('reduced_vectors')
+        ann_index = self._build_ann_index(reduced_vectors, ann_state or None)
+        
+        with self._index_lock:
+            self.vectorizer = vectorizer
+            self.knowledge_vectors = knowledge_vectors
+            self.svd = svd
+            self.reduced_vectors = reduced_vectors
+            self.chunk_doc_ids = arrays['chunk_doc_ids']
+            self.chunk_starts = arrays['chunk_starts']
+            self.ann_index = ann_index
+            self.corpus_version += 1
+        return True
+    
+    def _model_config(self) -> str:
+        params = {name: self.vectorizer.get_params()[name]
+                  for name in ('max_features', 'stop_words', 'ngram_range', 'min_df', 'max_df')}
+        params.update(chunk_window=self.chunk_window, chunk_overlap=self.chunk_overlap, normalized_reduced_vectors=True)
+        return content_hash([json.dumps(params, sort_keys=True, default=str)])
+    
+    def _content_hash(self) -> str:
+        return content_hash(f"{title}\x1f{content}" for title, content in
+                            zip(self.knowledge_store.column('title'), self.knowledge_store.column('content')))
     
     def _save_knowledge(self):
         try:
-            data = {'knowledge': self.knowledge_store}
-            with open(self.knowledge_file, 'wb') as f:
-                pickle.dump(data, f)
+            with self._write_lock:
+                with self._index_lock:
+                    arrays = self._index_arrays()
+                self.knowledge_log.compact(
+                    self.knowledge_store.records(),
+                    arrays=arrays,
+                    meta={'model_config': self._model_config(), 'content_hash': self._content_hash()}
+                )
         except Exception as e:
             print(f"Knowledge saving failed: {e}")
     
-    def _retrieve_relevant_knowledge(self, query: str, top_k: int = 3) -> List[Dict]:
-        if not self.knowledge_store or self.knowledge_vectors is None:
-            return []
+    def _retrieve_relevant_chunks(self, query: str, top_k: int = 8) -> List[Dict]:
+        return self._retrieve_relevant_chunks_batch([query], top_k)[0]
+
+    @traced("rag.retrieve", lambda results: {"queries": len(results), "chunks": sum(map(len, results))})
+    def _retrieve_relevant_chunks_batch(self, queries: List[str], top_k: int = 8, block_size: int = 256,
+                                        count_access: bool = True) -> List[List[Dict]]:
+        """Retrieve for many queries: one vectorizer/SVD transform per block of queries, one similarity matrix per block."""
+        with self._index_lock:
+            vectorizer, svd, ann_index = self.vectorizer, self.svd, self.ann_index
+            knowledge_vectors, reduced_vectors = self.knowledge_vectors, self.reduced_vectors
+            chunk_doc_ids, chunk_starts = self.chunk_doc_ids, self.chunk_starts
+            version = self.corpus_version
+        
+        if not len(chunk_doc_ids) or knowledge_vectors is None:
+            return [[] for _ in queries]
+        
+        def embed(keys: List) -> List:
+            # Only query-cache misses reach here
+            with tracer.span("rag.vectorize", queries=len(keys)):
+                query_vectors = vectorizer.transform([query for _, query in keys])
+                if reduced_vectors is None:
+                    return [query_vectors[i] for i in range(query_vectors.shape[0])]
+                return list(normalize_rows(svd.transform(query_vectors)))
+        
+        # Bound each block's score matrix to ~16M entries however large the corpus is
+        block_size = max(1, min(block_size, 2 ** 24 // len(chunk_doc_ids)))
         
         try:
-            query_vector = self.vectorizer.transform([query])
-            
-            if hasattr(self, 'reduced_vectors') and self.reduced_vectors is not None:
-                query_reduced = self.svd.transform(query_vector)
-                similarities = cosine_similarity(query_reduced, self.reduced_vectors)[0]
-            else:
-                similarities = cosine_similarity(query_vector, self.knowledge_vectors)[0]
-            
-            similarity_indices = np.argsort(similarities)[::-1]
-            
-            relevant_docs = []
-            for idx in similarity_indices[:top_k]:
-                similarity_score = similarities[idx]
+            results = []
+            for block_start in range(0, len(queries), block_size):
+                block = queries[block_start:block_start + block_size]
+                # Keyed by corpus version: vectors from a previous vectorizer/SVD fit are never reused
+                rows = self.query_cache.get_many([(version, query) for query in block], embed)
                 
-                if similarity_score > 0.05:
-                    doc = self.knowledge_store[idx].copy()
-                    doc['similarity'] = similarity_score
-                    doc['index'] = idx
-                    relevant_docs.append(doc)
+                if ann_index is not None:
+                    matches = [ann_index.search(row, top_k) for row in rows]
+                else:
+                    # Rows on both sides are unit length, so the dot product is the cosine similarity
+                    if reduced_vectors is not None:
+                        similarity_matrix = np.vstack(rows) @ reduced_vectors.T
+                    else:
+                        similarity_matrix = (sp.vstack(rows, format='csr') @ knowledge_vectors.T).toarray()
+                    
+                    matches = [select_top_k(similarities, top_k, threshold=0.05) for similarities in similarity_matrix]
+                
+                for similarity_indices, scores in matches:
+                    relevant_chunks = []
+                    for idx, similarity_score in zip(similarity_indices, scores):
+                        if similarity_score > 0.05:
+                            doc_index = int(chunk_doc_ids[idx])
+                            start = int(chunk_starts[idx])
+                            relevant_chunks.append({
+                                'text': self._chunk_text(doc_index, start),
+                                'start': start,
+                                'doc_index': doc_index,
+                                'title': self.knowledge_store.value(doc_index, 'title'),
+                                'similarity': float(similarity_score)
+                            })
+                    results.append(relevant_chunks)
             
-            for doc in relevant_docs:
-                idx = doc['index']
-                self.knowledge_store[idx]['access_count'] += 1
+            if count_access:
+                # Each document counts once per query, however many of its chunks matched
+                accessed = [doc_index for relevant_chunks in results
+                            for doc_index in {chunk['doc_index'] for chunk in relevant_chunks}]
+                with self._index_lock:
+                    self.knowledge_store.increment('access_count', accessed)
             
-            return relevant_docs
+            return results
             
         except Exception as e:
             print(f"Knowledge retrieval failed: {e}")
-            return []
+            return [[] for _ in queries]
     
-    def add_knowledge(self, title: str, content: str, category: str = "general", tags: List[str] = None):
-        if tags is None:
-            tags = []
+    def _retrieve_relevant_knowledge(self, query: str, top_k: int = 3) -> List[Dict]:
+        relevant_docs = {}
+        for chunk in self._retrieve_relevant_chunks(query, top_k=top_k * 3):
+            idx = chunk['doc_index']
+            if idx not in relevant_docs:
+                doc = self.knowledge_store[idx]
+                doc['similarity'] = chunk['similarity']
+                doc['index'] = idx
+                doc['passage'] = chunk['text']
+                relevant_docs[idx] = doc
+        return list(relevant_docs.values())[:top_k]
+    
+    def _pack_context(self, chunks: List[Dict], token_budget: int = None) -> List[Dict]:
+        """Take the best chunks, in score order, until the token budget is spent."""
+        if token_budget is None:
+            token_budget = self.context_token_budget
         
-        knowledge_doc = {
-            'id': f"kb_{len(self.knowledge_store) + 1}",
+        packed = []
+        remaining = token_budget
+        for chunk in chunks:
+            line = f"[{chunk['title']}] {chunk['text']}"
+            tokens = count_tokens(line)
+            if tokens > remaining:
+                if packed or remaining < 32:
+                    continue
+                line = truncate_to_tokens(line, remaining)
+                tokens = count_tokens(line)
+            packed.append(dict(chunk, line=line))
+            remaining -= tokens
+            if remaining <= 0:
+                break
+        return packed
+    
+    def read_only_view(self) -> 'KnowledgeIndexView':
+        return KnowledgeIndexView(self)
+    
+    def _new_document(self, title: str, content: str, category: str = "general", tags: List[str] = None,
+                      number: int = None) -> Dict:
+        return {
+            'id': f"kb_{number or len(self.knowledge_store) + 1}",
             'title': title,
             'content': content,
             'category': category,
-            'tags': tags,
+            'tags': tags or [],
             'created_at': datetime.now().isoformat(),
             'access_count': 0
         }
-        
-        self.knowledge_store.append(knowledge_doc)
-        self._build_vectors()
-        self._save_knowledge()
+    
+    def add_knowledge(self, title: str, content: str, category: str = "general", tags: List[str] = None):
+        self.add_knowledge_batch([{'title': title, 'content': content, 'category': category, 'tags': tags}])
         print(f"Added knowledge: {title}")
+    
+    def add_knowledge_batch(self, documents: Iterable[Dict], rebuild: bool = True, save: bool = True) -> int:
+        """Append many documents, then fit the vectors and write the snapshot once.
 
-    def process(self, user_input: str) -> Dict[str, Any]:
-        try:
-            relevant_docs = self._retrieve_relevant_knowledge(user_input)
-            
-            knowledge_context = ""
-            if relevant_docs:
-                knowledge_context = "\nRelevant knowledge:\n"
-                for i, doc in enumerate(relevant_docs):
-                    knowledge_context += f"{i+1}. {doc['title']}: {doc['content'][:200]}...\n"
+        Pass rebuild=False/save=False when streaming several batches and call
+        finalize_knowledge() after the last one; unsaved batches go to the record log.
+        """
+        with self._write_lock:
+            new_docs = []
+            for doc in documents:
+                if not doc.get('content'):
+                    continue
+                number = len(self.knowledge_store) + len(new_docs) + 1
+                knowledge_doc = self._new_document(
+                    title=doc.get('title') or f"Document {number}",
+                    content=doc['content'],
+                    category=doc.get('category') or "general",
+                    tags=doc.get('tags'),
+                    number=number
+                )
+                new_docs.append(knowledge_doc)
             
-            system_prompt = f"""You are a knowledge assistant for Mann Gupta in Bangalore, India.
+            if not new_docs:
+                return 0
+            # Appending may reallocate the columns, so it is excluded with readers' access-count updates
+            with self._index_lock:
+                self.knowledge_store.extend(new_docs)
+            if rebuild:
+                self._build_vectors()
+            if save:
+                self._save_knowledge()
+            else:
+                self.knowledge_log.append_many(new_docs)
+            return len(new_docs)
+    
+    def finalize_knowledge(self):
+        with self._write_lock:
+            self._build_vectors()
+            self._save_knowledge()
+
+    def _prepare(self, user_input: str, chunks: List[Dict] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Retrieve context for a query; returns (request kwargs, result fields)."""
+        if chunks is None:
+            chunks = self._retrieve_relevant_chunks(user_input)
+        relevant_chunks = self._pack_context(chunks)
+        
+        knowledge_context = ""
+        if relevant_chunks:
+            knowledge_context = "\nRelevant knowledge:\n"
+            for i, chunk in enumerate(relevant_chunks):
+                knowledge_context += f"{i+1}. {chunk['line']}\n"
+        
+        system_prompt = f"""You are a knowledge assistant for Mann Gupta in Bangalore, India.
 
 {knowledge_context}
 
@@ -185,37 +498,92 @@ Use the knowledge base to provide comprehensive answers about programming, techn
 
 User question: {user_input}"""
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "system", "content": system_prompt}],
-                temperature=0.7,
-                max_tokens=800
-            )
+        request = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system_prompt}],
+            "temperature": 0.7,
+            "max_tokens": 800
+        }
+        result = {
+            "agent": "rag",
+            "knowledge_docs_used": len({chunk['doc_index'] for chunk in relevant_chunks}),
+            "knowledge_chunks_used": len(relevant_chunks)
+        }
+        return request, result
+
+    def _prepare_batch(self, queries: List[str]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        batch = self._retrieve_relevant_chunks_batch(queries)
+        return [self._prepare(query, chunks) for query, chunks in zip(queries, batch)]
+
+    def _complete(self, request: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM half of process(), for requests built by _prepare()/_prepare_batch()."""
+        try:
+            response = self.client.chat.completions.create(**request)
+            return dict(result, response=response.choices[0].message.content)
+        except Exception as e:
+            return {"response": f"Knowledge retrieval failed: {str(e)}", "agent": "rag", "error": True}
+
+    def process(self, user_input: str) -> Dict[str, Any]:
+        try:
+            request, result = self._prepare(user_input)
+            response = self.client.chat.completions.create(**request)
+            return dict(result, response=response.choices[0].message.content)
             
-            return {
-                "response": response.choices[0].message.content,
-                "agent": "rag",
-                "knowledge_docs_used": len(relevant_docs)
-            }
+        except Exception as e:
+            return {"response": f"Knowledge retrieval failed: {str(e)}", "agent": "rag", "error": True}
+
+    async def aprocess(self, user_input: str) -> Dict[str, Any]:
+        try:
+            request, result = await asyncio.to_thread(self._prepare, user_input)
+            response = await get_async_client().chat.completions.create(**request)
+            return dict(result, response=response.choices[0].message.content)
             
         except Exception as e:
             return {"response": f"Knowledge retrieval failed: {str(e)}", "agent": "rag", "error": True}
 
+    def process_stream(self, user_input: str) -> Iterator[Dict[str, Any]]:
+        try:
+            request, result = self._prepare(user_input)
+            yield from stream_events(self.client, request, result)
+        except Exception as e:
+            yield {"type": "done", "response": f"Knowledge retrieval failed: {str(e)}", "agent": "rag", "error": True}
+
     def get_knowledge_stats(self) -> Dict[str, Any]:
         if not self.knowledge_store:
             return {"total_documents": 0, "categories": {}}
         
-        categories = {}
-        for doc in self.knowledge_store:
-            category = doc.get('category', 'general')
-            categories[category] = categories.get(category, 0) + 1
-        
-        total_content_length = sum(len(doc['content']) for doc in self.knowledge_store)
-        avg_content_length = total_content_length / len(self.knowledge_store)
+        avg_content_length = float(np.mean(self.knowledge_store.lengths('content'), dtype=np.float64))
         
         return {
             "total_documents": len(self.knowledge_store),
-            "categories": categories,
+            "categories": self.knowledge_store.category_counts('category'),
             "average_content_length": avg_content_length,
+            "total_chunks": len(self.chunk_doc_ids),
+            "query_cache": self.query_cache.get_stats(),
             "vector_dimensions": self.knowledge_vectors.shape[1] if self.knowledge_vectors is not None else 0
         }
+
+
+class KnowledgeIndexView:
+    """Read-only search over a RAGAgent's index, for other agents.
+
+    Queries go through the owner's vectorizer, SVD, vectors and query cache, so there is a
+    single copy of the index and a rebuild is visible as soon as it is swapped in. Searches
+    through the view do not touch the documents' access counts.
+    """
+
+    def __init__(self, owner: RAGAgent):
+        self._owner = owner
+
+    @property
+    def corpus_version(self) -> int:
+        return self._owner.corpus_version
+
+    def search(self, query: str, top_k: int = 8) -> List[Dict]:
+        return self.search_batch([query], top_k)[0]
+
+    def search_batch(self, queries: List[str], top_k: int = 8) -> List[List[Dict]]:
+        return self._owner._retrieve_relevant_chunks_batch(queries, top_k, count_access=False)
+
+    def pack(self, chunks: List[Dict], token_budget: int) -> List[Dict]:
+        return self._owner._pack_context(chunks, token_budget)
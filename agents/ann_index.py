@@ -0,0 +1,132 @@
+from typing import Dict, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class IVFIndex:
+    """Inverted-file ANN index for cosine similarity over dense vectors.
+
+    Vectors are clustered with spherical k-means into n_lists coarse cells. The index keeps
+    only the row ids sorted by cell and each cell's offset into them, and scores the caller's
+    vector matrix in place, so it adds no copy of the vectors. A query scores the centroids,
+    scans only the n_probe closest cells and returns the best matches from those. n_lists and n_probe are the recall/speed
+    knobs: probing more cells raises recall at the cost of scanning more vectors.
+    """
+
+    def __init__(self, n_lists: int = None, n_probe: int = 8, max_iter: int = 20,
+                 train_size: int = 100000, seed: int = 42):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.max_iter = max_iter
+        self.train_size = train_size
+        self.seed = seed
+        self.centroids = None
+        self.vectors = None
+        self.ids = None
+        self.offsets = None
+
+    def __len__(self) -> int:
+        return 0 if self.ids is None else len(self.ids)
+
+    def _kmeans(self, data: np.ndarray, n_lists: int) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        centroids = data[rng.choice(len(data), n_lists, replace=False)].copy()
+
+        for _ in range(self.max_iter):
+            assignments = np.argmax(data @ centroids.T, axis=1)
+            membership = sp.csr_matrix(
+                (np.ones(len(data), dtype=data.dtype), (assignments, np.arange(len(data)))),
+                shape=(n_lists, len(data))
+            )
+            sums = np.asarray(membership @ data)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            # Re-seed empty cells so every list keeps a share of the data
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = data[rng.choice(len(data), int(empty.sum()), replace=False)]
+            updated = _normalize(sums)
+            if np.allclose(updated, centroids, atol=1e-6):
+                break
+            centroids = updated
+
+        return centroids
+
+    def _assign(self, vectors: np.ndarray, batch_size: int = 65536) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), batch_size):
+            block = vectors[start:start + batch_size]
+            assignments[start:start + batch_size] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignments
+
+    def fit(self, vectors: np.ndarray) -> "IVFIndex":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Already unit-length rows (RAGAgent's reduced vectors) are used as they are, not copied
+        norms = np.linalg.norm(vectors, axis=1)
+        if not np.all((np.abs(norms - 1) < 1e-4) | (norms == 0)):
+            vectors = _normalize(vectors)
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+
+        rng = np.random.default_rng(self.seed)
+        sample = vectors
+        if len(vectors) > self.train_size:
+            sample = vectors[rng.choice(len(vectors), self.train_size, replace=False)]
+
+        self.centroids = self._kmeans(sample, n_lists)
+        assignments = self._assign(vectors)
+
+        order = np.argsort(assignments, kind='stable')
+        self.ids = order.astype(np.int64)
+        self.vectors = vectors
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=n_lists))]).astype(np.int64)
+        self.n_lists = n_lists
+        return self
+
+    def search(self, query: np.ndarray, top_k: int = 10, n_probe: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (ids, scores) of the approximate top_k rows by cosine similarity, best first."""
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        query = _normalize(np.asarray(query, dtype=np.float32).ravel())
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+
+        centroid_scores = self.centroids @ query
+        if n_probe < self.n_lists:
+            probed = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            probed = np.arange(self.n_lists)
+
+        ids = np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in probed])
+        if not len(ids):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        scores = np.take(self.vectors, ids, axis=0) @ query
+
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return ids[best], scores[best]
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """The fitted cells; the vectors are left out and passed back to from_state()."""
+        return {
+            'centroids': self.centroids,
+            'ids': self.ids,
+            'offsets': self.offsets,
+            'n_probe': np.array(self.n_probe),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray], vectors: np.ndarray) -> "IVFIndex":
+        index = cls(n_lists=len(state['centroids']), n_probe=int(state['n_probe']))
+        index.centroids = state['centroids']
+        index.vectors = np.asarray(vectors, dtype=np.float32)
+        index.ids = state['ids']
+        index.offsets = state['offsets']
+        return index
@@ -0,0 +1,27 @@
+from typing import Dict, List
+
+
+def chunk_text(text: str, window: int = 120, overlap: int = 30) -> List[Dict]:
+    """Split text into overlapping word windows.
+
+    Returns dicts with the chunk text and its starting word offset, so a passage can be
+    traced back to its position in the source document.
+    """
+    if window <= 0:
+        raise ValueError("window must be positive")
+    if not 0 <= overlap < window:
+        raise ValueError("overlap must be between 0 and window - 1")
+
+    words = text.split()
+    if not words:
+        return []
+    if len(words) <= window:
+        return [{'text': ' '.join(words), 'start': 0}]
+
+    step = window - overlap
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append({'text': ' '.join(words[start:start + window]), 'start': start})
+        if start + window >= len(words):
+            break
+    return chunks
@@ -0,0 +1,184 @@
+from typing import Dict, Any, List, Iterable, Iterator, Optional, Sequence
+from datetime import datetime
+import numpy as np
+
+TEXT = 'text'
+OBJECT = 'object'
+TIME = 'time'
+FLOAT = 'float'
+INT = 'int'
+CATEGORY = 'category'
+
+_DTYPES = {TIME: np.float64, FLOAT: np.float32, INT: np.int32, CATEGORY: np.int32}
+
+
+def to_epoch(value) -> float:
+    if value is None or value == '':
+        return np.nan
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    return datetime.fromisoformat(value).timestamp()
+
+
+def from_epoch(value: float) -> Optional[str]:
+    return None if np.isnan(value) else datetime.fromtimestamp(value).isoformat()
+
+
+class ColumnarStore:
+    """Record table with scalar fields in NumPy columns and text in plain lists.
+
+    schema maps field name to kind: 'text'/'object' (Python list), 'time' (float64 epoch
+    seconds, NaN for None), 'float' (float32), 'int' (int32) or 'category' (int32 codes into
+    a label list). Indexing returns a fresh dict in the original record shape, with times as
+    ISO strings, so callers that read records keep working; hot paths use column() instead.
+    Fields outside the schema are kept per row so records round-trip through persistence.
+    """
+
+    def __init__(self, schema: Dict[str, str], defaults: Dict[str, Any] = None, track_lengths: Sequence[str] = ()):
+        self.schema = dict(schema)
+        self.defaults = dict(defaults or {})
+        self._size = 0
+        self._capacity = 0
+        self._arrays = {name: np.empty(0, dtype=_DTYPES[kind]) for name, kind in self.schema.items() if kind in _DTYPES}
+        self._lists = {name: [] for name, kind in self.schema.items() if kind in (TEXT, OBJECT)}
+        self._labels = {name: [] for name, kind in self.schema.items() if kind == CATEGORY}
+        self._codes = {name: {} for name in self._labels}
+        self._counts = {name: np.zeros(0, dtype=np.int64) for name in self._labels}
+        # Character counts of text fields, kept so averages never walk the strings
+        self._lengths = {name: np.empty(0, dtype=np.int32) for name in track_lengths}
+        self._extras: List[Optional[Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        record = {}
+        for name, kind in self.schema.items():
+            if kind in (TEXT, OBJECT):
+                record[name] = self._lists[name][i]
+            elif kind == CATEGORY:
+                record[name] = self._labels[name][self._arrays[name][i]]
+            elif kind == TIME:
+                record[name] = from_epoch(self._arrays[name][i])
+            elif kind == FLOAT:
+                value = self._arrays[name][i]
+                record[name] = None if np.isnan(value) else round(float(value), 6)
+            else:
+                record[name] = int(self._arrays[name][i])
+        if self._extras[i]:
+            record.update(self._extras[i])
+        return record
+
+    def _reserve(self, size: int):
+        if size <= self._capacity:
+            return
+        capacity = max(size, 2 * self._capacity, 16)
+        for columns in (self._arrays, self._lengths):
+            for name, array in columns.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self._size] = array[:self._size]
+                columns[name] = grown
+        self._capacity = capacity
+
+    def _category_code(self, name: str, label) -> int:
+        codes = self._codes[name]
+        if label not in codes:
+            codes[label] = len(self._labels[name])
+            self._labels[name].append(label)
+            self._counts[name] = np.append(self._counts[name], 0)
+        return codes[label]
+
+    def append(self, record: Dict[str, Any]):
+        self.extend([record])
+
+    def extend(self, records: Iterable[Dict[str, Any]]):
+        records = list(records)
+        if not records:
+            return
+        start, end = self._size, self._size + len(records)
+        self._reserve(end)
+
+        for name, kind in self.schema.items():
+            default = self.defaults.get(name)
+            values = [record.get(name, default) for record in records]
+            if kind in (TEXT, OBJECT):
+                self._lists[name].extend(values)
+            elif kind == CATEGORY:
+                codes = np.array([self._category_code(name, value) for value in values], dtype=np.int32)
+                self._arrays[name][start:end] = codes
+                self._counts[name] += np.bincount(codes, minlength=len(self._labels[name]))
+            elif kind == TIME:
+                self._arrays[name][start:end] = [to_epoch(value) for value in values]
+            elif kind == FLOAT:
+                self._arrays[name][start:end] = [np.nan if value is None else value for value in values]
+            else:
+                self._arrays[name][start:end] = [value or 0 for value in values]
+
+        for name in self._lengths:
+            self._lengths[name][start:end] = [len(value or '') for value in self._lists[name][start:end]]
+        self._extras.extend({key: value for key, value in record.items() if key not in self.schema} or None
+                            for record in records)
+        self._size = end
+
+    def column(self, name: str):
+        """Live view of a column: a NumPy slice for scalar fields, the list itself for text."""
+        if name in self._lists:
+            return self._lists[name]
+        return self._arrays[name][:self._size]
+
+    def value(self, i: int, name: str):
+        return self._lists[name][i] if name in self._lists else self[i][name]
+
+    def lengths(self, name: str) -> np.ndarray:
+        return self._lengths[name][:self._size]
+
+    def labels(self, name: str) -> List:
+        return list(self._labels[name])
+
+    def category_counts(self, name: str) -> Dict[str, int]:
+        return {label: int(count) for label, count in zip(self._labels[name], self._counts[name]) if count}
+
+    def category_mask(self, name: str, label) -> np.ndarray:
+        code = self._codes[name].get(label)
+        if code is None:
+            return np.zeros(self._size, dtype=bool)
+        return self.column(name) == code
+
+    def increment(self, name: str, indices: Sequence[int], amount: int = 1):
+        np.add.at(self._arrays[name], np.asarray(indices, dtype=np.int64), amount)
+
+    def assign(self, name: str, indices: Sequence[int], value):
+        if self.schema[name] == TIME:
+            value = to_epoch(value)
+        self._arrays[name][np.asarray(indices, dtype=np.int64)] = value
+
+    def keep(self, indices: Sequence[int]):
+        """Retain only the given rows, in the given order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        for columns in (self._arrays, self._lengths):
+            for name, array in columns.items():
+                columns[name] = array[:self._size][indices].copy()
+        for name, values in self._lists.items():
+            self._lists[name] = [values[i] for i in indices]
+        self._extras = [self._extras[i] for i in indices]
+        for name in self._counts:
+            self._counts[name] = np.bincount(self._arrays[name], minlength=len(self._labels[name])).astype(np.int64)
+        self._size = self._capacity = len(indices)
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [self[i] for i in range(self._size)]
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns themselves: arrays plus list slots, excluding the text objects."""
+        arrays = sum(array.nbytes for columns in (self._arrays, self._lengths) for array in columns.values())
+        return arrays + 8 * (len(self._lists) + 1) * self._size
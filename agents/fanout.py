@@ -0,0 +1,96 @@
+from typing import Dict, Any, Callable, List, Tuple
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from agents.tracing import tracer
+
+
+class FanOutRetriever:
+    """Runs several retrieval sources for one query concurrently, under a per-request deadline.
+
+    sources maps a name to a callable returning a list of context items. A source that has
+    not finished by the deadline is dropped from the result rather than waited on (its
+    thread finishes in the background and the result is discarded); a source that raises is
+    dropped too. gather() reports each source's status, item count and elapsed time.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[str], List[Dict]]], deadline: float = None,
+                 max_workers: int = None):
+        self.sources = sources
+        self.deadline = deadline or float(os.getenv("FANOUT_DEADLINE_MS", "300")) / 1000
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or int(os.getenv("FANOUT_WORKERS", "8")),
+                                            thread_name_prefix="fanout")
+        self.stats = {"requests": 0, "missed_deadline": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat: str):
+        # The retriever is shared by every session's threads and event loop
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def _timed(self, name: str, query: str) -> Tuple[List[Dict], float]:
+        start = time.perf_counter()
+        items = self.sources[name](query)
+        return items, time.perf_counter() - start
+
+    def _collect(self, outcomes: Dict[str, Any], start: float) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict[str, Any]]]:
+        """outcomes maps each source to (items, seconds), an exception, or None if it missed the deadline."""
+        contexts, report = {}, {}
+        for name, outcome in outcomes.items():
+            if outcome is None:
+                self._count("missed_deadline")
+                report[name] = {"status": "missed_deadline", "ms": round((time.perf_counter() - start) * 1000, 2)}
+            elif isinstance(outcome, BaseException):
+                self._count("errors")
+                print(f"Fan-out source {name} failed: {outcome}")
+                report[name] = {"status": "error", "error": str(outcome)}
+            else:
+                items, seconds = outcome
+                contexts[name] = items
+                report[name] = {"status": "ok", "items": len(items), "ms": round(seconds * 1000, 2)}
+        return contexts, report
+
+    def gather(self, query: str) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict[str, Any]]]:
+        """Return ({source: items} for the sources that made the deadline, {source: report})."""
+        self._count("requests")
+        start = time.perf_counter()
+        with tracer.span("fanout.gather") as span:
+            futures = {name: self._executor.submit(self._timed, name, query) for name in self.sources}
+            wait(futures.values(), timeout=self.deadline)
+
+            outcomes = {}
+            for name, future in futures.items():
+                if not future.done():
+                    future.cancel()
+                    outcomes[name] = None
+                else:
+                    outcomes[name] = future.exception() or future.result()
+            span.set(missed=[name for name, outcome in outcomes.items() if outcome is None] or None)
+        return self._collect(outcomes, start)
+
+    async def agather(self, query: str) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict[str, Any]]]:
+        """gather() for the event loop; the sources still run on the fan-out thread pool."""
+        self._count("requests")
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        with tracer.span("fanout.gather") as span:
+            tasks = {name: asyncio.ensure_future(loop.run_in_executor(self._executor, self._timed, name, query))
+                     for name in self.sources}
+            await asyncio.wait(tasks.values(), timeout=self.deadline)
+
+            outcomes = {}
+            for name, task in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    outcomes[name] = None
+                else:
+                    outcomes[name] = task.exception() or task.result()
+            span.set(missed=[name for name, outcome in outcomes.items() if outcome is None] or None)
+        return self._collect(outcomes, start)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return dict(stats, deadline_ms=round(self.deadline * 1000, 1), sources=list(self.sources))
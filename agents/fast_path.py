@@ -0,0 +1,218 @@
+from typing import Dict, Any, Iterable, Optional, Tuple
+import ast
+import json
+import math
+import operator
+import os
+import re
+import threading
+
+DEFAULT_ANSWERS = {
+    ("hi", "hello", "hey", "hi there", "hello there", "hey there"): "Hello! How can I help you today?",
+    ("good morning",): "Good morning! How can I help you today?",
+    ("good afternoon",): "Good afternoon! How can I help you today?",
+    ("good evening",): "Good evening! How can I help you today?",
+    ("thanks", "thank you", "thanks a lot", "thank you so much", "thanks for the help",
+     "thank you for the help"): "You're welcome! Let me know if there's anything else.",
+    ("bye", "goodbye", "see you"): "Goodbye! Feel free to come back any time.",
+}
+
+# Phrasings that wrap an expression: "what is 15 + 27?", "calculate 144 divided by 12"
+_PREFIX = re.compile(r"^(?:(?:what|how much)(?: is|'s| are)|calculate|compute|evaluate|solve|convert)\s+(?:the\s+)?", re.IGNORECASE)
+_WORDS = [
+    (r"\bto the power of\b", "**"), (r"\bsquared\b", "**2"), (r"\bcubed\b", "**3"),
+    (r"\bmultiplied by\b", "*"), (r"\bdivided by\b", "/"), (r"\bplus\b", "+"), (r"\bminus\b", "-"),
+    (r"\btimes\b", "*"), (r"\bover\b", "/"), (r"\bmod(?:ulo)?\b", "%"),
+    (r"\bsquare root of\b", "sqrt "), (r"(?<=\d)\s*x\s*(?=\d)", "*"), (r"×", "*"), (r"÷", "/"),
+]
+_WORDS = [(re.compile(pattern, re.IGNORECASE), symbol) for pattern, symbol in _WORDS]
+_EXPRESSION = re.compile(r"^[\d\s.+\-*/%()]*(?:sqrt[\d\s.+\-*/%()]*)*$")
+_OPERATOR = re.compile(r"[+\-*/%]|sqrt")
+# "9/11", "24/7", "12/25/2024", "1-800-555-1234", "1990-05-12", "2023-2024": dates, idioms, phone
+# numbers and ranges, not divisions or subtractions, unless written with spaces or words
+_BARE_CHAIN = re.compile(r"^\d+(?:(?:/\d+)+|(?:-\d+)+)$")
+
+_BINARY = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+           ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow}
+_UNARY = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_FUNCTIONS = {"sqrt": math.sqrt}
+MAX_EXPONENT = 100
+MAX_MAGNITUDE = 1e15
+
+# Factor to the base unit of each dimension; temperatures are handled separately
+_UNITS = {
+    "length": {"mm": 0.001, "millimeter": 0.001, "cm": 0.01, "centimeter": 0.01, "m": 1.0, "meter": 1.0,
+               "km": 1000.0, "kilometer": 1000.0, "in": 0.0254, "inch": 0.0254, "ft": 0.3048,
+               "foot": 0.3048, "feet": 0.3048, "yd": 0.9144, "yard": 0.9144, "mi": 1609.344, "mile": 1609.344},
+    "mass": {"mg": 1e-6, "g": 0.001, "gram": 0.001, "kg": 1.0, "kilogram": 1.0, "lb": 0.45359237,
+             "pound": 0.45359237, "oz": 0.028349523125, "ounce": 0.028349523125},
+    "time": {"s": 1.0, "sec": 1.0, "second": 1.0, "min": 60.0, "minute": 60.0, "h": 3600.0, "hr": 3600.0,
+             "hour": 3600.0, "day": 86400.0, "week": 604800.0},
+}
+_TEMPERATURES = {"c": "C", "celsius": "C", "f": "F", "fahrenheit": "F", "k": "K", "kelvin": "K"}
+_CONVERSION = re.compile(
+    r"^(?:how many\s+(?P<to_first>[a-z]+)\s+(?:are\s+)?in\s+(?P<value_first>-?\d+(?:\.\d+)?)\s*(?P<from_first>°?[a-z]+)"
+    r"|(?P<value>-?\d+(?:\.\d+)?)\s*(?P<from>°?[a-z]+)\s+(?:to|in|into)\s+(?P<to>°?[a-z]+))$",
+    re.IGNORECASE
+)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+def _unit(name: str) -> Tuple[Optional[str], Optional[str]]:
+    """(dimension, canonical unit) for a unit name, or (None, None)."""
+    name = name.lower().lstrip("°")
+    if name in _TEMPERATURES:
+        return "temperature", _TEMPERATURES[name]
+    for candidate in (name, name[:-1] if name.endswith("s") else None, name[:-2] if name.endswith("es") else None):
+        if not candidate:
+            continue
+        for dimension, factors in _UNITS.items():
+            if candidate in factors:
+                return dimension, candidate
+    return None, None
+
+
+def _to_kelvin(value: float, unit: str) -> float:
+    return {"K": value, "C": value + 273.15, "F": (value - 32) * 5 / 9 + 273.15}[unit]
+
+
+def _from_kelvin(value: float, unit: str) -> float:
+    return {"K": value, "C": value - 273.15, "F": (value - 273.15) * 9 / 5 + 32}[unit]
+
+
+def format_number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return format(value, ".10g")
+
+
+class FastPath:
+    """Answers arithmetic, unit conversions and canned phrases locally, before routing.
+
+    Expressions are evaluated by walking a restricted AST (numbers, + - * / // % **, unary
+    signs and sqrt), never eval(); exponents and results are bounded. Canned answers match
+    the whole normalised query and can be extended with register() or a JSON file of
+    {"phrase": "answer"} named by FAST_PATH_ANSWERS.
+    """
+
+    def __init__(self, answers: Dict[Tuple[str, ...], str] = None, answers_file: str = None):
+        self.enabled = os.getenv("FAST_PATH", "on").lower() != "off"
+        self.answers: Dict[str, str] = {}
+        for phrases, answer in (answers or DEFAULT_ANSWERS).items():
+            self.register(phrases, answer)
+
+        answers_file = answers_file or os.getenv("FAST_PATH_ANSWERS")
+        if answers_file and os.path.exists(answers_file):
+            with open(answers_file) as f:
+                for phrase, answer in json.load(f).items():
+                    self.register([phrase], answer)
+
+        self.stats = {"hits": 0, "misses": 0, "arithmetic": 0, "conversion": 0, "canned": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, *stats: str):
+        # One FastPath serves every session's requests concurrently
+        with self._stats_lock:
+            for stat in stats:
+                self.stats[stat] += 1
+
+    def register(self, phrases: Iterable[str], answer: str):
+        for phrase in phrases:
+            self.answers[_normalize(phrase)] = answer
+
+    def answer(self, query: str) -> Optional[Dict[str, Any]]:
+        """A direct_agent result for query, or None when it needs the normal path."""
+        if not self.enabled or len(query) > 200:
+            return None
+
+        kind, response = "canned", self.answers.get(_normalize(query))
+        if response is None:
+            kind, response = "conversion", self._convert(query)
+        if response is None:
+            kind, response = "arithmetic", self._calculate(query)
+        if response is None:
+            self._count("misses")
+            return None
+
+        self._count("hits", kind)
+        return {
+            "success": True,
+            "response": response,
+            "agent": "direct_agent",
+            "fast_path": True
+        }
+
+    def _strip(self, query: str) -> str:
+        text = query.strip().rstrip("?.!= ").strip()
+        return _PREFIX.sub("", text).strip()
+
+    def _calculate(self, query: str) -> Optional[str]:
+        text = self._strip(query)
+        expression = text
+        for pattern, symbol in _WORDS:
+            expression = pattern.sub(f" {symbol} ", expression)
+        expression = " ".join(expression.split())
+        if not _EXPRESSION.match(expression) or not _OPERATOR.search(expression) or not re.search(r"\d", expression):
+            return None
+        if _BARE_CHAIN.match(text):
+            return None
+        # "sqrt 16" is written without parentheses in prose
+        expression = re.sub(r"sqrt\s*(\d+(?:\.\d+)?)", r"sqrt(\1)", expression)
+        try:
+            tree = ast.parse(expression, mode="eval").body
+            # A binary operation or a function call; a lone signed number ("-5") is not a question
+            if not any(isinstance(node, (ast.BinOp, ast.Call)) for node in ast.walk(tree)):
+                return None
+            value = self._evaluate(tree)
+        except (SyntaxError, ValueError, TypeError, ZeroDivisionError, OverflowError):
+            return None
+        return f"{text} = {format_number(value)}"
+
+    def _evaluate(self, node: ast.AST) -> float:
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            return _UNARY[type(node.op)](self._evaluate(node.operand))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            left, right = self._evaluate(node.left), self._evaluate(node.right)
+            if isinstance(node.op, ast.Pow) and abs(right) > MAX_EXPONENT:
+                raise ValueError("exponent too large")
+            value = _BINARY[type(node.op)](left, right)
+            if isinstance(value, complex) or abs(value) > MAX_MAGNITUDE:
+                raise ValueError("result out of range")
+            return value
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS
+                and len(node.args) == 1 and not node.keywords):
+            return _FUNCTIONS[node.func.id](self._evaluate(node.args[0]))
+        raise ValueError(f"unsupported expression: {type(node).__name__}")
+
+    def _convert(self, query: str) -> Optional[str]:
+        match = _CONVERSION.match(self._strip(query))
+        if not match:
+            return None
+        if match.group("value") is not None:
+            value, source, target = match.group("value"), match.group("from"), match.group("to")
+        else:
+            value, source, target = match.group("value_first"), match.group("from_first"), match.group("to_first")
+        value = float(value)
+        source_dimension, source_unit = _unit(source)
+        target_dimension, target_unit = _unit(target)
+        if source_dimension is None or source_dimension != target_dimension:
+            return None
+
+        if source_dimension == "temperature":
+            converted = _from_kelvin(_to_kelvin(value, source_unit), target_unit)
+        else:
+            factors = _UNITS[source_dimension]
+            converted = value * factors[source_unit] / factors[target_unit]
+        return f"{format_number(value)} {source} = {format_number(round(converted, 6))} {target}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        return dict(stats, enabled=self.enabled,
+                    hit_rate=round(stats["hits"] / lookups, 3) if lookups else 0.0)
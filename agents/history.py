@@ -0,0 +1,150 @@
+from typing import Dict, Any, List, Callable
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from agents.tokens import count_tokens, truncate_to_tokens
+
+
+class ConversationHistory:
+    """One conversation's turns plus a rolling summary of the turns folded out of them.
+
+    turns only holds turns that are not yet in summary; folding removes them from the front.
+    """
+
+    def __init__(self):
+        self.turns: List[Dict[str, Any]] = []
+        self.summary = ""
+        self.summarized_turns = 0
+        self.lock = threading.Lock()
+        self._folding = False
+
+    def __len__(self) -> int:
+        return self.summarized_turns + len(self.turns)
+
+
+class HistoryManager:
+    """Token-budgeted view of a ConversationHistory for building prompts.
+
+    The newest turns are replayed verbatim while they fit in token_budget (and max_turns);
+    older turns are folded into the summary by summarize(summary, turns) on a background
+    thread, so a request never waits on summarisation. Turns that have left the window but
+    are still being folded are left out of the prompt until the new summary lands.
+    """
+
+    def __init__(self, summarize: Callable[[str, List[Dict[str, Any]]], str], token_budget: int = None,
+                 summary_budget: int = None, max_turns: int = 10):
+        self.summarize = summarize
+        self.token_budget = token_budget or int(os.getenv("REASONING_HISTORY_TOKENS", "1500"))
+        self.summary_budget = summary_budget or int(os.getenv("REASONING_SUMMARY_TOKENS", "300"))
+        self.max_turns = max_turns
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self.stats = {"summaries": 0, "fallback_summaries": 0, "folded_turns": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat: str, amount: int = 1):
+        # Updated from the summary workers; read from request threads
+        with self._stats_lock:
+            self.stats[stat] += amount
+
+    def _turn_tokens(self, turn: Dict[str, Any]) -> int:
+        if "tokens" not in turn:
+            turn["tokens"] = count_tokens(turn["user"]) + count_tokens(turn["assistant"])
+        return turn["tokens"]
+
+    def _window_start(self, turns: List[Dict[str, Any]]) -> int:
+        """Index of the oldest turn that still fits; the newest turn is always kept."""
+        used = 0
+        start = len(turns)
+        while start > 0 and len(turns) - start < self.max_turns:
+            tokens = self._turn_tokens(turns[start - 1])
+            if used + tokens > self.token_budget and start < len(turns):
+                break
+            used += tokens
+            start -= 1
+        return start
+
+    def messages(self, history: ConversationHistory) -> List[Dict[str, str]]:
+        """Chat messages for the summary and the verbatim window, oldest first."""
+        with history.lock:
+            turns = list(history.turns)
+            summary = history.summary
+        start = self._window_start(turns)
+
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+        for index, turn in enumerate(turns[start:]):
+            assistant = turn["assistant"]
+            if index == 0 and turn["tokens"] > self.token_budget:
+                # A single oversized turn is cut down rather than blowing the budget
+                assistant = truncate_to_tokens(assistant, max(0, self.token_budget - count_tokens(turn["user"])))
+            messages.extend([
+                {"role": "user", "content": turn["user"]},
+                {"role": "assistant", "content": assistant}
+            ])
+        return messages
+
+    def append(self, history: ConversationHistory, user_input: str, response: str):
+        turn = {"user": user_input, "assistant": response}
+        self._turn_tokens(turn)
+        with history.lock:
+            history.turns.append(turn)
+            if history._folding or self._window_start(history.turns) == 0:
+                return
+            history._folding = True
+        future = self._executor.submit(self._fold, history)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+
+    def _fold(self, history: ConversationHistory):
+        while True:
+            with history.lock:
+                count = self._window_start(history.turns)
+                if count == 0:
+                    # Cleared under the lock, so an append racing with this sees it and schedules a fold
+                    history._folding = False
+                    return
+                folded = history.turns[:count]
+                summary = history.summary
+            try:
+                summary = self.summarize(summary, folded)
+                self._count("summaries")
+            except Exception as e:
+                print(f"History summarisation failed, using extract: {e}")
+                summary = self._extract(summary, folded)
+                self._count("fallback_summaries")
+            with history.lock:
+                # Only appends happen meanwhile, so the folded turns are still at the front
+                del history.turns[:count]
+                history.summary = truncate_to_tokens(summary, self.summary_budget)
+                history.summarized_turns += count
+            self._count("folded_turns", count)
+
+    def _extract(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        """Local fallback: the start of each folded turn, newest kept when over budget."""
+        lines = [f"User: {truncate_to_tokens(turn['user'], 30)} Assistant: {truncate_to_tokens(turn['assistant'], 30)}"
+                 for turn in turns]
+        while len(lines) > 1 and count_tokens(" ".join(lines)) > self.summary_budget:
+            lines.pop(0)
+        recent = " ".join(lines)
+        summary = truncate_to_tokens(summary, self.summary_budget - count_tokens(recent))
+        return f"{summary} {recent}" if summary else recent
+
+    def flush(self, timeout: float = None):
+        """Wait for the summaries already scheduled."""
+        with self._pending_lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return dict(stats, token_budget=self.token_budget, summary_budget=self.summary_budget)
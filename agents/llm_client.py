@@ -0,0 +1,228 @@
+from typing import Dict, Any
+import asyncio
+import importlib.util
+import inspect
+import os
+import threading
+import weakref
+import httpx
+from groq import Groq, AsyncGroq, DefaultHttpxClient, DefaultAsyncHttpxClient
+from agents.tracing import tracer
+
+# One Groq client per process (and one async client per event loop), shared by every agent,
+# so all completions reuse a single keep-alive connection pool.
+_client = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGroq]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_stats = {"clients_created": 0, "async_clients_created": 0, "warmed_up": False}
+
+
+def _api_key() -> str:
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable is not set")
+    return api_key
+
+
+def _http2_enabled() -> bool:
+    setting = os.getenv("GROQ_HTTP2", "auto").lower()
+    if setting == "off":
+        return False
+    # httpx only speaks HTTP/2 when the optional h2 package is installed
+    return importlib.util.find_spec("h2") is not None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("GROQ_MAX_CONNECTIONS", "128")),
+        max_keepalive_connections=int(os.getenv("GROQ_POOL_SIZE", "64")),
+        keepalive_expiry=float(os.getenv("GROQ_KEEPALIVE_SECONDS", "60"))
+    )
+
+
+def _usage_attributes(usage: Any) -> Dict[str, Any]:
+    if usage is None:
+        return {}
+    return {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+
+
+def _chunk_usage(chunk: Any) -> Any:
+    # Groq sends usage on the final chunk, under x_groq; OpenAI-style streams put it on the chunk
+    x_groq = getattr(chunk, "x_groq", None)
+    return getattr(x_groq, "usage", None) or getattr(chunk, "usage", None)
+
+
+class _TracedStream:
+    """Wraps a streaming response so its llm.completion span covers the whole stream.
+
+    The span ends when the stream is exhausted, closed or abandoned, with ttft_ms (time to
+    the first chunk) and, when the final chunk carries them, token counts.
+    """
+
+    def __init__(self, stream: Any, span):
+        self._stream = stream
+        self._span = span
+        self._ended = False
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+    def _observe(self, chunk: Any, first: bool):
+        if first:
+            self._span.set(ttft_ms=round(self._span.elapsed() * 1000, 3))
+        self._span.set(**_usage_attributes(_chunk_usage(chunk)))
+
+    def _end(self, error: str = None):
+        if not self._ended:
+            self._ended = True
+            tracer.end_span(self._span, error=error)
+
+    def __iter__(self):
+        first = True
+        try:
+            for chunk in self._stream:
+                self._observe(chunk, first)
+                first = False
+                yield chunk
+        except Exception as e:
+            self._end(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self._end()
+
+    async def __aiter__(self):
+        first = True
+        try:
+            async for chunk in self._stream:
+                self._observe(chunk, first)
+                first = False
+                yield chunk
+        except Exception as e:
+            self._end(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            self._end()
+
+
+def instrument_client(client):
+    """Record every chat completion as an llm.completion span.
+
+    A blocking completion's span covers the request; a stream's covers the whole stream and
+    records ttft_ms (see _TracedStream).
+    """
+    completions = client.chat.completions
+    create = completions.create
+    if getattr(create, "_traced", False):
+        return client
+
+    def attributes(request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"model": request.get("model"), "stream": bool(request.get("stream"))}
+
+    if inspect.iscoroutinefunction(create):
+        async def traced_create(**request):
+            if request.get("stream") and tracer.enabled:
+                span = tracer.start_span("llm.completion", **attributes(request))
+                try:
+                    return _TracedStream(await create(**request), span)
+                except Exception as e:
+                    tracer.end_span(span, error=f"{type(e).__name__}: {e}")
+                    raise
+            with tracer.span("llm.completion", **attributes(request)) as span:
+                response = await create(**request)
+                span.set(**_usage_attributes(getattr(response, "usage", None)))
+                return response
+    else:
+        def traced_create(**request):
+            if request.get("stream") and tracer.enabled:
+                span = tracer.start_span("llm.completion", **attributes(request))
+                try:
+                    return _TracedStream(create(**request), span)
+                except Exception as e:
+                    tracer.end_span(span, error=f"{type(e).__name__}: {e}")
+                    raise
+            with tracer.span("llm.completion", **attributes(request)) as span:
+                response = create(**request)
+                span.set(**_usage_attributes(getattr(response, "usage", None)))
+                return response
+    traced_create._traced = True
+    completions.create = traced_create
+    return client
+
+
+def get_client() -> Groq:
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                http_client = DefaultHttpxClient(limits=_limits(), http2=_http2_enabled())
+                _client = instrument_client(Groq(api_key=_api_key(), http_client=http_client))
+                _stats["clients_created"] += 1
+                if os.getenv("GROQ_WARMUP", "on").lower() != "off":
+                    # In the background, so startup never waits on the network
+                    threading.Thread(target=warm_up, args=(_client,), daemon=True).start()
+    return _client
+
+
+def get_async_client() -> AsyncGroq:
+    """Async client for the running event loop; httpx async pools cannot be shared across loops."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        with _lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                http_client = DefaultAsyncHttpxClient(limits=_limits(), http2=_http2_enabled())
+                client = instrument_client(AsyncGroq(api_key=_api_key(), http_client=http_client))
+                _async_clients[loop] = client
+                _stats["async_clients_created"] += 1
+    return client
+
+
+def warm_up(client: Groq = None) -> bool:
+    """Open a pooled connection (TCP + TLS) ahead of the first completion."""
+    client = client or get_client()
+    try:
+        client._client.head(str(client.base_url), timeout=5)
+        _stats["warmed_up"] = True
+        return True
+    except Exception as e:
+        print(f"LLM client warm-up failed: {e}")
+        return False
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client: AsyncGroq):
+    """Close client's connection pool on the loop it belongs to, wherever that loop is."""
+    if loop.is_closed():
+        # Nothing can run on it any more; its transports went with it
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        # Called from a coroutine on that loop: close once the caller yields
+        task = loop.create_task(client.close())
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.close(), loop)
+    else:
+        loop.run_until_complete(client.close())
+
+
+def reset_clients():
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        async_clients = list(_async_clients.items())
+        _async_clients.clear()
+    for loop, client in async_clients:
+        try:
+            _close_async_client(loop, client)
+        except Exception as e:
+            print(f"Closing async LLM client failed: {e}")
+
+
+def get_client_stats() -> Dict[str, Any]:
+    return dict(_stats, http2=_http2_enabled(), pool_size=_limits().max_keepalive_connections)
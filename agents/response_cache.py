@@ -0,0 +1,163 @@
+from typing import Dict, Any, Callable, Optional, Iterable
+from collections import OrderedDict
+import os
+import re
+import threading
+import time
+import numpy as np
+from agents.vector_index import IncrementalTfidfIndex
+
+_CONTRACTIONS = {
+    "what's": "what is", "who's": "who is", "where's": "where is", "how's": "how is",
+    "it's": "it is", "that's": "that is", "there's": "there is", "i'm": "i am",
+    "can't": "cannot", "don't": "do not", "doesn't": "does not", "isn't": "is not",
+}
+_PUNCTUATION = re.compile(r"[^\w\s+\-*/.%]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    text = text.lower().replace("’", "'")
+    for contraction, expanded in _CONTRACTIONS.items():
+        text = text.replace(contraction, expanded)
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip(" .")
+
+
+class _RouteCache:
+    def __init__(self):
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.index = IncrementalTfidfIndex(n_features=2 ** 16, ngram_range=(1, 2), stop_words=None)
+        self.index_keys = []
+
+    def add_key(self, key: str):
+        self.index.add(key)
+        self.index_keys.append(key)
+
+    def similar_key(self, key: str, threshold: float) -> Optional[str]:
+        # Evicted and expired keys stay in the index (a match on one is just a miss) until it has
+        # grown well past the live entries; rebuilding on every eviction would rebuild on nearly
+        # every put once the cache is full
+        if len(self.index_keys) > 2 * len(self.entries) + 16:
+            self.index_keys = list(self.entries.keys())
+            self.index.rebuild(self.index_keys)
+        if not self.index_keys:
+            return None
+        similarities = self.index.similarities(key)
+        best = int(np.argmax(similarities))
+        return self.index_keys[best] if similarities[best] >= threshold else None
+
+
+class ResponseCache:
+    """LRU + TTL cache of agent responses, scoped per route.
+
+    Lookups match on normalised query text and, when similarity_threshold is set, fall back to
+    the nearest cached query by TF-IDF cosine similarity. Entries carry a version (e.g. the RAG
+    corpus version) and are discarded once it no longer matches.
+    """
+
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None, similarity_threshold: float = None,
+                 cacheable_routes: Iterable[str] = ('direct', 'knowledge', 'rag')):
+        self.max_entries = max_entries or int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+        if similarity_threshold is None:
+            similarity_threshold = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0"))
+        self.similarity_threshold = similarity_threshold
+        self.cacheable_routes = set(cacheable_routes)
+        self.enabled = os.getenv("RESPONSE_CACHE", "on").lower() != "off"
+
+        self._routes: Dict[str, _RouteCache] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def is_cacheable(self, route: str) -> bool:
+        return self.enabled and route in self.cacheable_routes
+
+    def get(self, route: str, query: str, version: Any = None) -> Optional[Dict[str, Any]]:
+        if not self.is_cacheable(route):
+            return None
+
+        key = normalize_query(query)
+        with self._lock:
+            cache = self._routes.get(route)
+            entry = self._lookup(cache, key, version) if cache else None
+            if entry is None and cache and self.similarity_threshold > 0:
+                similar = cache.similar_key(key, self.similarity_threshold)
+                entry = self._lookup(cache, similar, version) if similar else None
+                if entry is not None:
+                    self.similar_hits += 1
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.saved_seconds += entry['latency']
+            return dict(entry['result'])
+
+    def find(self, query: str, version_for: Callable[[str], Any]) -> Optional[Dict[str, Any]]:
+        """Exact-match lookup across all routes, used before routing to skip the router too."""
+        if not self.enabled:
+            return None
+
+        key = normalize_query(query)
+        with self._lock:
+            for route, cache in self._routes.items():
+                entry = self._lookup(cache, key, version_for(route))
+                if entry is not None:
+                    self.hits += 1
+                    self.saved_seconds += entry['latency']
+                    return dict(entry['result'])
+        return None
+
+    def _lookup(self, cache: _RouteCache, key: str, version: Any) -> Optional[Dict[str, Any]]:
+        entry = cache.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry['created'] > self.ttl_seconds or entry['version'] != version:
+            del cache.entries[key]
+            return None
+        cache.entries.move_to_end(key)
+        return entry
+
+    def put(self, route: str, query: str, result: Dict[str, Any], latency: float, version: Any = None):
+        if not self.is_cacheable(route):
+            return
+
+        key = normalize_query(query)
+        with self._lock:
+            cache = self._routes.setdefault(route, _RouteCache())
+            if key not in cache.entries:
+                cache.add_key(key)
+            cache.entries[key] = {
+                'result': dict(result),
+                'created': time.time(),
+                'latency': latency,
+                'version': version
+            }
+            cache.entries.move_to_end(key)
+            while len(cache.entries) > self.max_entries:
+                cache.entries.popitem(last=False)
+
+    def invalidate(self, route: str = None):
+        with self._lock:
+            if route is None:
+                self._routes.clear()
+            else:
+                self._routes.pop(route, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": {route: len(cache.entries) for route, cache in self._routes.items()},
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "saved_latency_seconds": round(self.saved_seconds, 3)
+            }
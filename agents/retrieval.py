@@ -0,0 +1,83 @@
+from typing import Any, Callable, Hashable, List, Sequence, Tuple
+from collections import OrderedDict
+import os
+import threading
+import numpy as np
+import scipy.sparse as sp
+
+
+def normalize_rows(matrix, dtype=np.float32):
+    """L2-normalise rows once at index time, so cosine similarity is a plain dot product."""
+    if sp.issparse(matrix):
+        matrix = sp.csr_matrix(matrix, dtype=dtype)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sp.csr_matrix(sp.diags(1.0 / norms).dot(matrix), dtype=dtype)
+    matrix = np.asarray(matrix, dtype=dtype)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def select_top_k(scores: np.ndarray, k: int, threshold: float = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and scores of the k best entries above threshold, best first, in O(n + k log k)."""
+    if threshold is not None:
+        candidates = np.flatnonzero(scores > threshold)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    elif len(scores) > k:
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return order, scores[order]
+
+
+class QueryVectorCache:
+    """Thread-safe LRU of query vectors, so repeated queries skip the vectorizer transform."""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or int(os.getenv("RETRIEVAL_QUERY_CACHE_SIZE", "1024"))
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Sequence[Hashable], compute: Callable[[List[Hashable]], Sequence[Any]]) -> List[Any]:
+        """Cached values for keys; misses are computed together in one compute(missing_keys) call."""
+        values = [None] * len(keys)
+        missing = {}
+        with self._lock:
+            for position, key in enumerate(keys):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    values[position] = self._entries[key]
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(position)
+            self.misses += len(missing)
+
+        if missing:
+            computed = compute(list(missing))
+            with self._lock:
+                for (key, positions), value in zip(missing.items(), computed):
+                    for position in positions:
+                        values[position] = value
+                    self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
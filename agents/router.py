@@ -0,0 +1,157 @@
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import re
+import pickle
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+ROUTES = ['direct', 'knowledge', 'reasoning', 'memory', 'rag']
+
+# A whole arithmetic question: "15 + 27", "what is 144 divided by 12?". "-" and "/" need spaces
+# around them, so phone numbers, dates and ranges ("555-1234", "1990-05-12", "3.10-3.12") do not
+# count as arithmetic
+_NUMBER = r"-?\d+(\.\d+)?"
+_OPERATOR = r"(\s*[+*×÷]\s*|\s+(-|/|x|plus|minus|times|divided by|multiplied by|over)\s+)"
+ARITHMETIC = rf"^\s*((what|how much)(\s+is|'s)|calculate|compute|evaluate)?\s*{_NUMBER}({_OPERATOR}{_NUMBER})+\s*[?=.!]*\s*$"
+
+DEFAULT_RULES = [
+    # Arithmetic and greetings never need a model to decide
+    (ARITHMETIC, 'direct', 0.95),
+    (r"^\s*(hi|hello|hey|good (morning|afternoon|evening)|thanks|thank you)\b", 'direct', 0.9),
+    (r"\b(remember|recall|forget)\b", 'memory', 0.9),
+    (r"\b(my name|what'?s my|what is my|where do i|who am i|about me|i live|i work|my favou?rite)\b", 'memory', 0.85),
+    (r"\b(knowledge base|documents?|search (the|my|our)|according to the)\b", 'rag', 0.85),
+    (r"\b(analy[sz]e|pros and cons|step[- ]by[- ]step|trade-?offs?|what would be the impact|should (i|we|a|an))\b", 'reasoning', 0.8),
+    (r"^\s*(explain|describe)\b|\bin detail\b|\bprinciples of\b|\bhistor(y|ical)\b", 'knowledge', 0.75),
+]
+
+
+def normalize_route(label: str) -> Optional[str]:
+    if not label:
+        return None
+    label = label.strip().lower()
+    if label.endswith('_agent'):
+        label = label[:-len('_agent')]
+    return label if label in ROUTES else None
+
+
+class LocalRouter:
+    """Zero-LLM router: regex rules first, then a TF-IDF + logistic regression classifier."""
+
+    def __init__(self, model_file: str = "router_model.pkl", confidence_threshold: float = None):
+        if confidence_threshold is None:
+            confidence_threshold = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.6"))
+        self.confidence_threshold = confidence_threshold
+        self.model_file = model_file
+        self.rules: List[Tuple[re.Pattern, str, float]] = []
+        self.classifier: Optional[Pipeline] = None
+        self.min_training_samples = 20
+
+        for pattern, route, confidence in DEFAULT_RULES:
+            self.add_rule(pattern, route, confidence)
+
+        self._load_model()
+
+    def add_rule(self, pattern: str, route: str, confidence: float = 0.9):
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route: {route}")
+        self.rules.append((re.compile(pattern, re.IGNORECASE), route, confidence))
+
+    def _load_model(self):
+        try:
+            if os.path.exists(self.model_file):
+                with open(self.model_file, 'rb') as f:
+                    self.classifier = pickle.load(f)
+                print("Loaded local routing model")
+        except Exception as e:
+            print(f"Router model loading failed: {e}")
+            self.classifier = None
+
+    def _save_model(self):
+        try:
+            with open(self.model_file, 'wb') as f:
+                pickle.dump(self.classifier, f)
+        except Exception as e:
+            print(f"Router model saving failed: {e}")
+
+    def _match_rules(self, user_input: str) -> Optional[Tuple[str, float]]:
+        for pattern, route, confidence in self.rules:
+            if pattern.search(user_input):
+                return route, confidence
+        return None
+
+    def matching_routes(self, user_input: str) -> List[str]:
+        """Every route with a matching rule, in rule order; used to spot questions that span routes."""
+        routes = []
+        for pattern, route, _ in self.rules:
+            if route not in routes and pattern.search(user_input):
+                routes.append(route)
+        return routes
+
+    def _classify(self, user_input: str) -> Optional[Tuple[str, float]]:
+        if self.classifier is None:
+            return None
+        probabilities = self.classifier.predict_proba([user_input])[0]
+        best = int(np.argmax(probabilities))
+        return str(self.classifier.classes_[best]), float(probabilities[best])
+
+    def route(self, user_input: str) -> Tuple[str, float]:
+        """Return (route, confidence). Confidence 0.0 means the router has no opinion."""
+        rule_match = self._match_rules(user_input)
+        predicted = self._classify(user_input)
+
+        if rule_match and predicted:
+            if rule_match[0] == predicted[0]:
+                return rule_match[0], max(rule_match[1], predicted[1])
+            return max(rule_match, predicted, key=lambda match: match[1])
+        if rule_match:
+            return rule_match
+        if predicted:
+            return predicted
+        return 'direct', 0.0
+
+    def is_confident(self, confidence: float) -> bool:
+        return confidence >= self.confidence_threshold
+
+    def train(self, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+        samples = [(text, normalize_route(label)) for text, label in zip(texts, labels)]
+        samples = [(text, label) for text, label in samples if text and label]
+
+        if len(samples) < self.min_training_samples:
+            return {"trained": False, "reason": f"need at least {self.min_training_samples} samples, got {len(samples)}"}
+        if len({label for _, label in samples}) < 2:
+            return {"trained": False, "reason": "need at least two distinct routes"}
+
+        classifier = Pipeline([
+            ('tfidf', TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=1)),
+            ('clf', LogisticRegression(max_iter=1000, class_weight='balanced'))
+        ])
+        classifier.fit([text for text, _ in samples], [label for _, label in samples])
+
+        self.classifier = classifier
+        self._save_model()
+        return {"trained": True, "samples": len(samples), "routes": sorted(str(route) for route in classifier.classes_)}
+
+    def train_from_db(self, limit: int = 50000) -> Dict[str, Any]:
+        from db.database import load_routing_history
+
+        history = load_routing_history(limit=limit)
+        return self.train([row[0] for row in history], [row[1] for row in history])
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the local router from chat_interactions history")
+    parser.add_argument("--limit", type=int, default=50000)
+    parser.add_argument("--model-file", default="router_model.pkl")
+    args = parser.parse_args()
+
+    router = LocalRouter(model_file=args.model_file)
+    print(router.train_from_db(limit=args.limit))
+
+
+if __name__ == "__main__":
+    main()
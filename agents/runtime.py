@@ -0,0 +1,33 @@
+from typing import Optional
+import threading
+import uuid
+from agents.history import ConversationHistory
+
+_team_agent = None
+_team_agent_lock = threading.Lock()
+
+
+class SessionState:
+    """Per-conversation state. Everything heavy lives in the shared TeamAgent instead."""
+
+    def __init__(self, session_id: str = None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.reasoning_history = ConversationHistory()
+        self.last_route: Optional[str] = None
+
+
+def get_team_agent():
+    """Return the process-wide TeamAgent, building it on first use."""
+    global _team_agent
+    if _team_agent is None:
+        with _team_agent_lock:
+            if _team_agent is None:
+                from agents.team_agent import TeamAgent
+                _team_agent = TeamAgent()
+    return _team_agent
+
+
+def reset_team_agent():
+    global _team_agent
+    with _team_agent_lock:
+        _team_agent = None
@@ -0,0 +1,149 @@
+from typing import Dict, Any, List, Iterable, Tuple
+import os
+import json
+import hashlib
+import shutil
+import numpy as np
+
+
+def content_hash(texts: Iterable[str]) -> str:
+    """Stable digest of a corpus, used to tell whether persisted model state still matches it."""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode('utf-8', errors='ignore'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class RecordLog:
+    """Append-only record log with periodic snapshot compaction.
+
+    Layout of a store directory:
+        CURRENT                 name of the live snapshot generation
+        snapshot-<gen>/         records.jsonl, meta.json and one .npy file per array
+        log-<gen>.jsonl         records appended since that snapshot
+
+    Appending a record is a single line write. compact() writes a new generation next to
+    the old one and switches CURRENT atomically, so a crash mid-compaction leaves the
+    previous snapshot and log intact. Arrays are loaded with np.load(mmap_mode='r').
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.generation = 0
+        self.log_records = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._read_current()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _snapshot_dir(self, generation: int) -> str:
+        return self._path(f"snapshot-{generation}")
+
+    def _log_file(self, generation: int) -> str:
+        return self._path(f"log-{generation}.jsonl")
+
+    def _read_current(self):
+        current = self._path("CURRENT")
+        if os.path.exists(current):
+            with open(current) as f:
+                self.generation = int(f.read().strip() or 0)
+
+    def exists(self) -> bool:
+        return os.path.exists(self._path("CURRENT"))
+
+    def _read_jsonl(self, path: str) -> List[Dict[str, Any]]:
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-append is dropped
+                    print(f"Skipping corrupt record in {path}")
+        return records
+
+    def load_records(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return (snapshot_records, log_records)."""
+        snapshot = self._read_jsonl(os.path.join(self._snapshot_dir(self.generation), "records.jsonl"))
+        log = self._read_jsonl(self._log_file(self.generation))
+        self.log_records = len(log)
+        return snapshot, log
+
+    def load_meta(self) -> Dict[str, Any]:
+        path = os.path.join(self._snapshot_dir(self.generation), "meta.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def load_arrays(self, mmap: bool = True) -> Dict[str, np.ndarray]:
+        snapshot_dir = self._snapshot_dir(self.generation)
+        arrays = {}
+        if not os.path.isdir(snapshot_dir):
+            return arrays
+        for name in os.listdir(snapshot_dir):
+            if name.endswith('.npy'):
+                arrays[name[:-4]] = np.load(os.path.join(snapshot_dir, name),
+                                            mmap_mode='r' if mmap else None, allow_pickle=False)
+        return arrays
+
+    def append(self, record: Dict[str, Any]):
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]):
+        lines = [json.dumps(record, default=str) + "\n" for record in records]
+        if not lines:
+            return
+        if not self.exists():
+            self.compact([])
+        with open(self._log_file(self.generation), 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+        self.log_records += len(lines)
+
+    def compact(self, records: List[Dict[str, Any]], arrays: Dict[str, np.ndarray] = None,
+                meta: Dict[str, Any] = None):
+        """Replace snapshot and log with the given full state."""
+        generation = self.generation + 1
+        snapshot_dir = self._snapshot_dir(generation)
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        os.makedirs(snapshot_dir)
+
+        with open(os.path.join(snapshot_dir, "records.jsonl"), 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        for name, array in (arrays or {}).items():
+            np.save(os.path.join(snapshot_dir, f"{name}.npy"), np.asarray(array), allow_pickle=False)
+        with open(os.path.join(snapshot_dir, "meta.json"), 'w') as f:
+            json.dump(dict(meta or {}, records=len(records)), f)
+
+        tmp_current = self._path("CURRENT.tmp")
+        with open(tmp_current, 'w') as f:
+            f.write(str(generation))
+        os.replace(tmp_current, self._path("CURRENT"))
+
+        self.generation = generation
+        self.log_records = 0
+        self._remove_stale_generations()
+
+    def _remove_stale_generations(self):
+        # Files still memory-mapped elsewhere may refuse deletion (Windows); retry next compaction
+        live = {f"snapshot-{self.generation}", f"log-{self.generation}.jsonl"}
+        for name in os.listdir(self.directory):
+            if name in live or not name.startswith(("snapshot-", "log-")):
+                continue
+            path = self._path(name)
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,35 @@
+from typing import Dict, Any, Iterator
+
+
+def stream_completion(client, **request) -> Iterator[str]:
+    """Yield content deltas from a streaming chat completion."""
+    stream = client.chat.completions.create(stream=True, **request)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+def stream_events(client, request: Dict[str, Any], result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Streaming counterpart of an agent's process().
+
+    Yields {"type": "delta", "content": ...} events as tokens arrive, then one
+    {"type": "done", ...} event carrying `result` plus the full response text.
+    """
+    parts = []
+    for delta in stream_completion(client, **request):
+        parts.append(delta)
+        yield {"type": "delta", "content": delta}
+    yield dict(result, type="done", response="".join(parts))
+
+
+def collect_response(events: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drain a stream and return its final event, i.e. what process() would have returned."""
+    final = {}
+    for event in events:
+        if event.get("type") == "done":
+            final = event
+    final.pop("type", None)
+    return final
@@ -1,30 +1,213 @@
-from typing import Dict, Any
-from groq import Groq
+from typing import Dict, Any, Iterator, Optional, Tuple, List, Callable
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from agents.llm_client import get_client, get_async_client, get_client_stats
 from agents.agent1_direct import DirectAgent
 from agents.agent2_knowledge import KnowledgeAgent
 from agents.agent3_reasoning import ReasoningAgent
+from agents.history import ConversationHistory
 from agents.agent4_memory import MemoryAgent
 from agents.agent5_rag import RAGAgent
+from agents.router import LocalRouter, ROUTES
+from agents.runtime import SessionState
+from agents.response_cache import ResponseCache
+from agents.fast_path import FastPath
+from agents.fanout import FanOutRetriever
+from agents.streaming import stream_events
+from agents.tracing import tracer
 
 class TeamAgent:
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        
-        self.client = Groq(api_key=api_key)
+        self.client = get_client()
         self.model = "qwen-qwq-32b"
         
         self.direct_agent = DirectAgent()
-        self.knowledge_agent = KnowledgeAgent()
+        self.rag_agent = RAGAgent()
+        # Knowledge answers are grounded in the RAG agent's index, searched in place rather than rebuilt
+        self.knowledge_agent = KnowledgeAgent(index=self.rag_agent.read_only_view())
         self.reasoning_agent = ReasoningAgent()
         self.memory_agent = MemoryAgent()
-        self.rag_agent = RAGAgent()
+        
+        self.router = LocalRouter()
+        self.routing_stats = {"local": 0, "llm": 0}
+        self.response_cache = ResponseCache()
+        self.fast_path = FastPath()
+        
+        # Questions that need both memory and knowledge base context get one completion over both
+        self.fanout_mode = os.getenv("FANOUT_MODE", "auto").lower()
+        self.fanout = FanOutRetriever({
+            "memory": self.memory_agent._retrieve_relevant_memories,
+            "rag": lambda query: self.rag_agent._pack_context(self.rag_agent._retrieve_relevant_chunks(query))
+        })
+        
+        # Speculative routing: while the LLM router decides, the most likely agent already runs
+        self.speculative = os.getenv("SPECULATIVE_ROUTING", "off").lower() == "on"
+        self.speculation_stats = {"attempts": 0, "hits": 0, "misses": 0}
+        # One TeamAgent serves every session's threads and event loop, so counters are locked
+        self._stats_lock = threading.Lock()
         
         print("Team Agent initialized with 5 specialized agents")
 
+    def _fast_path(self, user_input: str, session: SessionState = None) -> Optional[Dict[str, Any]]:
+        """Arithmetic and canned answers, returned without routing or an LLM call."""
+        result = self.fast_path.answer(user_input)
+        if result is not None:
+            result['route'] = 'direct'
+            if session is not None:
+                session.last_route = 'direct'
+        return result
+
+    def _should_fan_out(self, user_input: str) -> bool:
+        if self.fanout_mode == "off":
+            return False
+        return {'memory', 'rag'} <= set(self.router.matching_routes(user_input))
+
+    def _fanout_request(self, user_input: str, contexts: Dict[str, List[Dict]]) -> Dict[str, Any]:
+        context = ""
+        if contexts.get('memory'):
+            context += "\nRelevant memories:\n"
+            for i, memory in enumerate(contexts['memory']):
+                context += f"{i+1}. {memory['content']}\n"
+        if contexts.get('rag'):
+            context += "\nRelevant knowledge:\n"
+            for i, chunk in enumerate(contexts['rag']):
+                context += f"{i+1}. {chunk['line']}\n"
+        
+        system_prompt = f"""You are a personal knowledge assistant for Mann Gupta in Bangalore, India.
+{context}
+Answer using what you know about the user together with the knowledge base, where each applies.
+
+User question: {user_input}"""
+        
+        return {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system_prompt}],
+            "temperature": 0.7,
+            "max_tokens": 800
+        }
+
+    def _fanout_result(self, contexts: Dict[str, List[Dict]], report: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "agent": "fanout",
+            "route": "fanout",
+            "sources": report,
+            "memories_used": len(contexts.get('memory', [])),
+            "knowledge_chunks_used": len(contexts.get('rag', []))
+        }
+
+    def _finish_fanout(self, user_input: str):
+        # The same storage rule the memory route applies
+        if self.memory_agent._should_store(user_input):
+            self.memory_agent._store_memory(user_input, "user_statement")
+        self.memory_agent._maybe_compact()
+
+    def _process_fanout(self, user_input: str) -> Dict[str, Any]:
+        """Memory and RAG retrieval concurrently under the fan-out deadline, then one completion."""
+        contexts, report = self.fanout.gather(user_input)
+        try:
+            response = self.client.chat.completions.create(**self._fanout_request(user_input, contexts))
+            result = dict(self._fanout_result(contexts, report), response=response.choices[0].message.content)
+        except Exception as e:
+            return {"response": f"Fan-out processing failed: {str(e)}", "agent": "fanout", "route": "fanout",
+                    "sources": report, "error": True}
+        self._finish_fanout(user_input)
+        return result
+
+    async def _aprocess_fanout(self, user_input: str) -> Dict[str, Any]:
+        contexts, report = await self.fanout.agather(user_input)
+        try:
+            response = await get_async_client().chat.completions.create(**self._fanout_request(user_input, contexts))
+            result = dict(self._fanout_result(contexts, report), response=response.choices[0].message.content)
+        except Exception as e:
+            return {"response": f"Fan-out processing failed: {str(e)}", "agent": "fanout", "route": "fanout",
+                    "sources": report, "error": True}
+        await asyncio.to_thread(self._finish_fanout, user_input)
+        return result
+
     def _route_request(self, user_input: str) -> str:
+        with tracer.span("route") as span:
+            route, confidence = self.router.route(user_input)
+            
+            if self.router.is_confident(confidence):
+                self._count(self.routing_stats, "local")
+                span.set(route=route, method="local")
+                return route
+            
+            self._count(self.routing_stats, "llm")
+            route = self._llm_route(user_input)
+            span.set(route=route, method="llm")
+            return route
+
+    async def _aroute_request(self, user_input: str, session: SessionState = None) -> Tuple[str, Optional[Tuple[str, asyncio.Task]]]:
+        """Return (route, speculation); speculation is (guessed route, task) when one was started."""
+        with tracer.span("route") as span:
+            route, confidence = self.router.route(user_input)
+            
+            if self.router.is_confident(confidence):
+                self._count(self.routing_stats, "local")
+                span.set(route=route, method="local")
+                return route, None
+            
+            self._count(self.routing_stats, "llm")
+            speculation = None
+            if self.speculative:
+                guess = self._speculative_prior(route, confidence, session)
+                task = asyncio.create_task(self._aspeculate(guess, user_input, session))
+                # Retrieve the exception of an abandoned task so it is not reported as unhandled
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                speculation = (guess, task)
+            
+            try:
+                response = await get_async_client().chat.completions.create(**self._llm_route_request(user_input))
+                route = self._parse_route(response.choices[0].message.content)
+            except Exception as e:
+                print(f"Routing failed: {e}")
+                route = 'direct'
+            span.set(route=route, method="llm", speculated=speculation[0] if speculation else None)
+            return route, speculation
+
+    def _count(self, stats: Dict[str, int], key: str):
+        with self._stats_lock:
+            stats[key] += 1
+
+    def _speculative_prior(self, route: str, confidence: float, session: SessionState = None) -> str:
+        # The local router's low-confidence guess, else the conversation's last route
+        if confidence > 0:
+            return route
+        if session is not None and session.last_route:
+            return session.last_route
+        return route
+
+    async def _aspeculate(self, route: str, user_input: str, session: SessionState = None):
+        """Run an agent with its side effects held back; returns (result, commit)."""
+        if route == 'memory':
+            return await self.memory_agent.aspeculate(user_input)
+        if route == 'reasoning':
+            history = session.reasoning_history if session is not None else None
+            return await self.reasoning_agent.aspeculate(user_input, history=history)
+        return await self._adispatch(route, user_input, session), lambda: None
+
+    async def _resolve_speculation(self, route: str, speculation: Tuple[str, asyncio.Task]) -> Optional[Dict[str, Any]]:
+        guess, task = speculation
+        self._count(self.speculation_stats, "attempts")
+        if guess != route:
+            task.cancel()
+            self._count(self.speculation_stats, "misses")
+            return None
+        
+        try:
+            result, commit = await task
+        except Exception:
+            self._count(self.speculation_stats, "misses")
+            return None
+        self._count(self.speculation_stats, "hits")
+        await asyncio.to_thread(commit)
+        return result
+
+    def _llm_route_request(self, user_input: str) -> Dict[str, Any]:
         system_prompt = """You are a routing system for an AI team. Route requests to the most appropriate agent:
 
 - direct: Simple calculations, basic facts, greetings, direct questions
@@ -35,47 +218,242 @@ class TeamAgent:
 
 Respond with only one word: direct, knowledge, reasoning, memory, or rag"""
 
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_input}
+            ],
+            "temperature": 0.1,
+            "max_tokens": 10
+        }
+
+    def _parse_route(self, content: str) -> str:
+        route = content.strip().lower()
+        
+        if route not in ROUTES:
+            route = 'direct'
+        
+        return route
+
+    def _llm_route(self, user_input: str) -> str:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_input}
-                ],
-                temperature=0.1,
-                max_tokens=10
-            )
-            
-            route = response.choices[0].message.content.strip().lower()
-            
-            if route not in ['direct', 'knowledge', 'reasoning', 'memory', 'rag']:
-                route = 'direct'
-            
-            return route
+            response = self.client.chat.completions.create(**self._llm_route_request(user_input))
+            return self._parse_route(response.choices[0].message.content)
             
         except Exception as e:
             print(f"Routing failed: {e}")
             return 'direct'
 
-    def process(self, user_input: str) -> Dict[str, Any]:
+    def _result_attributes(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "route": result.get('route'),
+            "agent": result.get('agent'),
+            "cache_hit": bool(result.get('cached')),
+            "fast_path": bool(result.get('fast_path')),
+            "memories_used": result.get('memories_used'),
+            "knowledge_chunks_used": result.get('knowledge_chunks_used'),
+            "error": bool(result.get('error')) or result.get('success', True) is False
+        }
+
+    def process(self, user_input: str, session: SessionState = None) -> Dict[str, Any]:
+        with tracer.span("team.process") as span:
+            result = self._process(user_input, session)
+            span.set(**self._result_attributes(result))
+            return result
+
+    def _process(self, user_input: str, session: SessionState = None) -> Dict[str, Any]:
         try:
+            fast = self._fast_path(user_input, session)
+            if fast is not None:
+                return fast
+            
+            if self._should_fan_out(user_input):
+                return self._process_fanout(user_input)
+            
+            cached = self.response_cache.find(user_input, self._cache_version)
+            if cached is not None:
+                cached['cached'] = True
+                if session is not None:
+                    session.last_route = cached.get('route')
+                return cached
+            
             route = self._route_request(user_input)
+            if session is not None:
+                session.last_route = route
             
-            if route == 'direct':
-                result = self.direct_agent.process(user_input)
-            elif route == 'knowledge':
-                result = self.knowledge_agent.process(user_input)
-            elif route == 'reasoning':
-                result = self.reasoning_agent.process(user_input)
-            elif route == 'memory':
-                result = self.memory_agent.process(user_input)
-            elif route == 'rag':
-                result = self.rag_agent.process(user_input)
-            else:
-                result = self.direct_agent.process(user_input)
+            cache_version = self._cache_version(route)
+            cached = self.response_cache.get(route, user_input, version=cache_version)
+            if cached is not None:
+                cached['route'] = route
+                cached['cached'] = True
+                return cached
+            
+            start = time.perf_counter()
+            history = session.reasoning_history if session is not None else None
+            result = self._dispatch(route, user_input, history)
             
             if isinstance(result, dict):
                 result['route'] = route
+                if not result.get('error') and result.get('success', True):
+                    self.response_cache.put(route, user_input, result,
+                                            latency=time.perf_counter() - start, version=cache_version)
+            
+            return result
+            
+        except Exception as e:
+            return {
+                "response": f"System error: {str(e)}",
+                "agent": "team",
+                "error": True
+            }
+
+    def _dispatch(self, route: str, user_input: str, history: ConversationHistory = None) -> Dict[str, Any]:
+        if route == 'knowledge':
+            return self.knowledge_agent.process(user_input)
+        if route == 'reasoning':
+            return self.reasoning_agent.process(user_input, history=history)
+        if route == 'memory':
+            return self.memory_agent.process(user_input)
+        if route == 'rag':
+            return self.rag_agent.process(user_input)
+        return self.direct_agent.process(user_input)
+
+    def process_batch(self, queries: List[str], max_concurrency: int = None,
+                      on_result: Callable[[int, Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """Answer many independent queries; returns {"results": [...in input order], "stats": {...}}.
+
+        Queries are routed, then grouped by route so memory, RAG and knowledge retrieval run as one
+        matrix operation per group. LLM calls share a pool of max_concurrency threads, and
+        on_result(index, result) is called as each query finishes, in completion order.
+        """
+        max_concurrency = max_concurrency or int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+        start = time.perf_counter()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        stats = {"queries": len(queries), "completed": 0, "errors": 0, "cached": 0, "fast_path": 0, "routes": {}, "retrieval_seconds": 0.0}
+        
+        def finish(index: int, route: str, result: Dict[str, Any], latency: float):
+            result['route'] = route
+            result['latency'] = round(latency, 4)
+            failed = bool(result.get('error')) or result.get('success', True) is False
+            if not failed and not result.get('cached') and not result.get('fast_path'):
+                self.response_cache.put(route, queries[index], result, latency=latency, version=self._cache_version(route))
+            results[index] = result
+            stats["completed"] += 1
+            stats["errors"] += failed
+            stats["routes"][route] = stats["routes"].get(route, 0) + 1
+            if on_result is not None:
+                on_result(index, result)
+        
+        def timed(call: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], float]:
+            call_start = time.perf_counter()
+            try:
+                result = call()
+            except Exception as e:
+                result = {"response": f"System error: {str(e)}", "agent": "team", "error": True}
+            return result, time.perf_counter() - call_start
+        
+        pending = []
+        for index, query in enumerate(queries):
+            fast_start = time.perf_counter()
+            fast = self._fast_path(query)
+            if fast is not None:
+                stats["fast_path"] += 1
+                finish(index, 'direct', fast, time.perf_counter() - fast_start)
+                continue
+            cached = self.response_cache.find(query, self._cache_version)
+            if cached is not None:
+                cached['cached'] = True
+                stats["cached"] += 1
+                finish(index, cached.get('route', 'direct'), cached, 0.0)
+            else:
+                pending.append(index)
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            routes = list(pool.map(lambda index: self._route_request(queries[index]), pending))
+            groups: Dict[str, List[int]] = {}
+            for index, route in zip(pending, routes):
+                groups.setdefault(route, []).append(index)
+            
+            futures = {}
+            for route, indices in groups.items():
+                group_queries = [queries[index] for index in indices]
+                if route in ('memory', 'rag', 'knowledge'):
+                    agent = {'memory': self.memory_agent, 'rag': self.rag_agent, 'knowledge': self.knowledge_agent}[route]
+                    retrieval_start = time.perf_counter()
+                    prepared = agent._prepare_batch(group_queries)
+                    stats["retrieval_seconds"] += time.perf_counter() - retrieval_start
+                    calls = [lambda agent=agent, item=item: agent._complete(*item) for item in prepared]
+                else:
+                    # Each query is independent, so reasoning starts from an empty history
+                    calls = [lambda route=route, query=query: self._dispatch(route, query, history=ConversationHistory())
+                             for query in group_queries]
+                for index, call in zip(indices, calls):
+                    futures[pool.submit(timed, call)] = (index, route)
+            
+            for future in as_completed(futures):
+                index, route = futures[future]
+                result, latency = future.result()
+                finish(index, route, result, latency)
+        
+        if 'memory' in groups:
+            self.memory_agent._maybe_compact()
+        
+        elapsed = time.perf_counter() - start
+        stats["retrieval_seconds"] = round(stats["retrieval_seconds"], 4)
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["queries_per_second"] = round(len(queries) / elapsed, 2) if elapsed else 0.0
+        stats["max_concurrency"] = max_concurrency
+        return {"results": results, "stats": stats}
+
+    async def aprocess(self, user_input: str, session: SessionState = None) -> Dict[str, Any]:
+        with tracer.span("team.process") as span:
+            result = await self._aprocess(user_input, session)
+            span.set(**self._result_attributes(result))
+            return result
+
+    async def _aprocess(self, user_input: str, session: SessionState = None) -> Dict[str, Any]:
+        """Async counterpart of process(); LLM calls are awaited and retrieval runs in worker threads."""
+        try:
+            fast = self._fast_path(user_input, session)
+            if fast is not None:
+                return fast
+            
+            if self._should_fan_out(user_input):
+                return await self._aprocess_fanout(user_input)
+            
+            cached = self.response_cache.find(user_input, self._cache_version)
+            if cached is not None:
+                cached['cached'] = True
+                if session is not None:
+                    session.last_route = cached.get('route')
+                return cached
+            
+            route, speculation = await self._aroute_request(user_input, session)
+            if session is not None:
+                session.last_route = route
+            
+            cache_version = self._cache_version(route)
+            cached = self.response_cache.get(route, user_input, version=cache_version)
+            if cached is not None:
+                if speculation is not None:
+                    speculation[1].cancel()
+                cached['route'] = route
+                cached['cached'] = True
+                return cached
+            
+            start = time.perf_counter()
+            
+            result = None
+            if speculation is not None:
+                result = await self._resolve_speculation(route, speculation)
+            if result is None:
+                result = await self._adispatch(route, user_input, session)
+            
+            result['route'] = route
+            if not result.get('error') and result.get('success', True):
+                self.response_cache.put(route, user_input, result,
+                                        latency=time.perf_counter() - start, version=cache_version)
             
             return result
             
@@ -86,6 +464,114 @@ Respond with only one word: direct, knowledge, reasoning, memory, or rag"""
                 "error": True
             }
 
+    async def _adispatch(self, route: str, user_input: str, session: SessionState = None) -> Dict[str, Any]:
+        if route == 'knowledge':
+            return await self.knowledge_agent.aprocess(user_input)
+        if route == 'reasoning':
+            history = session.reasoning_history if session is not None else None
+            return await self.reasoning_agent.aprocess(user_input, history=history)
+        if route == 'memory':
+            return await self.memory_agent.aprocess(user_input)
+        if route == 'rag':
+            return await self.rag_agent.aprocess(user_input)
+        return await self.direct_agent.aprocess(user_input)
+
+    def process_stream(self, user_input: str, session: SessionState = None) -> Iterator[Dict[str, Any]]:
+        """Streaming variant of process(): yields delta events, then a done event with the full result."""
+        # Not made the current span: the consumer may resume the generator from another context
+        span = tracer.start_span("team.process_stream") if tracer.enabled else None
+        done = None
+        try:
+            for event in self._process_stream(user_input, session):
+                if event.get('type') == 'done':
+                    done = event
+                yield event
+        finally:
+            if span is not None:
+                if done is not None:
+                    span.set(**self._result_attributes(done))
+                tracer.end_span(span)
+
+    def _process_stream(self, user_input: str, session: SessionState = None) -> Iterator[Dict[str, Any]]:
+        try:
+            fast = self._fast_path(user_input, session)
+            if fast is not None:
+                yield {"type": "delta", "content": fast['response']}
+                yield dict(fast, type="done")
+                return
+            
+            if self._should_fan_out(user_input):
+                contexts, report = self.fanout.gather(user_input)
+                events = stream_events(self.client, self._fanout_request(user_input, contexts),
+                                       self._fanout_result(contexts, report))
+                for event in events:
+                    if event.get('type') == 'done':
+                        self._finish_fanout(user_input)
+                    yield event
+                return
+            
+            cached = self.response_cache.find(user_input, self._cache_version)
+            route = cached.get('route') if cached is not None else None
+            if cached is None:
+                route = self._route_request(user_input)
+                cache_version = self._cache_version(route)
+                cached = self.response_cache.get(route, user_input, version=cache_version)
+            if session is not None:
+                session.last_route = route
+            
+            if cached is not None:
+                yield {"type": "delta", "content": cached.get('response', '')}
+                yield dict(cached, type="done", route=route, cached=True)
+                return
+            
+            start = time.perf_counter()
+            
+            if route == 'knowledge':
+                events = self.knowledge_agent.process_stream(user_input)
+            elif route == 'reasoning':
+                history = session.reasoning_history if session is not None else None
+                events = self.reasoning_agent.process_stream(user_input, history=history)
+            elif route == 'memory':
+                events = self.memory_agent.process_stream(user_input)
+            elif route == 'rag':
+                events = self.rag_agent.process_stream(user_input)
+            else:
+                events = self.direct_agent.process_stream(user_input)
+            
+            for event in events:
+                if event.get('type') == 'done':
+                    event['route'] = route
+                    if not event.get('error') and event.get('success', True):
+                        result = {k: v for k, v in event.items() if k != 'type'}
+                        self.response_cache.put(route, user_input, result,
+                                                latency=time.perf_counter() - start, version=cache_version)
+                yield event
+            
+        except Exception as e:
+            yield {
+                "type": "done",
+                "response": f"System error: {str(e)}",
+                "agent": "team",
+                "error": True
+            }
+
+    def _cache_version(self, route: str):
+        # RAG and knowledge answers depend on the corpus, so they expire when a new index is built
+        if route in ('rag', 'knowledge'):
+            return self.rag_agent.corpus_version
+        return None
+
+    def _routing_summary(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.routing_stats)
+
+    def _speculation_summary(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.speculation_stats)
+        attempts = stats["attempts"]
+        return dict(stats, enabled=self.speculative,
+                    hit_rate=round(stats["hits"] / attempts, 3) if attempts else 0.0)
+
     def get_system_stats(self) -> Dict[str, Any]:
         try:
             memory_stats = self.memory_agent.get_memory_stats()
@@ -102,7 +588,16 @@ Respond with only one word: direct, knowledge, reasoning, memory, or rag"""
                     "rag": f"{rag_stats.get('total_documents', 0)} documents"
                 },
                 "memory_categories": memory_stats.get('categories', {}),
-                "knowledge_categories": rag_stats.get('categories', {})
+                "knowledge_categories": rag_stats.get('categories', {}),
+                "routing": self._routing_summary(),
+                "response_cache": self.response_cache.get_stats(),
+                "llm_client": get_client_stats(),
+                "speculation": self._speculation_summary(),
+                "fast_path": self.fast_path.get_stats(),
+                "knowledge_retrieval": self.knowledge_agent.get_stats(),
+                "fanout": dict(self.fanout.get_stats(), mode=self.fanout_mode),
+                "reasoning_history": self.reasoning_agent.history_manager.get_stats(),
+                "latency": tracer.get_stats()
             }
         except Exception as e:
             return {"error": f"Stats retrieval failed: {e}"} 
\ No newline at end of file
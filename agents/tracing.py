@@ -0,0 +1,278 @@
+from typing import Dict, Any, Callable, List, Optional
+import atexit
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+# Histogram bucket upper bounds in seconds: 10 us to ~100 s, 10% apart, so a percentile read
+# from the buckets is within 10% of the true value
+_BOUNDS: List[float] = []
+_bound = 1e-5
+while _bound < 100:
+    _BOUNDS.append(_bound)
+    _bound *= 1.1
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets: constant memory and O(log n) record however many samples arrive."""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float, error: bool = False):
+        self.counts[bisect.bisect_left(_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank, seen = q / 100 * self.count, 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(_BOUNDS[index], self.max) if index < len(_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_time", "end_time", "_start",
+                 "duration", "attributes", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        # Ids in the OpenTelemetry format; uniqueness is all that is needed, not unpredictability
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self._start = time.perf_counter()
+        self.duration = None
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OpenTelemetry span layout (as the OTLP JSON and console exporters write it)."""
+        return {
+            "name": self.name,
+            "context": {"trace_id": self.trace_id, "span_id": self.span_id},
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "attributes": {key: value for key, value in self.attributes.items() if value is not None},
+            "status": {"status_code": "ERROR", "description": self.error} if self.error else {"status_code": "OK"}
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _NoopContext:
+    def __enter__(self):
+        return _NOOP_SPAN
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_CONTEXT = _NoopContext()
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "name", "attributes", "span", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        self.span = self.tracer.start_span(self.name, **self.attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, traceback):
+        _current_span.reset(self.token)
+        self.tracer.end_span(self.span, error=f"{exc_type.__name__}: {exc}" if exc_type else None)
+        return False
+
+
+class JsonlSpanExporter:
+    """Appends one JSON span per line to path; flushed every flush_every spans and at exit."""
+
+    def __init__(self, path: str, flush_every: int = 64):
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+        self._pending = 0
+        atexit.register(self.close)
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class InMemorySpanExporter:
+    """Keeps the last max_spans finished spans, like OpenTelemetry's InMemorySpanExporter."""
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans = deque(maxlen=max_spans)
+
+    def export(self, span: Span):
+        self._spans.append(span.to_dict())
+
+    def get_finished_spans(self) -> List[Dict[str, Any]]:
+        return list(self._spans)
+
+    def clear(self):
+        self._spans.clear()
+
+
+def _exporter_from_env():
+    kind = os.getenv("TRACE_EXPORTER", "none").lower()
+    if kind == "jsonl":
+        return JsonlSpanExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+    if kind == "memory":
+        return InMemorySpanExporter()
+    return None
+
+
+class Tracer:
+    """Per-stage spans: latency histograms always, span export when an exporter is set.
+
+    Spans nest through a context variable, so a span opened inside another (in the same thread
+    or task) shares its trace id. TRACING=off makes span() and traced functions pass straight
+    through. TRACE_EXPORTER=jsonl writes spans to TRACE_FILE; =memory keeps them in process.
+    """
+
+    def __init__(self, enabled: bool = None, exporter=None):
+        self.enabled = os.getenv("TRACING", "on").lower() != "off" if enabled is None else enabled
+        self.exporter = exporter if exporter is not None else _exporter_from_env()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, **attributes) -> Span:
+        """A span that is not made current; end it with end_span(). span() is the usual entry point."""
+        return Span(name, _current_span.get(), attributes)
+
+    def end_span(self, span: Span, error: str = None):
+        span.end_time = time.time_ns()
+        span.duration = time.perf_counter() - span._start
+        span.error = error
+        with self._lock:
+            histogram = self.histograms.get(span.name)
+            if histogram is None:
+                histogram = self.histograms[span.name] = LatencyHistogram()
+            histogram.record(span.duration, error=error is not None)
+        if self.exporter is not None:
+            try:
+                self.exporter.export(span)
+            except Exception as e:
+                print(f"Span export failed: {e}")
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NOOP_CONTEXT
+        return _SpanContext(self, name, attributes)
+
+    def traced(self, name: str, attributes: Callable[[Any], Dict[str, Any]] = None):
+        """Decorator: run the function (sync or async) inside span(name).
+
+        attributes(result) returns attributes to record from the function's return value.
+        """
+        def decorate(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    if not self.enabled:
+                        return await fn(*args, **kwargs)
+                    with _SpanContext(self, name, {}) as span:
+                        result = await fn(*args, **kwargs)
+                        if attributes is not None:
+                            span.set(**attributes(result))
+                        return result
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _SpanContext(self, name, {}) as span:
+                    result = fn(*args, **kwargs)
+                    if attributes is not None:
+                        span.set(**attributes(result))
+                    return result
+            return wrapper
+        return decorate
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+        return {"enabled": self.enabled, "exporter": type(self.exporter).__name__ if self.exporter else None,
+                "stages": stages}
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+
+def current_span():
+    """The innermost open span, or a no-op span when there is none (or tracing is off)."""
+    span = _current_span.get()
+    return span if span is not None else _NOOP_SPAN
+
+
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
@@ -0,0 +1,136 @@
+from typing import Dict, List, Sequence
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from agents.retrieval import QueryVectorCache
+
+
+class IncrementalTfidfIndex:
+    """Append-friendly TF-IDF index.
+
+    Term counts come from a stateless HashingVectorizer, so adding a document never refits
+    anything: it costs one transform of that document plus a document-frequency update.
+    IDF weights are derived from the running document frequencies at query time, which keeps
+    scores equivalent to a smooth-idf, l2-normalised TF-IDF over the current corpus.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, ngram_range=(1, 2), stop_words='english'):
+        self.n_features = n_features
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=ngram_range,
+            stop_words=stop_words,
+            alternate_sign=False,
+            norm=None
+        )
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self._matrix = sp.csr_matrix((0, n_features), dtype=np.float64)
+        self._squared = None
+        self._doc_norms = None
+        self._pending: List[sp.csr_matrix] = []
+        # Hashed term counts do not depend on the corpus, so cached query rows never go stale
+        self.query_cache = QueryVectorCache()
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def add(self, text: str):
+        row = self.vectorizer.transform([text])
+        self.doc_freq[row.indices] += 1
+        self._pending.append(row)
+        self.n_docs += 1
+        self._doc_norms = None
+
+    def add_many(self, texts: Sequence[str]):
+        if not texts:
+            return
+        rows = self.vectorizer.transform(texts)
+        self.doc_freq += np.bincount(rows.indices, minlength=self.n_features)
+        self._pending.append(rows)
+        self.n_docs += rows.shape[0]
+        self._doc_norms = None
+
+    def rebuild(self, texts: Sequence[str]):
+        self.doc_freq[:] = 0
+        self.n_docs = 0
+        self._matrix = sp.csr_matrix((0, self.n_features), dtype=np.float64)
+        self._squared = None
+        self._doc_norms = None
+        self._pending = []
+        self.add_many(list(texts))
+
+    def keep(self, indices: Sequence[int]):
+        """Retain only the given rows, in the given order."""
+        matrix = self._rows()[np.asarray(indices, dtype=np.int64)]
+        self._matrix = sp.csr_matrix(matrix)
+        self._squared = None
+        self._doc_norms = None
+        self.doc_freq = np.bincount(self._matrix.indices, minlength=self.n_features).astype(np.int64)
+        self.n_docs = self._matrix.shape[0]
+
+    def state(self) -> Dict[str, np.ndarray]:
+        matrix = self._rows()
+        return {
+            'doc_freq': self.doc_freq,
+            'data': matrix.data,
+            'indices': matrix.indices,
+            'indptr': matrix.indptr,
+        }
+
+    def load_state(self, state: Dict[str, np.ndarray]):
+        # The matrix may stay memory-mapped; it is only ever replaced, never written in place
+        n_docs = len(state['indptr']) - 1
+        self._matrix = sp.csr_matrix((state['data'], state['indices'], state['indptr']),
+                                     shape=(n_docs, self.n_features), copy=False)
+        self.doc_freq = np.array(state['doc_freq'], dtype=np.int64)
+        self.n_docs = n_docs
+        self._squared = None
+        self._doc_norms = None
+        self._pending = []
+
+    def _rows(self) -> sp.csr_matrix:
+        # Pending rows are folded in lazily so inserts stay O(len(document))
+        if self._pending:
+            self._matrix = sp.vstack([self._matrix] + self._pending, format='csr')
+            self._pending = []
+            self._squared = None
+            self._doc_norms = None
+        return self._matrix
+
+    def idf(self) -> np.ndarray:
+        return np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1.0
+
+    def similarities(self, query: str) -> np.ndarray:
+        return self.similarities_batch([query])[0]
+
+    def similarities_batch(self, queries: Sequence[str]) -> np.ndarray:
+        """Cosine similarities of every query against every document, shape (len(queries), len(self))."""
+        matrix = self._rows()
+        if matrix.shape[0] == 0:
+            return np.zeros((len(queries), 0))
+
+        idf = self.idf()
+        rows = self.query_cache.get_many(queries, self._transform_rows)
+        query_rows = sp.vstack(rows, format='csr')
+        # score_ij = sum_t q_it * idf_t^2 * tf_jt / (||q_i|| * ||d_j||), computed on raw counts
+        query_weights = query_rows.multiply(idf).tocsr()
+        query_norms = np.sqrt(np.asarray(query_weights.multiply(query_weights).sum(axis=1)).ravel())
+        query_norms[query_norms == 0] = 1.0
+        dots = (query_weights.multiply(idf).tocsr() @ matrix.T).toarray()
+
+        return dots / np.outer(query_norms, self._document_norms(idf))
+
+    def _transform_rows(self, texts: List[str]) -> List[sp.csr_matrix]:
+        rows = self.vectorizer.transform(texts)
+        return [rows[i] for i in range(rows.shape[0])]
+
+    def _document_norms(self, idf: np.ndarray) -> np.ndarray:
+        # TF-IDF norms only change when documents are added or removed, not per query
+        if self._doc_norms is None:
+            if self._squared is None:
+                self._squared = self._matrix.multiply(self._matrix).tocsr()
+            doc_norms = np.sqrt(self._squared @ (idf * idf))
+            doc_norms[doc_norms == 0] = 1.0
+            self._doc_norms = doc_norms
+        return self._doc_norms
@@ -6,28 +6,39 @@ load_dotenv()
 
 # Simple mock agent for testing if the real one fails
 class SimpleAgent:
-    def process(self, user_input):
+    def process(self, user_input, session=None):
         return {
             "response": f"Echo: {user_input}",
             "agent": "simple_test_agent"
         }
 
+    def process_stream(self, user_input, session=None):
+        result = self.process(user_input, session)
+        yield {"type": "delta", "content": result["response"]}
+        yield dict(result, type="done")
+
 def main():
     st.title("Agentic AI System")
 
     if 'messages' not in st.session_state:
         st.session_state.messages = []
     
+    # The TeamAgent (indexes, vectorizers, clients) is shared by every session in the
+    # process; only chat messages and reasoning history are kept per session.
     if 'team_agent' not in st.session_state:
         try:
-            from agents.team_agent import TeamAgent
-            st.session_state.team_agent = TeamAgent()
+            from agents.runtime import get_team_agent
+            st.session_state.team_agent = get_team_agent()
             st.success(" Team Agent loaded successfully")
         except Exception as e:
             st.warning(f" Could not load Team Agent: {str(e)}")
             st.info("Using simple test agent instead")
             st.session_state.team_agent = SimpleAgent()
     
+    if 'agent_session' not in st.session_state:
+        from agents.runtime import SessionState
+        st.session_state.agent_session = SessionState()
+    
     for message in st.session_state.messages:
         if message["role"] == "user":
             st.write(f"**You:** {message['content']}")
@@ -44,23 +55,25 @@ def main():
             "content": user_input
         })
         
+        st.write(f"**You:** {user_input}")
+        
         try:
-            result = st.session_state.team_agent.process(user_input)
+            # Render tokens as they arrive instead of waiting for the whole completion
+            placeholder = st.empty()
+            streamed = ""
+            result = {}
+            for event in st.session_state.team_agent.process_stream(user_input, session=st.session_state.agent_session):
+                if event.get("type") == "delta":
+                    streamed += event["content"]
+                    placeholder.write(f"**AI:** {streamed}")
+                elif event.get("type") == "done":
+                    result = event
             
-            if isinstance(result, dict):
-                response = result.get("response", "No response")
-                agent_used = result.get("agent", "unknown")
-                
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": response,
-                    "agent": agent_used
-                })
-            else:
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": str(result)
-                })
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": result.get("response", streamed or "No response"),
+                "agent": result.get("agent", "unknown")
+            })
                 
         except Exception as e:
             st.session_state.messages.append({
@@ -0,0 +1,76 @@
+"""ANN benchmark: IVFIndex recall@k and QPS versus exhaustive cosine search.
+
+The exhaustive baseline is what RAGAgent does without an ANN index: cosine_similarity
+against every reduced vector followed by a full argsort.
+
+Run from the repository root:
+    python -m benchmarks.bench_ann
+    python -m benchmarks.bench_ann --sizes 10000 100000 1000000 --probes 4 8 16 32
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from agents.ann_index import IVFIndex
+
+
+def make_vectors(count, dim, clusters, seed):
+    # Clustered data behaves like SVD-reduced TF-IDF far better than uniform noise
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    return centers[labels] + 0.6 * rng.normal(size=(count, dim)).astype(np.float32)
+
+
+def exhaustive(vectors, queries, top_k):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        similarities = cosine_similarity(query[None, :], vectors)[0]
+        results.append(np.argsort(similarities)[::-1][:top_k])
+    return results, len(queries) / (time.perf_counter() - start)
+
+
+def ann(index, queries, top_k, n_probe):
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        ids, _ = index.search(query, top_k, n_probe=n_probe)
+        results.append(ids)
+    return results, len(queries) / (time.perf_counter() - start)
+
+
+def recall(truth, found, top_k):
+    return float(np.mean([len(set(t[:top_k]) & set(f[:top_k])) / top_k for t, f in zip(truth, found)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'size':>9} | {'method':>24} | {'recall@' + str(args.top_k):>9} | {'QPS':>9}")
+    for size in args.sizes:
+        vectors = make_vectors(size, args.dim, clusters=max(10, size // 500), seed=args.seed)
+        queries = make_vectors(args.queries, args.dim, clusters=max(10, size // 500), seed=args.seed + 1)
+
+        truth, qps = exhaustive(vectors, queries, args.top_k)
+        print(f"{size:>9} | {'exhaustive':>24} | {1.0:>9.3f} | {qps:>9.1f}")
+
+        start = time.perf_counter()
+        index = IVFIndex().fit(vectors)
+        print(f"{size:>9} | {'ivf build':>24} | {'':>9} | {time.perf_counter() - start:>8.1f}s")
+
+        for n_probe in args.probes:
+            found, qps = ann(index, queries, args.top_k, n_probe)
+            label = f"ivf lists={index.n_lists} probe={n_probe}"
+            print(f"{size:>9} | {label:>24} | {recall(truth, found, args.top_k):>9.3f} | {qps:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Throughput benchmark: TeamAgent.process (threads) versus TeamAgent.aprocess (one event loop).
+
+A local fake LLM server (benchmarks/fake_llm_server.py) answers every completion after a
+fixed delay, so the numbers reflect how many conversations one worker process can keep in
+flight. "threads" runs `concurrency` threads calling process() (concurrency 1 is what a
+single blocking worker serves); "async" runs `concurrency` concurrent aprocess() calls on
+one event loop thread. The response cache is disabled.
+
+Run from the repository root:
+    python -m benchmarks.bench_async_throughput --latency 0.2 --requests 256
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+
+QUERIES = [
+    "hello there",
+    "what is 12 * 7",
+    "explain how a hash table works",
+    "search the knowledge base for python",
+    "compare the trade-offs of two sorting algorithms step by step",
+    "what do you remember about me",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def failed(result):
+    return bool(result.get("error")) or result.get("success") is False
+
+
+def run_threads(team_agent, concurrency, total):
+    def worker(i):
+        return failed(team_agent.process(QUERIES[i % len(QUERIES)]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        errors = sum(pool.map(worker, range(total)))
+    return total / (time.perf_counter() - start), errors
+
+
+async def run_async(team_agent, concurrency, total):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(i):
+        async with semaphore:
+            return failed(await team_agent.aprocess(QUERIES[i % len(QUERIES)]))
+
+    start = time.perf_counter()
+    errors = sum(await asyncio.gather(*(worker(i) for i in range(total))))
+    return total / (time.perf_counter() - start), errors
+
+
+def sample_size(concurrency, requests):
+    # A serial run takes requests * latency, so it gets a smaller sample
+    return requests if concurrency > 1 else min(requests, 20)
+
+
+async def run_async_levels(team_agent, levels, requests):
+    # One event loop for every level: the async HTTP pool is bound to the loop that opened it
+    return [await run_async(team_agent, c, sample_size(c, requests)) for c in levels]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 128])
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_llm_server",
+                               "--port", str(port), "--latency", str(args.latency)],
+                              stdout=subprocess.PIPE, text=True)
+    server.stdout.readline()
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{port}"
+
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+    try:
+        from agents.team_agent import TeamAgent
+        with contextlib.redirect_stdout(io.StringIO()):
+            team_agent = TeamAgent()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            threaded = [run_threads(team_agent, c, sample_size(c, args.requests)) for c in args.concurrency]
+            asynced = asyncio.run(run_async_levels(team_agent, args.concurrency, args.requests))
+
+        print(f"{'concurrency':>11} | {'threads req/s':>13} | {'async req/s':>11} | {'errors':>6}")
+        for concurrency, (thread_rps, thread_errors), (async_rps, async_errors) in zip(args.concurrency, threaded, asynced):
+            print(f"{concurrency:>11} | {thread_rps:>13.1f} | {async_rps:>11.1f} | {thread_errors + async_errors:>6}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
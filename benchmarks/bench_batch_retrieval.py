@@ -0,0 +1,67 @@
+"""Batch retrieval benchmark: per-query retrieval versus one matrix transform per query batch.
+
+Times RAGAgent._retrieve_relevant_chunks / MemoryAgent._retrieve_relevant_memories called once
+per query against the *_batch variants used by TeamAgent.process_batch.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch_retrieval --documents 5000 --memories 2000 --queries 1000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("GROQ_WARMUP", "off")
+
+from benchmarks.bench_startup import make_text  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--memories", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+    from agents.agent4_memory import MemoryAgent
+    from agents.agent5_rag import RAGAgent
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rag_agent = RAGAgent()
+        rag_agent.add_knowledge_batch({"title": f"Doc {i}", "content": make_text(rng, 200)}
+                                      for i in range(args.documents))
+        memory_agent = MemoryAgent()
+        for i in range(args.memories):
+            memory_agent._store_memory(f"I like {make_text(rng, 8)} #{i}", importance=0.5)
+
+    queries = [make_text(rng, 6) for _ in range(args.queries)]
+    cases = (
+        ("rag", rag_agent._retrieve_relevant_chunks, rag_agent._retrieve_relevant_chunks_batch),
+        ("memory", memory_agent._retrieve_relevant_memories, memory_agent._retrieve_relevant_memories_batch),
+    )
+
+    print(f"{'agent':>8} | {'per-query q/s':>13} | {'batched q/s':>11} | {'speedup':>7}")
+    for name, single, batched in cases:
+        start = time.perf_counter()
+        for query in queries:
+            single(query)
+        single_qps = len(queries) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batched(queries)
+        batch_qps = len(queries) / (time.perf_counter() - start)
+        print(f"{name:>8} | {single_qps:>13.0f} | {batch_qps:>11.0f} | {batch_qps / single_qps:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
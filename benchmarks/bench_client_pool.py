@@ -0,0 +1,100 @@
+"""Connection-pool benchmark: a Groq client per agent per session versus the shared client.
+
+"per_agent" reproduces the old layout: every session built a TeamAgent and each of its six
+agents built its own Groq client, so every client opened (and handshaked) its own
+connections. "shared" sends everything through agents.llm_client.get_client(). Requests run
+concurrently against benchmarks/fake_llm_server.py, which charges --handshake seconds on the
+first request of each new connection to stand in for TCP + TLS setup.
+
+Run from the repository root:
+    python -m benchmarks.bench_client_pool --sessions 20 --requests 600 --concurrency 32
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+CLIENTS_PER_SESSION = 6
+MESSAGES = [{"role": "user", "content": "hello there"}]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(latency, handshake):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_llm_server", "--port", str(port),
+                               "--latency", str(latency), "--handshake", str(handshake)],
+                              stdout=subprocess.PIPE, text=True)
+    server.stdout.readline()
+    return server, f"http://127.0.0.1:{port}"
+
+
+def server_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/stats") as response:
+        return json.loads(response.read())
+
+
+def run(mode, args):
+    server, base_url = start_server(args.latency, args.handshake)
+    os.environ["GROQ_BASE_URL"] = base_url
+    try:
+        from groq import Groq
+        from agents.llm_client import get_client, reset_clients, warm_up
+
+        reset_clients()
+        if mode == "per_agent":
+            clients = [Groq(api_key=os.environ["GROQ_API_KEY"])
+                       for _ in range(args.sessions * CLIENTS_PER_SESSION)]
+        else:
+            shared = get_client()
+            warm_up(shared)
+            clients = [shared]
+
+        def request(i):
+            client = clients[i % len(clients)]
+            start = time.perf_counter()
+            client.chat.completions.create(model="benchmark", messages=MESSAGES)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = np.array(list(pool.map(request, range(args.requests))))
+        stats = server_stats(base_url)
+        for client in clients:
+            client.close()
+        # The /stats request itself opens one connection
+        return stats["connections"] - 1, latencies
+    finally:
+        server.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--handshake", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} | {'clients':>7} | {'connections':>11} | {'p50 (ms)':>8} | {'p99 (ms)':>8}")
+    for mode in ("per_agent", "shared"):
+        connections, latencies = run(mode, args)
+        clients = args.sessions * CLIENTS_PER_SESSION if mode == "per_agent" else 1
+        print(f"{mode:>10} | {clients:>7} | {connections:>11} | "
+              f"{np.percentile(latencies, 50) * 1000:>8.1f} | {np.percentile(latencies, 99) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Columnar metadata benchmark: list-of-dicts records versus agents.columnar.ColumnarStore.
+
+Builds N memory records in both layouts and reports the metadata memory each holds
+(tracemalloc; records are parsed from JSON lines as on load, and the content strings are
+created beforehand and shared by both, so only the per-record overhead is measured), the latency of get_memory_stats-style stats, and the
+retention scoring pass of MemoryAgent._clean_old_memories.
+
+Run from the repository root:
+    python -m benchmarks.bench_columnar_store --entries 10000 100000 1000000
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+import numpy as np
+
+from agents.agent4_memory import MEMORY_SCHEMA
+from agents.columnar import ColumnarStore
+
+CATEGORIES = ['personal', 'work', 'preferences', 'general']
+
+
+def make_records(rng: random.Random, contents):
+    now = datetime.now()
+    return [{
+        'content': content,
+        'context': 'user_statement',
+        'category': rng.choice(CATEGORIES),
+        'timestamp': (now - timedelta(seconds=rng.randrange(86400 * 730))).isoformat(),
+        'importance': round(rng.random(), 2),
+        'access_count': rng.randrange(20),
+        'last_accessed': (now - timedelta(seconds=rng.randrange(86400 * 30))).isoformat() if rng.random() < 0.5 else None
+    } for content in contents]
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+
+def best_of(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def dict_stats(records):
+    categories = {}
+    for memory in records:
+        category = memory.get('category', 'general')
+        categories[category] = categories.get(category, 0) + 1
+    return categories, np.mean([mem.get('importance', 0.5) for mem in records])
+
+
+def columnar_stats(store):
+    return store.category_counts('category'), float(np.mean(store.column('importance'), dtype=np.float64))
+
+
+def dict_retention(records):
+    now = datetime.now()
+    scores = []
+    for memory in records:
+        age_days = (now - datetime.fromisoformat(memory['timestamp'])).days
+        recency_score = max(0, 1 - age_days / 365)
+        scores.append(memory['importance'] * 0.5 + memory['access_count'] * 0.1 * 0.3 + recency_score * 0.2)
+    return sorted(range(len(records)), key=scores.__getitem__, reverse=True)[:100]
+
+
+def columnar_retention(store):
+    age_days = np.floor((time.time() - store.column('timestamp')) / 86400)
+    score = (store.column('importance') * 0.5 + store.column('access_count') * 0.1 * 0.3 +
+             np.maximum(0, 1 - age_days / 365) * 0.2)
+    return np.argsort(-score, kind='stable')[:100]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} | {'dicts (MB)':>10} | {'columnar (MB)':>13} | {'ratio':>5} | "
+          f"{'dict stats (ms)':>15} | {'col stats (ms)':>14} | {'dict clean (ms)':>15} | {'col clean (ms)':>14}")
+    for n_entries in args.entries:
+        rng = random.Random(args.seed)
+        contents = [f"memory {i} about python and bangalore" for i in range(n_entries)]
+        # Records are parsed from JSON lines, as when loading the record log; content is shared
+        lines = [json.dumps(dict(record, content=None)) for record in make_records(rng, contents)]
+
+        def parse():
+            return [dict(json.loads(line), content=content) for line, content in zip(lines, contents)]
+
+        def build_store():
+            store = ColumnarStore(MEMORY_SCHEMA, defaults={'category': 'general', 'importance': 0.5})
+            store.extend(parse())
+            return store
+
+        dict_records, dict_bytes = measure(parse)
+        store, columnar_bytes = measure(build_store)
+
+        dict_stats_seconds = best_of(lambda: dict_stats(dict_records))
+        columnar_stats_seconds = best_of(lambda: columnar_stats(store))
+        dict_clean_seconds = best_of(lambda: dict_retention(dict_records), repeat=1 if n_entries > 100000 else 3)
+        columnar_clean_seconds = best_of(lambda: columnar_retention(store))
+
+        print(f"{n_entries:>9} | {dict_bytes / 2 ** 20:>10.1f} | {columnar_bytes / 2 ** 20:>13.1f} | "
+              f"{dict_bytes / columnar_bytes:>4.1f}x | {dict_stats_seconds * 1000:>15.2f} | "
+              f"{columnar_stats_seconds * 1000:>14.3f} | {dict_clean_seconds * 1000:>15.1f} | "
+              f"{columnar_clean_seconds * 1000:>14.1f}")
+        del dict_records, store, lines
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Database engine benchmark: many threads calling save_interaction at once.
+
+Runs against a SQLite file as a local database stand-in. --db-latency adds a sleep to every
+statement, standing in for a network round trip to Postgres, so a request holds its pooled
+connection for as long as it would against a remote server. "default" is the previous
+create_engine(DATABASE_URL) (pool of 5 + 10 overflow, rollback journal); "tuned" is
+db.database.build_engine() with the DB_* pool settings and the SQLite WAL pragmas; "async"
+awaits asave_interaction() from as many concurrent tasks on the async engine, with the added
+latency awaited before each write (a blocking sleep in an engine event would stall the event
+loop, and SQLAlchemy runs those on the loop's thread). Connections
+are counted with pool events: "opened" is new DBAPI connections, "peak" the most checked out
+at once.
+
+Run from the repository root:
+    python -m benchmarks.bench_db_engine --threads 32 --requests 100 --db-latency 0.002
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+directory = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'interactions.db')}"
+
+from sqlalchemy import create_engine, event  # noqa: E402
+
+from db import database  # noqa: E402
+from db.models import ChatInteraction  # noqa: E402
+
+
+class ConnectionCounter:
+    def __init__(self, engine, db_latency: float):
+        self.opened = 0
+        self.checked_out = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "connect", self._connect)
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+        if db_latency:
+            event.listen(engine, "before_cursor_execute", lambda *_: time.sleep(db_latency))
+
+    def _connect(self, *_):
+        with self._lock:
+            self.opened += 1
+
+    def _checkout(self, *_):
+        with self._lock:
+            self.checked_out += 1
+            self.peak = max(self.peak, self.checked_out)
+
+    def _checkin(self, *_):
+        with self._lock:
+            self.checked_out -= 1
+
+
+def count_rows() -> int:
+    db = database.SessionLocal()
+    try:
+        return db.query(ChatInteraction).count()
+    finally:
+        db.close()
+
+
+def report(name: str, seconds: float, saved: int, total: int, counter: ConnectionCounter):
+    print(f"{name:>8} | {saved / seconds:>8.0f} | {total - saved:>6} | {counter.opened:>6} | {counter.peak:>4}")
+
+
+def run_threads(engine, args, response: str):
+    database.SessionLocal.configure(bind=engine)
+    counter = ConnectionCounter(engine, args.db_latency)
+
+    def worker(thread: int) -> int:
+        return sum(database.save_interaction(f"question {thread}-{i}", "direct", response)
+                   for i in range(args.requests))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        saved = sum(pool.map(worker, range(args.threads)))
+    return time.perf_counter() - start, saved, counter
+
+
+async def run_async(args, response: str):
+    session_factory = database.get_async_sessionmaker()
+    counter = ConnectionCounter(session_factory.kw["bind"].sync_engine, 0)
+    semaphore = asyncio.Semaphore(args.threads)
+
+    async def save(i: int) -> bool:
+        async with semaphore:
+            await asyncio.sleep(args.db_latency)
+            return await database.asave_interaction(f"question {i}", "direct", response)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[save(i) for i in range(args.threads * args.requests)])
+    seconds = time.perf_counter() - start
+    await session_factory.kw["bind"].dispose()
+    return seconds, sum(results), counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=100, help="per thread")
+    parser.add_argument("--db-latency", type=float, default=0.002, help="seconds added to every statement")
+    args = parser.parse_args()
+
+    database.init_db()
+    response = "An answer of typical length. " * 20
+    total = args.threads * args.requests
+    print(f"{args.threads} threads x {args.requests} requests")
+    print(f"{'engine':>8} | {'rows/s':>8} | {'failed':>6} | {'opened':>6} | {'peak':>4}")
+
+    # The previous configuration; the database file is already in WAL mode, so switch it back
+    database.engine.dispose()
+    default = create_engine(database.DATABASE_URL)
+    with default.connect() as connection:
+        connection.exec_driver_sql("PRAGMA journal_mode=DELETE")
+    seconds, saved, counter = run_threads(default, args, response)
+    report("default", seconds, saved, total, counter)
+    default.dispose()
+
+    tuned = database.build_engine(database.DATABASE_URL)
+    seconds, saved, counter = run_threads(tuned, args, response)
+    report("tuned", seconds, saved, total, counter)
+    tuned.dispose()
+
+    if database.async_engine_available():
+        seconds, saved, counter = asyncio.run(run_async(args, response))
+        report("async", seconds, saved, total, counter)
+    else:
+        print("   async | skipped: install greenlet and aiosqlite")
+    print(f"{count_rows()} rows in the database")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Fan-out benchmark: memory + knowledge base questions answered with one completion.
+
+Questions that match both the memory and rag rules used to reach only one of the two agents;
+getting both contexts meant asking MemoryAgent and then RAGAgent, two completions back to
+back. "before" replays that sequential pair, "after" is TeamAgent.process() with fan-out,
+where both retrievals run concurrently and one completion sees the merged context. The LLM
+is an in-process fake with a fixed latency per call. A last pass slows the rag source past
+the deadline to show it being dropped instead of waited on.
+
+Run from the repository root:
+    python -m benchmarks.bench_fanout --latency 0.3 --documents 2000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+os.environ["GROQ_WARMUP"] = "off"
+
+from benchmarks.bench_startup import make_text  # noqa: E402
+from benchmarks.fake_llm import FakeGroq, install_fake_client  # noqa: E402
+
+FACTS = [
+    "My name is Mann and I live in Bangalore.",
+    "I work as a backend engineer on payment systems.",
+    "My favourite language is Python and I am learning Rust.",
+    "I prefer concise answers with code examples.",
+]
+
+# Documents the questions can actually hit, mixed into the synthetic corpus; each goes in
+# --topic-copies times so its words survive the vectorizer's max_features cut
+TOPICS = [
+    {"title": "Python", "content": "Python is a good language for backend services, data pipelines and scripting. "
+                                   "Its standard library and packaging ecosystem make it a favourite for teams."},
+    {"title": "Bangalore", "content": "Bangalore is a technology hub in India where many engineering teams live and work."},
+    {"title": "Payments", "content": "Payment systems teams work on idempotent APIs, ledgers and reconciliation jobs. "
+                                     "Engineers on the team track retries and settlement delays."},
+    {"title": "Notes", "content": "Related notes on what a backend engineer does: on-call, reviews and service ownership."},
+]
+
+QUESTIONS = [
+    "According to the documents, what is my favourite language good for?",
+    "Search the knowledge base for anything relevant to where I live.",
+    "What do the documents say that matters for the team I work on?",
+    "Remember what I do and check the knowledge base for related notes.",
+]
+
+
+def timed(fn, queries):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM latency per call")
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--topic-copies", type=int, default=25)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--slow", type=float, default=1.0, help="rag source delay for the deadline pass, seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+    rng = random.Random(args.seed)
+
+    from agents.team_agent import TeamAgent
+    with contextlib.redirect_stdout(io.StringIO()):
+        team_agent = TeamAgent()
+        fake = FakeGroq(latency=args.latency)
+        install_fake_client(team_agent, fake)
+        team_agent.rag_agent.add_knowledge_batch(
+            [{"title": f"Doc {i}", "content": make_text(rng, 200)} for i in range(args.documents)] + TOPICS * args.topic_copies,
+            save=False)
+        for fact in FACTS:
+            team_agent.memory_agent._store_memory(fact, "user_statement")
+    queries = QUESTIONS * args.repeats
+    routed = [team_agent._should_fan_out(query) for query in QUESTIONS]
+
+    def sequential(query):
+        memory = team_agent.memory_agent.process(query)
+        rag = team_agent.rag_agent.process(query)
+        return memory, rag
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        calls = fake.chat.completions.calls
+        before, _ = timed(sequential, queries)
+        before_calls = fake.chat.completions.calls - calls
+
+        calls = fake.chat.completions.calls
+        after, results = timed(team_agent.process, queries)
+        after_calls = fake.chat.completions.calls - calls
+
+    print(f"{len(queries)} questions ({sum(routed)}/{len(QUESTIONS)} distinct ones fan out), "
+          f"{args.documents} documents, fake LLM latency {args.latency * 1000:.0f} ms")
+    print(f"{'':>22} | {'p50':>9} | {'mean':>9} | {'completions':>11}")
+    print(f"{'sequential memory+rag':>22} | {np.median(before):>7.1f}ms | {before.mean():>7.1f}ms | {before_calls:>11}")
+    print(f"{'fan-out':>22} | {np.median(after):>7.1f}ms | {after.mean():>7.1f}ms | {after_calls:>11}")
+
+    for name in team_agent.fanout.sources:
+        timings = [r["sources"][name]["ms"] for r in results if r["sources"].get(name, {}).get("status") == "ok"]
+        items = [r["sources"][name]["items"] for r in results if r["sources"].get(name, {}).get("status") == "ok"]
+        print(f"  {name} retrieval: p50 {np.median(timings):.2f} ms, max {max(timings):.2f} ms, "
+              f"mean {np.mean(items):.1f} items")
+
+    # A rag source slower than the deadline: dropped at the deadline, memory still used
+    rag_source = team_agent.fanout.sources["rag"]
+
+    def slow_rag(query):
+        time.sleep(args.slow)
+        return rag_source(query)
+
+    team_agent.fanout.sources["rag"] = slow_rag
+    with contextlib.redirect_stdout(io.StringIO()):
+        slow, results = timed(team_agent.process, QUESTIONS)
+    team_agent.fanout.sources["rag"] = rag_source
+    print(f"rag delayed {args.slow * 1000:.0f} ms, deadline {team_agent.fanout.deadline * 1000:.0f} ms: "
+          f"p50 {np.median(slow):.1f} ms, rag status {results[0]['sources']['rag']['status']}, "
+          f"memories used {results[0]['memories_used']}, knowledge chunks used {results[0]['knowledge_chunks_used']}")
+    print(f"fan-out stats: {team_agent.fanout.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Fast path benchmark: hit rate and latency of local answers on a recorded query log.
+
+Replays the query log (benchmarks/data/routing_queries.jsonl by default, one {"query"} per
+line) through TeamAgent.process() with the fast path off and on. The LLM is an in-process
+fake with a fixed latency per call, standing in for routing and completion round trips.
+Also reports what FastPath.answer() adds to queries it does not match.
+
+Run from the repository root:
+    python -m benchmarks.bench_fast_path --latency 0.5
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+os.environ["GROQ_WARMUP"] = "off"
+
+from benchmarks.bench_router import DEFAULT_QUERIES, load_queries  # noqa: E402
+from benchmarks.fake_llm import FakeGroq, install_fake_client  # noqa: E402
+
+
+def replay(team_agent, queries, enabled):
+    team_agent.fast_path.enabled = enabled
+    latencies, hits = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = team_agent.process(query)
+        latencies.append(time.perf_counter() - start)
+        hits.append(bool(result.get("fast_path")))
+    return np.array(latencies), np.array(hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM latency per call")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    parser.add_argument("--repeats", type=int, default=1000, help="FastPath.answer() timing repeats")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+    from agents.team_agent import TeamAgent
+    with contextlib.redirect_stdout(io.StringIO()):
+        team_agent = TeamAgent()
+        install_fake_client(team_agent, FakeGroq(latency=args.latency))
+        queries = [row["query"] for row in load_queries(args.queries)]
+        before, _ = replay(team_agent, queries, False)
+        after, hits = replay(team_agent, queries, True)
+
+    print(f"{len(queries)} queries, fast path hit rate {hits.mean():.1%} ({hits.sum()} hits)")
+    print(f"{'':>16} | {'before p50':>10} | {'after p50':>10} | {'before mean':>11} | {'after mean':>10}")
+    for name, mask in (("fast path hits", hits), ("other queries", ~hits), ("all queries", np.ones_like(hits))):
+        if mask.any():
+            print(f"{name:>16} | {np.median(before[mask]) * 1000:>8.1f}ms | {np.median(after[mask]) * 1000:>8.3f}ms | "
+                  f"{before[mask].mean() * 1000:>9.1f}ms | {after[mask].mean() * 1000:>8.1f}ms")
+
+    fast_path = team_agent.fast_path
+    for name, subset in (("hit", [q for q, h in zip(queries, hits) if h]), ("miss", [q for q, h in zip(queries, hits) if not h])):
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            for query in subset:
+                fast_path.answer(query)
+        print(f"FastPath.answer() per {name}: {(time.perf_counter() - start) / (args.repeats * len(subset)) * 1e6:.1f} us")
+
+    print("answers:")
+    for query, hit in zip(queries, hits):
+        if hit:
+            print(f"  {query!r} -> {fast_path.answer(query)['response']!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Interaction logging benchmark: synchronous save_interaction versus the write-behind writer.
+
+Runs against a SQLite file as a local database stand-in. --db-latency adds a sleep to every
+statement the database executes, standing in for a network round trip to Postgres.
+"sync" calls db.database.save_interaction per request (one session, insert and commit
+each); "write-behind" calls log_interaction, which only enqueues, and reports how long the
+background writer takes to drain the queue. A final pass points the writer at an
+unreachable database to show rows spilling to disk and replaying on recovery.
+
+Run from the repository root:
+    python -m benchmarks.bench_interaction_writer --requests 2000 --db-latency 0.002
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+directory = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'interactions.db')}"
+os.environ["INTERACTION_SPILL_FILE"] = os.path.join(directory, "spill.jsonl")
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from db import database  # noqa: E402
+from db.interaction_writer import InteractionWriter  # noqa: E402
+from db.models import ChatInteraction  # noqa: E402
+
+
+def count_rows() -> int:
+    db = database.SessionLocal()
+    try:
+        return db.query(ChatInteraction).count()
+    finally:
+        db.close()
+
+
+def report(name: str, latencies, seconds: float, rows: int):
+    latencies = np.array(latencies) * 1000
+    print(f"{name:>12} | {np.percentile(latencies, 50):>8.3f} | {np.percentile(latencies, 99):>8.3f} | "
+          f"{rows / seconds:>11.0f} | {rows:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--db-latency", type=float, default=0.002, help="seconds added to every statement")
+    args = parser.parse_args()
+
+    database.init_db()
+    if args.db_latency:
+        @event.listens_for(database.engine, "before_cursor_execute")
+        def slow_statement(*_):
+            time.sleep(args.db_latency)
+
+    response = "An answer of typical length. " * 20
+    print(f"{'mode':>12} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'rows/s':>11} | {'rows':>6}")
+
+    before = count_rows()
+    latencies = []
+    start = time.perf_counter()
+    for i in range(args.requests):
+        call_start = time.perf_counter()
+        database.save_interaction(f"question {i}", "direct", response)
+        latencies.append(time.perf_counter() - call_start)
+    report("sync", latencies, time.perf_counter() - start, count_rows() - before)
+
+    before = count_rows()
+    writer = database.get_interaction_writer()
+    latencies = []
+    start = time.perf_counter()
+    for i in range(args.requests):
+        call_start = time.perf_counter()
+        database.log_interaction(f"question {i}", "direct", response)
+        latencies.append(time.perf_counter() - call_start)
+    writer.flush(timeout=120)
+    report("write-behind", latencies, time.perf_counter() - start, count_rows() - before)
+    print(f"  {writer.get_stats()['batches']} batches")
+
+    # Database outage: inserts fail, rows spill, then replay once the database is back
+    outage = {"down": True}
+
+    class FlakySession:
+        def __init__(self):
+            self.session = database.SessionLocal()
+
+        def execute(self, *a, **kw):
+            if outage["down"]:
+                raise OperationalError("INSERT", {}, Exception("database unavailable"))
+            return self.session.execute(*a, **kw)
+
+        def __getattr__(self, name):
+            return getattr(self.session, name)
+
+    before = count_rows()
+    flaky = InteractionWriter(FlakySession, flush_seconds=0.05)
+    flaky.retry_seconds = 0.0
+    for i in range(500):
+        flaky.submit(f"outage question {i}", "direct", response)
+    flaky.flush()
+    spilled = flaky.get_stats()["spilled"]
+    outage["down"] = False
+    flaky.submit("after recovery", "direct", response)
+    flaky.flush()
+    flaky.close()
+    stats = flaky.get_stats()
+    print(f"outage: {spilled} rows spilled, {stats['replayed']} replayed, "
+          f"{count_rows() - before} rows in the database")
+
+
+if __name__ == "__main__":
+    main()
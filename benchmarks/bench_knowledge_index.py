@@ -0,0 +1,106 @@
+"""Shared knowledge index benchmark: KnowledgeAgent retrieval through the RAG agent's index.
+
+Builds a RAGAgent over a synthetic corpus and gives KnowledgeAgent a read-only view of it.
+Each query is a short passage lifted from one document, so the recall@k column is the share
+of queries whose source document appears in the retrieved chunks. "duplicate" is what a
+separate KnowledgeAgent index would cost: a second fit of the vectorizer/SVD and a second
+copy of the vectors. Prompt preparation is retrieval plus building the request, with the
+packed context capped at KNOWLEDGE_CONTEXT_TOKENS.
+
+Run from the repository root:
+    python -m benchmarks.bench_knowledge_index --documents 5000 --queries 500
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ["GROQ_WARMUP"] = "off"
+
+from agents.tokens import count_tokens  # noqa: E402
+from benchmarks.bench_startup import make_text  # noqa: E402
+
+
+def index_bytes(agent) -> int:
+    total = agent.reduced_vectors.nbytes if agent.reduced_vectors is not None else 0
+    vectors = agent.knowledge_vectors
+    if vectors is not None:
+        total += vectors.data.nbytes + vectors.indices.nbytes + vectors.indptr.nbytes
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    rng = random.Random(args.seed)
+    documents = [{"title": f"Doc {i}", "content": make_text(rng, 300)} for i in range(args.documents)]
+
+    from agents.agent2_knowledge import KnowledgeAgent
+    from agents.agent5_rag import RAGAgent
+    with contextlib.redirect_stdout(io.StringIO()):
+        rag_agent = RAGAgent()
+        rag_agent.add_knowledge_batch(documents, save=False)
+        knowledge_agent = KnowledgeAgent(index=rag_agent.read_only_view())
+        knowledge_agent.top_k = args.top_k
+
+    queries, sources = [], []
+    for _ in range(args.queries):
+        doc_index = rng.randrange(len(rag_agent.knowledge_store))
+        words = rag_agent.knowledge_store.value(doc_index, 'content').split()
+        start = rng.randrange(len(words) - 12)
+        queries.append(" ".join(words[start:start + 12]))
+        sources.append(doc_index)
+
+    latencies, hits = [], 0
+    for query, source in zip(queries, sources):
+        start = time.perf_counter()
+        chunks = knowledge_agent.index.search(query, top_k=args.top_k)
+        latencies.append(time.perf_counter() - start)
+        hits += any(chunk['doc_index'] == source for chunk in chunks)
+
+    # Cold query vectors again, so preparation includes the embedding like the search above
+    rag_agent.query_cache.clear()
+    prepare, prompt_tokens = [], []
+    for query in queries:
+        start = time.perf_counter()
+        request, _ = knowledge_agent._request(query)
+        prepare.append(time.perf_counter() - start)
+        prompt_tokens.append(sum(count_tokens(message["content"]) for message in request["messages"]))
+
+    # What a separate KnowledgeAgent index would cost: the same build again
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "duplicate_store")
+    with contextlib.redirect_stdout(io.StringIO()):
+        duplicate = RAGAgent()
+        with duplicate._index_lock:
+            duplicate.knowledge_store.extend(documents)
+        start = time.perf_counter()
+        duplicate._build_vectors()
+        duplicate_build = time.perf_counter() - start
+
+    latencies, prepare = np.array(latencies) * 1000, np.array(prepare) * 1000
+    print(f"{args.documents} documents, {len(rag_agent.chunk_doc_ids)} chunks, {args.queries} queries")
+    print(f"search via shared view: p50 {np.percentile(latencies, 50):.2f} ms, p99 {np.percentile(latencies, 99):.2f} ms, "
+          f"recall@{args.top_k} {hits / args.queries:.1%}")
+    print(f"prompt preparation (retrieval + packing): p50 {np.percentile(prepare, 50):.2f} ms, "
+          f"p99 {np.percentile(prepare, 99):.2f} ms")
+    print(f"knowledge prompt: mean {np.mean(prompt_tokens):.0f} tokens, max {max(prompt_tokens)} "
+          f"(context budget {knowledge_agent.context_token_budget})")
+    print(f"index memory: shared {index_bytes(rag_agent) / 2**20:.1f} MB; a duplicate would add "
+          f"{index_bytes(duplicate) / 2**20:.1f} MB and a {duplicate_build:.2f} s build")
+    print(f"access counts untouched by the view: {int(np.sum(rag_agent.knowledge_store.column('access_count'))) == 0}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Memory insert benchmark: per-insert indexing cost as the memory store grows.
+
+"before" is the old behaviour (TfidfVectorizer.fit_transform over the whole store on every
+insert), sampled at checkpoints because running it for every insert is quadratic.
+"after" is IncrementalTfidfIndex.add, timed for every insert and averaged per bucket.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory_insert --count 10000
+"""
+import argparse
+import random
+import time
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from agents.vector_index import IncrementalTfidfIndex
+
+WORDS = ("python bangalore work software engineer music guitar jazz coffee travel india team project "
+         "machine learning data science hiking weekend family friend favorite color blue movie book "
+         "startup cricket food dosa morning evening meeting deadline cloud database api design").split()
+
+TEMPLATES = [
+    "I like {0} and {1} on the {2}",
+    "My favorite {0} is {1}",
+    "Remember that I work on {0} {1} with my {2}",
+    "I live near {0} and enjoy {1} {2}",
+    "I am learning {0} {1} for a {2} project",
+]
+
+
+def make_memories(count, seed):
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES).format(*rng.sample(WORDS, 3)) + f" #{i}" for i in range(count)]
+
+
+def checkpoints(count):
+    points = {1, 10, 100, 1000, 2500, 5000, 10000, count}
+    return sorted(p for p in points if p <= count)
+
+
+def bench_refit(memories):
+    results = {}
+    for size in checkpoints(len(memories)):
+        vectorizer = TfidfVectorizer(max_features=2000, stop_words='english', ngram_range=(1, 2))
+        start = time.perf_counter()
+        vectorizer.fit_transform(memories[:size])
+        results[size] = (time.perf_counter() - start) * 1000
+    return results
+
+
+def bench_incremental(memories, query_every):
+    index = IncrementalTfidfIndex(ngram_range=(1, 2))
+    insert_ms = []
+    query_ms = []
+
+    for i, memory in enumerate(memories, 1):
+        start = time.perf_counter()
+        index.add(memory)
+        insert_ms.append((time.perf_counter() - start) * 1000)
+
+        if query_every and i % query_every == 0:
+            start = time.perf_counter()
+            scores = index.similarities(memory)
+            query_ms.append((time.perf_counter() - start) * 1000)
+            # New memories must be visible to the very next query
+            assert scores[i - 1] == scores.max()
+
+    results = {}
+    for size in checkpoints(len(memories)):
+        window = insert_ms[max(0, size - 100):size]
+        results[size] = sum(window) / len(window)
+    return results, query_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--query-every", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    memories = make_memories(args.count, args.seed)
+    before = bench_refit(memories)
+    after, query_ms = bench_incremental(memories, args.query_every)
+
+    print(f"{'store size':>10} | {'refit per insert (ms)':>22} | {'incremental insert (ms)':>24}")
+    for size in checkpoints(args.count):
+        print(f"{size:>10} | {before[size]:>22.3f} | {after[size]:>24.4f}")
+    if query_ms:
+        print(f"query after insert: mean={np.mean(query_ms):.2f}ms max={np.max(query_ms):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Memory retention benchmark: request-path cost of keeping the hot tier bounded.
+
+Each simulated request stores a memory, retrieves for a query and then runs the
+post-response retention step, as MemoryAgent.process does. "inline" compacts on the request
+path every time the hot tier exceeds its limit (the previous sort-and-truncate behaviour);
+"tiered" uses the high-water mark and background compaction. Reports per-request latency
+and where the evicted memories ended up. Tail latency varies a lot between runs (GC, the
+compaction thread's scheduling), so each mode runs --runs times, interleaved, and every
+column is the median across runs with the min-max range in brackets.
+
+Run from the repository root:
+    python -m benchmarks.bench_memory_tiers --requests 2000 --hot-limit 100 --runs 7
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("GROQ_WARMUP", "off")
+
+from benchmarks.bench_startup import make_text  # noqa: E402
+
+
+def run(mode: str, args) -> dict:
+    os.environ["MEMORY_STORE_DIR"] = tempfile.mkdtemp()
+    os.environ["MEMORY_HOT_LIMIT"] = str(args.hot_limit)
+    if mode == "inline":
+        os.environ["MEMORY_HOT_HIGH_WATER"] = str(args.hot_limit)
+        os.environ["MEMORY_BACKGROUND_COMPACTION"] = "off"
+    else:
+        os.environ.pop("MEMORY_HOT_HIGH_WATER", None)
+        os.environ["MEMORY_BACKGROUND_COMPACTION"] = "on"
+
+    from agents.agent4_memory import MemoryAgent
+
+    rng = random.Random(args.seed)
+    latencies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = MemoryAgent()
+        for i in range(args.requests):
+            start = time.perf_counter()
+            agent._store_memory(f"I like {make_text(rng, 8)} #{i}")
+            agent._retrieve_relevant_memories(make_text(rng, 4))
+            agent._maybe_compact()
+            latencies.append(time.perf_counter() - start)
+        if agent._compaction_thread is not None:
+            agent._compaction_thread.join()
+        stats = agent.get_memory_stats()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "p50": np.percentile(latencies, 50),
+        "p99": np.percentile(latencies, 99),
+        "max": latencies.max(),
+        "hot": stats["total_memories"],
+        "warm": stats["warm_memories"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hot-limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {"inline": [], "tiered": []}
+    for _ in range(args.runs):
+        for mode in results:
+            results[mode].append(run(mode, args))
+
+    def column(runs, key):
+        values = [result[key] for result in runs]
+        return f"{np.median(values):.2f} [{min(values):.2f}-{max(values):.2f}]"
+
+    print(f"{args.runs} runs per mode, median [min-max] across runs")
+    print(f"{'mode':>7} | {'p50 (ms)':>20} | {'p99 (ms)':>22} | {'max (ms)':>24} | {'hot':>5} | {'warm':>5}")
+    for mode, runs in results.items():
+        print(f"{mode:>7} | {column(runs, 'p50'):>20} | {column(runs, 'p99'):>22} | {column(runs, 'max'):>24} | "
+              f"{runs[-1]['hot']:>5} | {runs[-1]['warm']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Reasoning history benchmark: prompt tokens per turn over a scripted 50-turn conversation.
+
+"before" replays the previous behaviour, the last 10 user/assistant pairs verbatim.
+"after" is ReasoningAgent with the token-budgeted HistoryManager (REASONING_HISTORY_TOKENS,
+REASONING_SUMMARY_TOKENS): the newest turns verbatim and a rolling summary of the rest,
+updated on a background thread. The LLM is an in-process fake that answers with
+reasoning-length replies; prompt sizes use the same local token approximation as the agent.
+
+Run from the repository root:
+    python -m benchmarks.bench_reasoning_history --turns 50 --reply-tokens 600
+"""
+import argparse
+import os
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("GROQ_WARMUP", "off")
+
+from agents.agent3_reasoning import ReasoningAgent  # noqa: E402
+from agents.tokens import count_tokens  # noqa: E402
+from benchmarks.fake_llm import FakeGroq  # noqa: E402
+
+SENTENCES = [
+    "First consider the constraints that were agreed earlier in the conversation.",
+    "The trade-off here is between latency for the user and the cost of each request.",
+    "Breaking the problem into stages makes each decision easier to check.",
+    "An alternative would be to cache the intermediate result and reuse it later.",
+    "Taken together, the evidence points towards the simpler of the two designs.",
+]
+
+
+def user_message(turn: int) -> str:
+    return f"Step {turn}: building on what we decided so far, how should we handle part {turn} of the plan?"
+
+
+def reasoning_reply(turn: int, reply_tokens: int) -> str:
+    words = []
+    i = turn
+    while count_tokens(" ".join(words)) < reply_tokens:
+        words.append(SENTENCES[i % len(SENTENCES)])
+        i += 1
+    return f"For part {turn}: " + " ".join(words)
+
+
+def prompt_tokens(messages) -> int:
+    return sum(count_tokens(message["content"]) for message in messages)
+
+
+def before(turns: int, reply_tokens: int):
+    """The previous ReasoningAgent._request(): system prompt plus up to 10 verbatim pairs."""
+    history, sizes = [], []
+    system = {"role": "system", "content": "You are an AI assistant with memory and reasoning capabilities. Use the conversation history to provide contextual and well-reasoned responses."}
+    for turn in range(turns):
+        messages = [system]
+        for interaction in history:
+            messages.extend([{"role": "user", "content": interaction["user"]},
+                             {"role": "assistant", "content": interaction["assistant"]}])
+        messages.append({"role": "user", "content": user_message(turn)})
+        sizes.append(prompt_tokens(messages))
+        history.append({"user": user_message(turn), "assistant": reasoning_reply(turn, reply_tokens)})
+        del history[:-10]
+    return sizes
+
+
+def after(turns: int, reply_tokens: int, latency: float):
+    sizes, summary_calls = [], []
+    state = {"turn": 0}
+
+    def reply(messages):
+        if messages[0]["content"].startswith("Update the summary"):
+            summary_calls.append(prompt_tokens(messages))
+            return "Agreed so far: " + " ".join(f"part {t} settled;" for t in range(state["turn"]))
+        sizes.append(prompt_tokens(messages))
+        return reasoning_reply(state["turn"], reply_tokens)
+
+    agent = ReasoningAgent()
+    agent.client = FakeGroq(latency=latency, reply=reply)
+    request_latencies = []
+    for turn in range(turns):
+        state["turn"] = turn
+        start = time.perf_counter()
+        agent.process(user_message(turn))
+        request_latencies.append(time.perf_counter() - start)
+    agent.history_manager.flush()
+    return sizes, summary_calls, request_latencies, agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--reply-tokens", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per call")
+    args = parser.parse_args()
+
+    old = before(args.turns, args.reply_tokens)
+    new, summary_calls, latencies, agent = after(args.turns, args.reply_tokens, args.latency)
+
+    print(f"{'turn':>4} | {'before':>7} | {'after':>7}")
+    for turn in range(0, args.turns, 5):
+        print(f"{turn + 1:>4} | {old[turn]:>7} | {new[turn]:>7}")
+    print(f"{args.turns:>4} | {old[-1]:>7} | {new[-1]:>7}")
+    print(f"mean | {np.mean(old):>7.0f} | {np.mean(new):>7.0f}")
+    print(f" max | {max(old):>7} | {max(new):>7}")
+    print(f"total prompt tokens: {sum(old)} -> {sum(new)} ({sum(old) / sum(new):.1f}x fewer)")
+    print(f"summary calls: {len(summary_calls)} (mean {np.mean(summary_calls or [0]):.0f} prompt tokens, "
+          f"off the request path); request p50 {np.percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"total including summary calls: {sum(old)} -> {sum(new) + sum(summary_calls)}")
+    print(f"history stats: {agent.history_manager.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Retrieval kernel micro-benchmark: per-query latency from 1k to 1M indexed rows.
+
+"baseline" is the previous hot path: vectorizer + SVD transform of the query, sklearn
+cosine_similarity against the raw reduced vectors and a full argsort. "kernel" scores
+against rows L2-normalised at index time with one matrix-vector product and takes the
+top-k with argpartition (agents.retrieval). "kernel+cache" also serves the query vector
+from the LRU, as happens for repeated queries.
+
+The vectorizer/SVD are fitted on a small synthetic corpus; indexed rows are random vectors
+of the same dimension, which is all the scoring step sees.
+
+Run from the repository root:
+    python -m benchmarks.bench_retrieval_kernel --rows 1000 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from agents.retrieval import QueryVectorCache, normalize_rows, select_top_k
+from benchmarks.bench_startup import make_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vectorizer = TfidfVectorizer(max_features=3000, stop_words='english', ngram_range=(1, 3), max_df=0.9)
+    tfidf = vectorizer.fit_transform([make_text(rng, 150) for _ in range(2000)])
+    svd = TruncatedSVD(n_components=min(100, tfidf.shape[1] - 1), random_state=42).fit(tfidf)
+    # Half the queries repeat, as with popular questions
+    distinct = [make_text(rng, 6) for _ in range(args.queries // 2)]
+    queries = distinct + distinct
+
+    def embed(texts):
+        return list(normalize_rows(svd.transform(vectorizer.transform(texts))))
+
+    print(f"{'rows':>9} | {'baseline (ms)':>13} | {'kernel (ms)':>11} | {'kernel+cache (ms)':>17}")
+    for n_rows in args.rows:
+        raw = np.random.default_rng(args.seed).standard_normal((n_rows, svd.n_components)).astype(np.float32)
+        normalized = normalize_rows(raw)
+
+        start = time.perf_counter()
+        for query in queries:
+            similarities = cosine_similarity(svd.transform(vectorizer.transform([query])), raw)[0]
+            np.argsort(similarities)[::-1][:args.top_k]
+        baseline = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        for query in queries:
+            query_vector = embed([query])[0]
+            select_top_k(normalized @ query_vector, args.top_k, threshold=0.05)
+        kernel = (time.perf_counter() - start) / len(queries)
+
+        cache = QueryVectorCache()
+        start = time.perf_counter()
+        for query in queries:
+            query_vector = cache.get_many([query], embed)[0]
+            select_top_k(normalized @ query_vector, args.top_k, threshold=0.05)
+        cached = (time.perf_counter() - start) / len(queries)
+
+        print(f"{n_rows:>9} | {baseline * 1000:>13.3f} | {kernel * 1000:>11.3f} | {cached * 1000:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Routing benchmark: local router latency and agreement with the LLM router.
+
+Run from the repository root:
+    python -m benchmarks.bench_router
+    python -m benchmarks.bench_router --train-split 0.5
+    python -m benchmarks.bench_router --record   # re-label the query set with the live LLM router
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from agents.router import LocalRouter
+
+DEFAULT_QUERIES = os.path.join(os.path.dirname(__file__), "data", "routing_queries.jsonl")
+
+
+def load_queries(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000) if samples else 0.0
+
+
+def record_llm_routes(queries, path):
+    from dotenv import load_dotenv
+    from groq import Groq
+    from agents.team_agent import TeamAgent
+
+    load_dotenv()
+    # Only the LLM routing call is needed, so skip building the sub-agents
+    team = TeamAgent.__new__(TeamAgent)
+    team.client = Groq(api_key=os.environ["GROQ_API_KEY"])
+    team.model = "qwen-qwq-32b"
+
+    latencies = []
+    for item in queries:
+        start = time.perf_counter()
+        item["llm_route"] = team._llm_route(item["query"])
+        latencies.append(time.perf_counter() - start)
+
+    with open(path, "w") as f:
+        for item in queries:
+            f.write(json.dumps(item) + "\n")
+
+    print(f"LLM router: p50={percentile_ms(latencies, 50):.1f}ms p99={percentile_ms(latencies, 99):.1f}ms")
+
+
+def evaluate(router, queries, repeats):
+    latencies = []
+    agreed = confident = confident_agreed = 0
+
+    for item in queries:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            route, confidence = router.route(item["query"])
+            latencies.append(time.perf_counter() - start)
+
+        if route == item["llm_route"]:
+            agreed += 1
+        if router.is_confident(confidence):
+            confident += 1
+            if route == item["llm_route"]:
+                confident_agreed += 1
+
+    total = len(queries)
+    return {
+        "queries": total,
+        "p50_ms": round(percentile_ms(latencies, 50), 4),
+        "p99_ms": round(percentile_ms(latencies, 99), 4),
+        "agreement": round(agreed / total, 3) if total else 0.0,
+        "local_decisions": round(confident / total, 3) if total else 0.0,
+        "agreement_when_local": round(confident_agreed / confident, 3) if confident else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--train-split", type=float, default=0.0,
+                        help="fraction of the query set used to train the classifier layer")
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    if args.record:
+        record_llm_routes(queries, args.queries)
+
+    model_file = os.path.join(tempfile.mkdtemp(), "router_model.pkl")
+    router = LocalRouter(model_file=model_file)
+    eval_set = queries
+
+    if args.train_split > 0:
+        shuffled = queries[:]
+        random.Random(args.seed).shuffle(shuffled)
+        cut = int(len(shuffled) * args.train_split)
+        router.min_training_samples = 1
+        print("Training:", router.train([q["query"] for q in shuffled[:cut]], [q["llm_route"] for q in shuffled[:cut]]))
+        eval_set = shuffled[cut:]
+
+    print(json.dumps(evaluate(router, eval_set, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Speculative routing benchmark: end-to-end latency of aprocess() with and without speculation.
+
+Every request is forced through the LLM router (ROUTER_CONFIDENCE_THRESHOLD above 1), which
+is the case speculation targets. The fake LLM server (benchmarks/fake_llm_server.py) answers
+routing calls with the recorded LLM route from benchmarks/data/routing_queries.jsonl, so the
+local router's guess is right about as often as it would be in production. With speculation
+on, a correct guess costs one model round trip instead of two; a wrong guess costs the same
+as the serial path plus a cancelled request.
+
+Run from the repository root:
+    python -m benchmarks.bench_speculation --latency 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+os.environ["ROUTER_CONFIDENCE_THRESHOLD"] = "1.01"
+os.environ["GROQ_WARMUP"] = "off"
+
+from benchmarks.bench_router import DEFAULT_QUERIES, load_queries  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run(team_agent, queries, speculative):
+    from agents.runtime import SessionState
+
+    team_agent.speculative = speculative
+    team_agent.speculation_stats = {"attempts": 0, "hits": 0, "misses": 0}
+    session = SessionState()
+    latencies = []
+    for row in queries:
+        start = time.perf_counter()
+        await team_agent.aprocess(row["query"], session=session)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies), team_agent._speculation_summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_llm_server",
+                               "--port", str(port), "--latency", str(args.latency)],
+                              stdout=subprocess.PIPE, text=True)
+    server.stdout.readline()
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{port}"
+
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+    try:
+        from agents.team_agent import TeamAgent
+        with contextlib.redirect_stdout(io.StringIO()):
+            team_agent = TeamAgent()
+            queries = load_queries(args.queries)
+
+            async def both():
+                return await run(team_agent, queries, False), await run(team_agent, queries, True)
+
+            (serial, _), (speculative, stats) = asyncio.run(both())
+
+        print(f"{'mode':>12} | {'p50 (s)':>8} | {'p95 (s)':>8}")
+        for name, latencies in (("serial", serial), ("speculative", speculative)):
+            print(f"{name:>12} | {np.percentile(latencies, 50):>8.3f} | {np.percentile(latencies, 95):>8.3f}")
+        print(f"speculation hit rate: {stats['hit_rate']:.0%} ({stats['hits']}/{stats['attempts']})")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
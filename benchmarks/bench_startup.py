@@ -0,0 +1,102 @@
+"""Startup benchmark: MemoryAgent/RAGAgent construction with and without persisted models.
+
+A knowledge base and memory store are generated in a temporary directory. "cached" loads
+the snapshot as written; "refit" deletes the persisted model arrays first, which is what
+every startup cost before fitted state was persisted.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --documents 20000 --memories 10000
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from agents.agent4_memory import MemoryAgent  # noqa: E402
+from agents.agent5_rag import RAGAgent  # noqa: E402
+
+WORDS = ("python data model learning vector search index memory cache latency throughput network "
+         "bangalore india software engineer system design database query token stream agent router "
+         "cluster compute storage snapshot compaction request response graph tree array hash").split()
+
+
+def make_text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_stores(directory, documents, memories, seed):
+    rng = random.Random(seed)
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rag_agent = RAGAgent()
+        docs = [{"title": f"Doc {i}", "content": make_text(rng, 200)} for i in range(documents)]
+        rag_agent.add_knowledge_batch(docs)
+
+        memory_agent = MemoryAgent()
+        for i in range(memories):
+            memory_agent._store_memory(f"I like {make_text(rng, 8)} #{i}", importance=0.5)
+        memory_agent._save_memory()
+
+
+def drop_models(directory):
+    for store, names in (("knowledge_store", ("vocabulary.npy",)), ("memory_store", ("doc_freq.npy",))):
+        root = os.path.join(directory, store)
+        for snapshot in os.listdir(root):
+            for name in names:
+                path = os.path.join(root, snapshot, name)
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def time_construction(source, cached, repeats):
+    timings = {"rag": [], "memory": []}
+    for _ in range(repeats):
+        directory = tempfile.mkdtemp()
+        shutil.copytree(source, directory, dirs_exist_ok=True)
+        if not cached:
+            drop_models(directory)
+        os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+        os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            RAGAgent()
+            timings["rag"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            MemoryAgent()
+            timings["memory"].append(time.perf_counter() - start)
+        shutil.rmtree(directory, ignore_errors=True)
+    return {name: float(np.median(values)) for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--memories", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    source = tempfile.mkdtemp()
+    build_stores(source, args.documents, args.memories, args.seed)
+
+    refit = time_construction(source, cached=False, repeats=args.repeats)
+    cached = time_construction(source, cached=True, repeats=args.repeats)
+    shutil.rmtree(source, ignore_errors=True)
+
+    print(f"{'agent':>8} | {'refit (s)':>10} | {'cached (s)':>10} | {'speedup':>8}")
+    for name in ("rag", "memory"):
+        print(f"{name:>8} | {refit[name]:>10.3f} | {cached[name]:>10.3f} | {refit[name] / cached[name]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Streaming benchmark: time to first token versus total latency per route.
+
+TeamAgent.process() returns only once the whole completion has been generated, so the user
+sees nothing until then. process_stream() yields the first delta as soon as the model emits
+it. The LLM is an in-process fake with a fixed first-token latency and per-token latency.
+
+Run from the repository root:
+    python -m benchmarks.bench_streaming --first-token 0.3 --token 0.02
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("RESPONSE_CACHE", "off")
+
+QUERIES = {
+    "direct": "what is the capital of France",
+    "knowledge": "explain how a hash table works",
+    "reasoning": "compare the trade-offs of two sorting algorithms step by step",
+    "memory": "what do you remember about me",
+    "rag": "search the knowledge base for python",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first-token", type=float, default=0.3)
+    parser.add_argument("--token", type=float, default=0.02)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+    from benchmarks.fake_llm import FakeGroq, install_fake_client
+    from agents.team_agent import TeamAgent
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        team_agent = TeamAgent()
+    install_fake_client(team_agent, FakeGroq(latency=args.first_token, token_latency=args.token))
+    # Skip the routing call so both modes measure the agent alone
+    team_agent._route_request = lambda text: next(r for r, q in QUERIES.items() if q == text)
+
+    print(f"{'route':>10} | {'blocking (s)':>12} | {'stream TTFT (s)':>15} | {'stream total (s)':>16}")
+    for route, query in QUERIES.items():
+        blocking, first, total = [], [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            team_agent.process(query)
+            blocking.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            ttft = None
+            for event in team_agent.process_stream(query):
+                if ttft is None and event["type"] == "delta":
+                    ttft = time.perf_counter() - start
+            total.append(time.perf_counter() - start)
+            first.append(ttft)
+        print(f"{route:>10} | {np.median(blocking):>12.3f} | {np.median(first):>15.3f} | {np.median(total):>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
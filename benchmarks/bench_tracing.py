@@ -0,0 +1,102 @@
+"""Tracing benchmark: per-stage latency breakdown and the cost of the spans themselves.
+
+Replays the query log (benchmarks/data/routing_queries.jsonl by default) through
+TeamAgent.process() with tracing off, on (histograms only) and on with the JSONL exporter,
+and prints the per-stage p50/p95/p99 that get_system_stats() reports. The LLM is an
+in-process fake with a fixed latency per call, wrapped like the real client so completions
+show up as llm.completion spans. Also times span() on its own, enabled and disabled.
+
+Run from the repository root:
+    python -m benchmarks.bench_tracing --latency 0.05 --rounds 3
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ["RESPONSE_CACHE"] = "off"
+os.environ["GROQ_WARMUP"] = "off"
+os.environ["FAST_PATH"] = "off"
+
+from agents.llm_client import instrument_client  # noqa: E402
+from agents.tracing import JsonlSpanExporter, tracer  # noqa: E402
+from benchmarks.bench_router import DEFAULT_QUERIES, load_queries  # noqa: E402
+from benchmarks.fake_llm import FakeGroq, install_fake_client  # noqa: E402
+
+
+def replay(team_agent, queries, rounds):
+    latencies = []
+    for _ in range(rounds):
+        for query in queries:
+            start = time.perf_counter()
+            team_agent.process(query)
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def span_cost(repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with tracer.span("bench.empty") as span:
+            span.set(route="direct")
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per call")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=100000, help="span() timing repeats")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+
+    from agents.team_agent import TeamAgent
+    with contextlib.redirect_stdout(io.StringIO()):
+        team_agent = TeamAgent()
+        install_fake_client(team_agent, instrument_client(FakeGroq(latency=args.latency)))
+        queries = [row["query"] for row in load_queries(args.queries)]
+
+        tracer.enabled, tracer.exporter = False, None
+        off = replay(team_agent, queries, args.rounds)
+        tracer.enabled = True
+        tracer.reset()
+        on = replay(team_agent, queries, args.rounds)
+        stages = team_agent.get_system_stats()["latency"]["stages"]
+        trace_file = os.path.join(directory, "traces.jsonl")
+        tracer.exporter = JsonlSpanExporter(trace_file)
+        exported = replay(team_agent, queries, args.rounds)
+        tracer.exporter.close()
+
+    print(f"{len(queries)} queries x {args.rounds} rounds, fake LLM latency {args.latency * 1000:.0f} ms")
+    print(f"{'':>18} | {'p50':>9} | {'p99':>9} | {'mean':>9}")
+    for name, latencies in (("tracing off", off), ("tracing on", on), ("on + jsonl export", exported)):
+        print(f"{name:>18} | {np.percentile(latencies, 50):>7.2f}ms | {np.percentile(latencies, 99):>7.2f}ms | "
+              f"{latencies.mean():>7.2f}ms")
+    with open(trace_file) as f:
+        spans = sum(1 for _ in f)
+    print(f"jsonl export: {spans} spans, {os.path.getsize(trace_file) / 1024:.0f} KB, "
+          f"{spans / (len(queries) * args.rounds):.1f} spans per query")
+
+    print(f"\nper-stage latency (tracing on):")
+    print(f"{'stage':>20} | {'count':>6} | {'p50':>9} | {'p95':>9} | {'p99':>9}")
+    for name, summary in stages.items():
+        print(f"{name:>20} | {summary['count']:>6} | {summary['p50_ms']:>7.3f}ms | {summary['p95_ms']:>7.3f}ms | "
+              f"{summary['p99_ms']:>7.3f}ms")
+
+    tracer.exporter = None
+    enabled = span_cost(args.repeats)
+    tracer.enabled = False
+    disabled = span_cost(args.repeats)
+    print(f"\nspan() + set(): {enabled:.2f} us enabled, {disabled:.3f} us disabled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""In-process stand-in for the Groq client so benchmarks run without network or API keys."""
+import time
+from types import SimpleNamespace
+
+
+def _default_reply(messages):
+    system = messages[0]["content"] if messages else ""
+    if "Respond with only one word" in system:
+        return "direct"
+    return "This is a benchmark response. " * 20
+
+
+class FakeCompletions:
+    """latency is time to first token; token_latency is added per generated word."""
+
+    def __init__(self, latency: float, reply=_default_reply, token_latency: float = 0.0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.reply = reply
+        self.calls = 0
+
+    def create(self, model=None, messages=None, stream=False, **kwargs):
+        self.calls += 1
+        content = self.reply(messages or [])
+        if stream:
+            return self._stream(content)
+        time.sleep(self.latency + self.token_latency * len(content.split()))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=0, completion_tokens=len(content.split()))
+        )
+
+    def _stream(self, content):
+        time.sleep(self.latency)
+        for token in content.split(" "):
+            time.sleep(self.token_latency)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token + " "))])
+
+
+class FakeGroq:
+    def __init__(self, latency: float = 0.05, reply=_default_reply, token_latency: float = 0.0):
+        self.chat = SimpleNamespace(completions=FakeCompletions(latency, reply, token_latency))
+
+
+AGENT_ATTRIBUTES = ("direct_agent", "knowledge_agent", "reasoning_agent", "memory_agent", "rag_agent")
+
+
+def install_fake_client(team_agent, client):
+    team_agent.client = client
+    for name in AGENT_ATTRIBUTES:
+        getattr(team_agent, name).client = client
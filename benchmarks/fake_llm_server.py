@@ -0,0 +1,126 @@
+"""Local HTTP stand-in for the Groq chat completions endpoint.
+
+Answers POST /openai/v1/chat/completions after a fixed delay, without blocking other
+connections, so client-side concurrency is the only thing a benchmark measures. Point the
+Groq clients at it with GROQ_BASE_URL=http://127.0.0.1:<port>. --handshake delays the first
+request on every new connection to stand in for a TLS handshake; GET /stats reports how many
+connections and requests the server has seen.
+
+    python -m benchmarks.fake_llm_server --port 8900 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+ROUTING_MARKER = "Respond with only one word"
+REPLY = "This is a benchmark response. " * 20
+# Routing requests get the recorded LLM route for known benchmark queries, else a keyword guess
+LABELLED_QUERIES = os.path.join(os.path.dirname(__file__), "data", "routing_queries.jsonl")
+ROUTE_KEYWORDS = (
+    ("remember", "memory"), ("my name", "memory"), ("search", "rag"), ("document", "rag"),
+    ("step by step", "reasoning"), ("why", "reasoning"), ("explain", "knowledge"), ("how does", "knowledge"),
+)
+
+
+def load_labels(path=LABELLED_QUERIES):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {row["query"]: row["llm_route"] for row in map(json.loads, filter(str.strip, f))}
+
+
+LABELS = load_labels()
+
+
+def route_for(text):
+    if text in LABELS:
+        return LABELS[text]
+    text = text.lower()
+    return next((route for keyword, route in ROUTE_KEYWORDS if keyword in text), "direct")
+
+
+def completion(request):
+    messages = request.get("messages") or []
+    system = messages[0]["content"] if messages else ""
+    if ROUTING_MARKER in system:
+        content = route_for(messages[-1]["content"])
+    else:
+        content = REPLY
+    return {
+        "id": "chatcmpl-benchmark",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "benchmark"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(content.split()), "total_tokens": len(content.split())},
+    }
+
+
+class FakeLLMServer:
+    def __init__(self, latency: float = 0.2, handshake: float = 0.0):
+        self.latency = latency
+        self.handshake = handshake
+        self.requests = 0
+        self.connections = 0
+
+    def respond(self, writer, payload: bytes, head: bool = False):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: " + str(len(payload)).encode() + b"\r\n\r\n" + (b"" if head else payload))
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        first = True
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                method, path = request_line.decode("latin-1").split()[:2]
+
+                if first:
+                    await asyncio.sleep(self.handshake)
+                    first = False
+
+                if method == "POST":
+                    self.requests += 1
+                    await asyncio.sleep(self.latency)
+                    self.respond(writer, json.dumps(completion(json.loads(body or b"{}"))).encode())
+                elif path == "/stats":
+                    self.respond(writer, json.dumps({"connections": self.connections, "requests": self.requests}).encode())
+                else:
+                    self.respond(writer, b"{}", head=method == "HEAD")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--handshake", type=float, default=0.0)
+    args = parser.parse_args()
+    print(f"Fake LLM listening on http://{args.host}:{args.port}", flush=True)
+    asyncio.run(FakeLLMServer(args.latency, args.handshake).serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Session load test: RSS and first-response latency for many simultaneous Streamlit-style sessions.
+
+"per_session" reproduces the old app behaviour (a TeamAgent per session); "shared" uses the
+process-wide runtime from agents.runtime with a SessionState per session. Each mode runs in its
+own subprocess so RSS numbers are independent. LLM calls go to an in-process fake client.
+
+Run from the repository root:
+    python -m benchmarks.load_sessions --sessions 50
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def prepare(directory, documents):
+    os.environ["KNOWLEDGE_STORE_DIR"] = os.path.join(directory, "knowledge_store")
+    os.environ["MEMORY_STORE_DIR"] = os.path.join(directory, "memory_store")
+    from agents.agent5_rag import RAGAgent
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rag_agent = RAGAgent()
+        rag_agent.add_knowledge_batch(
+            {"title": f"Doc {i}", "content": f"document {i} about python search index latency memory " * 30}
+            for i in range(documents)
+        )
+
+
+def run_child(mode, sessions, latency):
+    from benchmarks.fake_llm import FakeGroq, install_fake_client
+    from agents.runtime import SessionState, get_team_agent
+    from agents.team_agent import TeamAgent
+
+    baseline = rss_mb()
+    client = FakeGroq(latency=latency)
+    install_lock = threading.Lock()
+    installed = set()
+    barrier = threading.Barrier(sessions)
+    latencies = [0.0] * sessions
+
+    def session_worker(i):
+        barrier.wait()
+        start = time.perf_counter()
+        if mode == "shared":
+            team_agent = get_team_agent()
+        else:
+            team_agent = TeamAgent()
+        with install_lock:
+            if id(team_agent) not in installed:
+                install_fake_client(team_agent, client)
+                installed.add(id(team_agent))
+        team_agent.process("What does the knowledge base say about python search?", session=SessionState())
+        latencies[i] = time.perf_counter() - start
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=session_worker, args=(i,)) for i in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    print(json.dumps({
+        "mode": mode,
+        "rss_mb": round(rss_mb() - baseline, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 1),
+        "team_agents": len(installed),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    parser.add_argument("--child", choices=["per_session", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.sessions, args.latency)
+        return
+
+    directory = tempfile.mkdtemp()
+    prepare(directory, args.documents)
+    env = dict(os.environ,
+               KNOWLEDGE_STORE_DIR=os.path.join(directory, "knowledge_store"),
+               MEMORY_STORE_DIR=os.path.join(directory, "memory_store"),
+               ROUTER_CONFIDENCE_THRESHOLD="0.6")
+
+    print(f"{'mode':>12} | {'agents':>6} | {'RSS delta (MB)':>14} | {'first reply p50 (ms)':>20} | {'p99 (ms)':>9}")
+    for mode in ("per_session", "shared"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.load_sessions", "--child", mode,
+             "--sessions", str(args.sessions), "--latency", str(args.latency)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:>12} | {result['team_agents']:>6} | {result['rss_mb']:>14.1f} | "
+              f"{result['p50_ms']:>20.1f} | {result['p99_ms']:>9.1f}")
+
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
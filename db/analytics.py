@@ -0,0 +1,116 @@
+from typing import Any, Dict, List
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import case, func, literal_column, select
+from sqlalchemy.engine import Engine
+from .models import ChatInteraction
+
+PERCENTILES = (50, 95, 99)
+BUCKET_FORMATS = {'minute': '%Y-%m-%d %H:%M:00', 'hour': '%Y-%m-%d %H:00:00', 'day': '%Y-%m-%d'}
+
+
+def _window(since: datetime = None, until: datetime = None):
+    until = until or datetime.utcnow()
+    since = since or until - timedelta(hours=24)
+    return ChatInteraction.timestamp >= since, ChatInteraction.timestamp < until
+
+
+def agent_latency(engine: Engine, since: datetime = None, until: datetime = None) -> Dict[str, Dict[str, Any]]:
+    """Per-agent volume, error rate, latency percentiles and mean token counts in [since, until)."""
+    table = ChatInteraction
+    totals = select(
+        table.chosen_agent,
+        func.count().label('interactions'),
+        func.sum(case((table.error, 1), else_=0)).label('errors'),
+        func.avg(table.prompt_tokens).label('avg_prompt_tokens'),
+        func.avg(table.completion_tokens).label('avg_completion_tokens')
+    ).where(*_window(since, until)).group_by(table.chosen_agent)
+
+    with engine.connect() as connection:
+        stats = {}
+        for row in connection.execute(totals):
+            stats[row.chosen_agent] = {
+                "interactions": row.interactions,
+                "errors": int(row.errors or 0),
+                "error_rate": round((row.errors or 0) / row.interactions, 4),
+                "avg_prompt_tokens": round(float(row.avg_prompt_tokens), 1) if row.avg_prompt_tokens is not None else None,
+                "avg_completion_tokens": round(float(row.avg_completion_tokens), 1) if row.avg_completion_tokens is not None else None
+            }
+
+        has_latency = table.latency_ms.isnot(None)
+        if connection.dialect.name == 'postgresql':
+            # Computed in the database; only one row per agent comes back
+            query = select(table.chosen_agent, *[
+                func.percentile_cont(p / 100).within_group(table.latency_ms).label(f"p{p}") for p in PERCENTILES
+            ]).where(has_latency, *_window(since, until)).group_by(table.chosen_agent)
+            for row in connection.execute(query):
+                stats[row.chosen_agent].update({f"p{p}_ms": round(getattr(row, f"p{p}"), 2) for p in PERCENTILES})
+        else:
+            # SQLite has no percentile aggregate; the latencies are read per agent from the
+            # (chosen_agent, timestamp) index and reduced with NumPy
+            for agent in stats:
+                latencies = connection.execute(
+                    select(table.latency_ms).where(table.chosen_agent == agent, has_latency, *_window(since, until))
+                ).scalars().all()
+                if latencies:
+                    values = np.percentile(np.asarray(latencies, dtype=np.float64), PERCENTILES)
+                    stats[agent].update({f"p{p}_ms": round(float(v), 2) for p, v in zip(PERCENTILES, values)})
+    return stats
+
+
+def interaction_volume(engine: Engine, since: datetime = None, until: datetime = None,
+                       bucket: str = 'hour') -> List[Dict[str, Any]]:
+    """Interactions and errors per agent per time bucket ('minute', 'hour' or 'day')."""
+    if bucket not in BUCKET_FORMATS:
+        raise ValueError(f"bucket must be one of {sorted(BUCKET_FORMATS)}")
+    table = ChatInteraction
+    with engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Inlined (bucket is validated above) so SELECT and GROUP BY are the same expression to Postgres
+            period = func.date_trunc(literal_column(f"'{bucket}'"), table.timestamp)
+        else:
+            period = func.strftime(BUCKET_FORMATS[bucket], table.timestamp)
+        query = select(
+            period.label('bucket'),
+            table.chosen_agent,
+            func.count().label('interactions'),
+            func.sum(case((table.error, 1), else_=0)).label('errors')
+        ).where(*_window(since, until)).group_by(period, table.chosen_agent).order_by(period, table.chosen_agent)
+        return [{"bucket": str(row.bucket), "agent": row.chosen_agent,
+                 "interactions": row.interactions, "errors": int(row.errors or 0)}
+                for row in connection.execute(query)]
+
+
+def session_interactions(engine: Engine, session_id: str, since: datetime = None,
+                         limit: int = 100) -> List[Dict[str, Any]]:
+    """A session's interactions, newest first, served by the (session_id, timestamp) index."""
+    table = ChatInteraction
+    query = select(table.timestamp, table.user_input, table.chosen_agent, table.response,
+                   table.latency_ms, table.error).where(table.session_id == session_id)
+    if since is not None:
+        query = query.where(table.timestamp >= since)
+    query = query.order_by(table.timestamp.desc()).limit(limit)
+    with engine.connect() as connection:
+        return [dict(row._mapping) for row in connection.execute(query)]
+
+
+def main():
+    import argparse
+    import json
+    from .database import engine, init_db
+
+    parser = argparse.ArgumentParser(description="Per-agent latency and volume from chat_interactions")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--bucket", choices=sorted(BUCKET_FORMATS), default='hour')
+    args = parser.parse_args()
+
+    init_db()
+    since = datetime.utcnow() - timedelta(hours=args.hours)
+    print(json.dumps({
+        "agents": agent_latency(engine, since=since),
+        "volume": interaction_volume(engine, since=since, bucket=args.bucket)
+    }, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+from typing import Any, Callable, Dict, List
+from datetime import datetime
+import json
+import os
+import queue
+import threading
+import time
+from sqlalchemy import insert
+from .models import ChatInteraction
+from agents.tracing import tracer
+
+_STOP = object()
+
+# Every queued row carries every optional column, since an executemany binds one key set
+OPTIONAL_FIELDS = {"session_id": None, "route": None, "latency_ms": None,
+                   "prompt_tokens": None, "completion_tokens": None, "error": False}
+
+
+class InteractionWriter:
+    """Write-behind logger for chat interactions.
+
+    submit() only enqueues; a background thread drains the bounded queue and inserts rows
+    with one executemany per batch, flushing when batch_size rows are waiting or
+    flush_seconds have passed. When the queue is full, submit() waits up to
+    enqueue_timeout (backpressure) and then appends the row to the spill file. Batches that
+    fail to insert are spilled too, and the database is not retried for retry_seconds;
+    spilled rows are replayed after the next successful insert. close() drains the queue
+    and is registered with atexit by get_interaction_writer().
+    """
+
+    def __init__(self, session_factory: Callable, max_queue: int = None, batch_size: int = None,
+                 flush_seconds: float = None, spill_path: str = None, prepare: Callable[[], None] = None):
+        self.session_factory = session_factory
+        # Called before each insert, e.g. to create/migrate the schema once the database is reachable
+        self.prepare = prepare
+        self.batch_size = batch_size or int(os.getenv("INTERACTION_BATCH_SIZE", "200"))
+        self.flush_seconds = flush_seconds or float(os.getenv("INTERACTION_FLUSH_SECONDS", "1.0"))
+        self.spill_path = spill_path or os.getenv("INTERACTION_SPILL_FILE", "interaction_spill.jsonl")
+        self.enqueue_timeout = float(os.getenv("INTERACTION_ENQUEUE_TIMEOUT", "0.05"))
+        self.retry_seconds = float(os.getenv("INTERACTION_RETRY_SECONDS", "30"))
+        self._queue = queue.Queue(maxsize=max_queue or int(os.getenv("INTERACTION_QUEUE_SIZE", "10000")))
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._retry_at = 0.0
+        self._closed = False
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "spilled": 0, "replayed": 0,
+                      "failed_batches": 0, "last_error": None}
+        self._worker = threading.Thread(target=self._run, name="interaction-writer", daemon=True)
+        self._worker.start()
+
+    def submit(self, user_input: str, chosen_agent: str, response: str, **fields) -> bool:
+        """Queue one interaction; returns False if it had to be spilled to disk instead."""
+        # Stamped here rather than by the column default, so the row keeps its request time
+        row = dict(OPTIONAL_FIELDS, user_input=user_input, chosen_agent=chosen_agent, response=response,
+                   timestamp=datetime.utcnow(), **fields)
+        self._count("submitted")
+        if not self._closed:
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+                return True
+            except queue.Full:
+                pass
+        self._spill([row])
+        return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything submitted so far has been written or spilled."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # The worker cannot catch up in time; keep what is still queued on disk instead
+            rows = []
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, dict):
+                    rows.append(item)
+            self._spill(rows)
+            return
+        self._worker.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return dict(stats, queued=self._queue.qsize(), spill_file=self.spill_path)
+
+    def _count(self, stat: str, amount: int = 1):
+        # submit() runs on every request thread; the rest on the worker
+        with self._stats_lock:
+            self.stats[stat] += amount
+
+    def _run(self):
+        batch: List[Dict] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # Even the spill failed; the batch is lost but the worker keeps draining
+                    print(f"Error writing {len(batch)} interactions: {str(e)}")
+                    with self._stats_lock:
+                        self.stats["failed_batches"] += 1
+                        self.stats["last_error"] = str(e)
+                batch, deadline = [], None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _insert(self, rows: List[Dict]):
+        if self.prepare is not None:
+            self.prepare()
+        db = self.session_factory()
+        try:
+            with tracer.span("db.insert_batch", rows=len(rows)):
+                db.execute(insert(ChatInteraction), rows)
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write(self, rows: List[Dict]):
+        if time.monotonic() < self._retry_at:
+            self._spill(rows)
+            return
+        try:
+            self._insert(rows)
+        except Exception as e:
+            # Any error, not just the database's: a failing prepare() or a bad row must not kill the worker
+            print(f"Error saving interactions, spilling {len(rows)} to {self.spill_path}: {str(e)}")
+            with self._stats_lock:
+                self.stats["failed_batches"] += 1
+                self.stats["last_error"] = str(e)
+            self._retry_at = time.monotonic() + self.retry_seconds
+            self._spill(rows)
+            return
+        with self._stats_lock:
+            self.stats["written"] += len(rows)
+            self.stats["batches"] += 1
+        if os.path.exists(self.spill_path) or os.path.exists(self._replay_path):
+            self._replay_spill()
+
+    @property
+    def _replay_path(self) -> str:
+        return self.spill_path + ".replay"
+
+    def _spill(self, rows: List[Dict]):
+        with self._spill_lock:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(dict(row, timestamp=row["timestamp"].isoformat())) + "\n")
+        self._count("spilled", len(rows))
+
+    def _replay_spill(self):
+        """Insert spilled rows once the database is reachable again, then remove the file."""
+        replaying = self._replay_path
+        with self._spill_lock:
+            # Rows spilled while a previous replay file is pending wait for the next replay
+            if not os.path.exists(replaying):
+                os.replace(self.spill_path, replaying)
+        rows = []
+        with open(replaying, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-spill is dropped
+                    continue
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                rows.append(dict(OPTIONAL_FIELDS, **row))
+        try:
+            for start in range(0, len(rows), self.batch_size):
+                self._insert(rows[start:start + self.batch_size])
+        except Exception as e:
+            # Committed batches are dropped from the file so a later replay never duplicates them
+            print(f"Error replaying spilled interactions: {str(e)}")
+            self._retry_at = time.monotonic() + self.retry_seconds
+            with open(replaying, 'w', encoding='utf-8') as f:
+                for row in rows[start:]:
+                    f.write(json.dumps(dict(row, timestamp=row["timestamp"].isoformat())) + "\n")
+            return
+        os.remove(replaying)
+        self._count("replayed", len(rows))
+        print(f"Replayed {len(rows)} spilled interactions")
@@ -0,0 +1,74 @@
+from typing import Callable, List, Tuple
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from .models import ChatInteraction
+
+# Applied versions are recorded here; each migration runs in its own transaction
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', Integer, primary_key=True),
+    Column('name', String, nullable=False),
+    Column('applied_at', DateTime, default=datetime.utcnow)
+)
+
+
+def _add_analytics_columns(connection: Connection):
+    """Add the session/latency/token/error columns to tables created before they existed."""
+    table = ChatInteraction.__table__
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    for name in ('session_id', 'route', 'latency_ms', 'prompt_tokens', 'completion_tokens', 'error'):
+        if name in existing:
+            continue
+        column = table.c[name]
+        ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=connection.dialect)}"
+        if column.server_default is not None:
+            ddl += f" DEFAULT {column.server_default.arg.compile(dialect=connection.dialect)}"
+        if not column.nullable:
+            # Existing rows take the default, which both SQLite and Postgres require for NOT NULL
+            ddl += " NOT NULL"
+        connection.execute(text(ddl))
+
+
+def _add_interaction_indexes(connection: Connection):
+    for index in ChatInteraction.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "chat_interactions analytics columns", _add_analytics_columns),
+    (2, "chat_interactions timestamp, agent and session indexes", _add_interaction_indexes),
+]
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in order; returns the versions applied. Safe to run on every start."""
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        with engine.begin() as connection:
+            migrate(connection)
+            connection.execute(schema_migrations.insert().values(version=version, name=name,
+                                                                 applied_at=datetime.utcnow()))
+        print(f"Applied migration {version}: {name}")
+        newly_applied.append(version)
+    return newly_applied
+
+
+def main():
+    from .database import engine, init_db
+
+    init_db()
+    with engine.connect() as connection:
+        rows = connection.execute(select(schema_migrations).order_by(schema_migrations.c.version)).all()
+    for row in rows:
+        print(f"{row.version}: {row.name} ({row.applied_at})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, create_engine
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Index, false, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -13,6 +13,20 @@ class ChatInteraction(Base):
     chosen_agent = Column(String, nullable=False)
     response = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    
+    # Added by db.migrations version 1; nullable so rows written before it stay valid
+    session_id = Column(String)
+    route = Column(String)
+    latency_ms = Column(Float)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    error = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (
+        Index('ix_chat_interactions_timestamp', 'timestamp'),
+        Index('ix_chat_interactions_agent_timestamp', 'chosen_agent', 'timestamp'),
+        Index('ix_chat_interactions_session_timestamp', 'session_id', 'timestamp'),
+    )
 
     def __repr__(self):
-        return f"<ChatInteraction(id={self.id}, agent={self.chosen_agent})>" 
\ No newline at end of file
+        return f"<ChatInteraction(id={self.id}, agent={self.chosen_agent})>"
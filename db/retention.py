@@ -0,0 +1,125 @@
+"""Time-based retention for chat_interactions.
+
+Rows older than the retention window move into one archive table per calendar month
+(chat_interactions_YYYYMM), in id-range batches so no transaction holds a large lock, and
+archive months past the archive window are dropped whole. This is the portable (SQLite and
+Postgres) form of monthly range partitioning: the live table only holds the recent window
+its indexes serve, old months are cheap to drop, and on Postgres each archive table can be
+attached to a partitioned parent with ALTER TABLE ... ATTACH PARTITION if one is wanted.
+
+    python -m db.retention --days 90 --archive-months 12
+"""
+from typing import Dict, List
+from datetime import datetime, timedelta
+import os
+import re
+from sqlalchemy import Column, Index, MetaData, Table, and_, func, inspect, select
+from sqlalchemy.engine import Engine
+from .models import ChatInteraction
+
+ARCHIVE_PATTERN = re.compile(r"^chat_interactions_(\d{4})(\d{2})$")
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(moment: datetime) -> datetime:
+    return (_month_start(moment) + timedelta(days=32)).replace(day=1)
+
+
+def archive_table(month: datetime, metadata: MetaData = None) -> Table:
+    """Table definition for one archived month: the live columns, indexed on timestamp only."""
+    source = ChatInteraction.__table__
+    name = f"{source.name}_{month:%Y%m}"
+    columns = [Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+               for column in source.columns]
+    table = Table(name, metadata or MetaData(), *columns)
+    Index(f"ix_{name}_timestamp", table.c.timestamp)
+    return table
+
+
+def archive_interactions(engine: Engine, older_than_days: int = None, batch_size: int = 5000) -> Dict[str, int]:
+    """Move rows older than the retention window into their month's archive table."""
+    if older_than_days is None:
+        older_than_days = int(os.getenv("INTERACTION_RETENTION_DAYS", "90"))
+    source = ChatInteraction.__table__
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved: Dict[str, int] = {}
+
+    with engine.connect() as connection:
+        oldest = connection.execute(select(func.min(source.c.timestamp))).scalar()
+    if oldest is None or oldest >= cutoff:
+        return moved
+
+    month = _month_start(oldest)
+    while month < cutoff:
+        window = and_(source.c.timestamp >= month, source.c.timestamp < min(_next_month(month), cutoff))
+        target = archive_table(month)
+
+        while True:
+            with engine.begin() as connection:
+                ids = connection.execute(
+                    select(source.c.id).where(window).order_by(source.c.id).limit(batch_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                # Created on the month's first batch, so a gap in the history leaves no empty tables
+                if target.name not in moved:
+                    target.create(bind=connection, checkfirst=True)
+                    for index in target.indexes:
+                        index.create(bind=connection, checkfirst=True)
+                batch = and_(window, source.c.id.between(ids[0], ids[-1]))
+                connection.execute(target.insert().from_select(
+                    [column.name for column in source.columns], select(*source.columns).where(batch)))
+                connection.execute(source.delete().where(batch))
+            moved[target.name] = moved.get(target.name, 0) + len(ids)
+
+        # Skip straight to the next month that has rows rather than visiting every empty one
+        with engine.connect() as connection:
+            oldest = connection.execute(
+                select(func.min(source.c.timestamp)).where(source.c.timestamp >= _next_month(month))).scalar()
+        if oldest is None:
+            break
+        month = _month_start(oldest)
+
+    for name, count in moved.items():
+        print(f"Archived {count} interactions to {name}")
+    return moved
+
+
+def drop_old_archives(engine: Engine, keep_months: int = None) -> List[str]:
+    """Drop archive tables for months more than keep_months before the current one."""
+    if keep_months is None:
+        keep_months = int(os.getenv("INTERACTION_ARCHIVE_MONTHS", "12"))
+    oldest_kept = _month_start(datetime.utcnow())
+    for _ in range(keep_months):
+        oldest_kept = _month_start(oldest_kept - timedelta(days=1))
+
+    dropped = []
+    for name in inspect(engine).get_table_names():
+        match = ARCHIVE_PATTERN.match(name)
+        if match and datetime(int(match.group(1)), int(match.group(2)), 1) < oldest_kept:
+            Table(name, MetaData()).drop(bind=engine)
+            dropped.append(name)
+            print(f"Dropped {name}")
+    return dropped
+
+
+def main():
+    import argparse
+    from .database import engine, init_db
+
+    parser = argparse.ArgumentParser(description="Archive old chat interactions by month and drop expired archives")
+    parser.add_argument("--days", type=int, default=None, help="keep this many days in the live table")
+    parser.add_argument("--archive-months", type=int, default=None, help="keep this many months of archives")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    init_db()
+    archive_interactions(engine, older_than_days=args.days, batch_size=args.batch_size)
+    drop_old_archives(engine, keep_months=args.archive_months)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import time
+from itertools import islice
+from typing import Dict, Iterator, List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.rst'}
+
+
+def _read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping {path}:{line_number}: {e}")
+
+
+def _read_json(path: str) -> Iterator[Dict]:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    yield from data if isinstance(data, list) else [data]
+
+
+def _read_text(path: str, category: str) -> Iterator[Dict]:
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    yield {
+        'title': os.path.splitext(os.path.basename(path))[0].replace('_', ' '),
+        'content': content,
+        'category': category
+    }
+
+
+def iter_documents(source: str, default_category: str = "general") -> Iterator[Dict]:
+    """Lazily yield documents from a JSONL/JSON file or a directory tree of text/JSON files."""
+    if os.path.isfile(source):
+        paths = [(source, default_category)]
+    else:
+        paths = []
+        for root, _, files in os.walk(source):
+            category = default_category if root == source else os.path.basename(root)
+            paths.extend((os.path.join(root, name), category) for name in sorted(files))
+
+    for path, category in paths:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.jsonl':
+            documents = _read_jsonl(path)
+        elif extension == '.json':
+            documents = _read_json(path)
+        elif extension in TEXT_EXTENSIONS:
+            documents = _read_text(path, category)
+        else:
+            continue
+
+        for doc in documents:
+            doc.setdefault('category', category)
+            yield doc
+
+
+def iter_batches(documents: Iterator[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    while True:
+        batch = list(islice(documents, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def ingest(source: str, batch_size: int = 1000, category: str = "general") -> Dict:
+    from agents.agent5_rag import RAGAgent
+
+    rag_agent = RAGAgent()
+    start = time.perf_counter()
+    total = 0
+
+    for batch in iter_batches(iter_documents(source, category), batch_size):
+        total += rag_agent.add_knowledge_batch(batch, rebuild=False, save=False)
+        print(f"Read {total} documents ({time.perf_counter() - start:.1f}s)")
+
+    if total:
+        build_start = time.perf_counter()
+        rag_agent.finalize_knowledge()
+        print(f"Built index and snapshot in {time.perf_counter() - build_start:.1f}s")
+
+    stats = rag_agent.get_knowledge_stats()
+    stats['ingested'] = total
+    stats['seconds'] = round(time.perf_counter() - start, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load documents into the RAG knowledge base")
+    parser.add_argument("source", help="JSONL/JSON file or a directory of .txt/.md/.json/.jsonl files")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--category", default="general", help="category for documents that do not set one")
+    args = parser.parse_args()
+
+    stats = ingest(args.source, batch_size=args.batch_size, category=args.category)
+    print(f"Ingested {stats['ingested']} documents in {stats['seconds']}s "
+          f"({stats['total_documents']} total in knowledge base)")
+
+
+if __name__ == "__main__":
+    main()
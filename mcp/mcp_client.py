@@ -1,7 +1,9 @@
 from typing import Dict, Any
 import os
 import requests
+import httpx
 import json
+from agents.tracing import current_span, traced
 
 class MCPClient:
     def __init__(self):
@@ -12,6 +14,7 @@ class MCPClient:
             self.headers["X-API-Key"] = self.api_key
             self.headers["Content-Type"] = "application/json"
         self.registered_agents = {}
+        self._async_client = None
         
     def generate_api_key(self) -> Dict[str, Any]:
         try:
@@ -55,7 +58,9 @@ class MCPClient:
         except Exception as e:
             return {"success": False, "error": f"Error registering agent: {str(e)}"}
     
+    @traced("mcp.execute_agent", lambda result: {"success": result.get("success")})
     def execute_agent(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        current_span().set(agent=agent_name)
         if not self.api_key:
             return {"success": False, "error": "MCP_API_KEY not found in environment"}
             
@@ -91,6 +96,69 @@ class MCPClient:
         except Exception as e:
             return {"success": False, "error": f"Error executing agent: {str(e)}"}
     
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the event loop that first uses it
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(base_url=self.mcp_endpoint, timeout=10)
+        return self._async_client
+
+    async def aregister_agent(self, agent_name: str, agent_config: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.api_key:
+            return {"success": False, "error": "MCP_API_KEY not found in environment. Please run setup_mcp.py first."}
+        
+        try:
+            response = await self._get_async_client().post("/register_agent", json=agent_config, headers=self.headers)
+            if response.status_code == 200:
+                agent_id = response.json()["agent_id"]
+                self.registered_agents[agent_name] = agent_id
+                return {
+                    "success": True,
+                    "message": f"Agent {agent_name} registered successfully",
+                    "agent_id": agent_id
+                }
+            else:
+                return {"success": False, "error": f"Registration failed: {response.status_code}"}
+        except Exception as e:
+            return {"success": False, "error": f"Error registering agent: {str(e)}"}
+    
+    @traced("mcp.execute_agent", lambda result: {"success": result.get("success")})
+    async def aexecute_agent(self, agent_name: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        current_span().set(agent=agent_name)
+        if not self.api_key:
+            return {"success": False, "error": "MCP_API_KEY not found in environment"}
+            
+        if agent_name not in self.registered_agents:
+            agent_config = {
+                "name": agent_name,
+                "type": agent_name.replace("_agent", ""),
+                "description": f"Auto-registered {agent_name}"
+            }
+            reg_result = await self.aregister_agent(agent_name, agent_config)
+            if not reg_result["success"]:
+                return {"success": False, "error": f"Agent {agent_name} not registered and auto-registration failed: {reg_result.get('error')}"}
+        
+        agent_id = self.registered_agents[agent_name]
+        
+        try:
+            response = await self._get_async_client().post(f"/execute_agent/{agent_id}", json=input_data, headers=self.headers)
+            if response.status_code == 200:
+                result = response.json()
+                return {
+                    "success": True,
+                    "message": f"Agent {agent_name} executed successfully",
+                    "result": result["result"],
+                    "timestamp": result["timestamp"]
+                }
+            else:
+                return {"success": False, "error": f"Execution failed: {response.status_code}"}
+        except Exception as e:
+            return {"success": False, "error": f"Error executing agent: {str(e)}"}
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
     def list_agents(self) -> Dict[str, Any]:
         """List all registered agents."""
         try:
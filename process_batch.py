@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Set
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUERY_FIELDS = ('query', 'question', 'input', 'user_input')
+
+
+def iter_queries(path: str) -> Iterator[Dict]:
+    """Yield {"id", "query", ...} records from a JSONL file; ids default to the line number."""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping {path}:{line_number}: {e}")
+                continue
+            if isinstance(record, str):
+                record = {'query': record}
+            query = next((record[field] for field in QUERY_FIELDS if record.get(field)), None)
+            if query is None:
+                print(f"Skipping {path}:{line_number}: no query field")
+                continue
+            record['query'] = query
+            record.setdefault('id', line_number)
+            yield record
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids already written to an output file, so an interrupted run can resume."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)['id']))
+            except (json.JSONDecodeError, KeyError):
+                # A torn final line from a crash is recomputed
+                continue
+    return done
+
+
+def run_batch(source: str, output: str, batch_size: int = 500, max_concurrency: int = 8,
+              resume: bool = True) -> Dict:
+    from agents.team_agent import TeamAgent
+
+    team_agent = TeamAgent()
+    skip = completed_ids(output) if resume else set()
+    records = (record for record in iter_queries(source) if str(record['id']) not in skip)
+    totals = {"queries": 0, "errors": 0, "cached": 0, "skipped": len(skip), "routes": {}}
+    start = time.perf_counter()
+
+    with open(output, 'a' if resume else 'w', encoding='utf-8') as out:
+        while True:
+            batch: List[Dict] = list(islice(records, batch_size))
+            if not batch:
+                break
+
+            def write(index: int, result: Dict):
+                # Each answer is flushed as soon as it completes, so a crash only loses in-flight queries
+                out.write(json.dumps(dict(batch[index], **result), default=str) + "\n")
+                out.flush()
+
+            stats = team_agent.process_batch([record['query'] for record in batch],
+                                             max_concurrency=max_concurrency, on_result=write)["stats"]
+            for key in ("queries", "errors", "cached"):
+                totals[key] += stats[key]
+            for route, count in stats["routes"].items():
+                totals["routes"][route] = totals["routes"].get(route, 0) + count
+            print(f"Batch of {stats['queries']}: {stats['queries_per_second']} queries/s, "
+                  f"{stats['errors']} errors, {stats['cached']} cached, "
+                  f"retrieval {stats['retrieval_seconds']}s, routes {stats['routes']}")
+
+    totals["seconds"] = round(time.perf_counter() - start, 2)
+    totals["queries_per_second"] = round(totals["queries"] / totals["seconds"], 2) if totals["seconds"] else 0.0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of queries through the TeamAgent")
+    parser.add_argument("source", help='JSONL file with one {"id", "query"} object (or JSON string) per line')
+    parser.add_argument("output", help="JSONL file to append answers to; existing ids are skipped")
+    parser.add_argument("--batch-size", type=int, default=500, help="queries routed and retrieved together")
+    parser.add_argument("--max-concurrency", type=int, default=int(os.getenv("BATCH_MAX_CONCURRENCY", "8")),
+                        help="concurrent LLM calls")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of resuming")
+    args = parser.parse_args()
+
+    totals = run_batch(args.source, args.output, batch_size=args.batch_size,
+                       max_concurrency=args.max_concurrency, resume=not args.no_resume)
+    print(f"Answered {totals['queries']} queries in {totals['seconds']}s ({totals['queries_per_second']} queries/s), "
+          f"{totals['errors']} errors, {totals['cached']} cached, {totals['skipped']} already done")
+
+
+if __name__ == "__main__":
+    main()
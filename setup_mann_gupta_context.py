@@ -55,13 +55,7 @@ def setup_knowledge_base():
         }
     ]
     
-    for knowledge in additional_knowledge:
-        rag_agent.add_knowledge(
-            title=knowledge["title"],
-            content=knowledge["content"],
-            category=knowledge["category"],
-            tags=knowledge["tags"]
-        )
+    rag_agent.add_knowledge_batch(additional_knowledge)
     
     print(f"Added {len(additional_knowledge)} knowledge documents")
     return rag_agent.get_knowledge_stats()
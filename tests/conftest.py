@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Importable from the repository root, with no network, API key or Postgres needed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_directory = tempfile.mkdtemp()
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("GROQ_WARMUP", "off")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_directory, 'test.db')}")
+os.environ.setdefault("KNOWLEDGE_STORE_DIR", os.path.join(_directory, "knowledge_store"))
+os.environ.setdefault("MEMORY_STORE_DIR", os.path.join(_directory, "memory_store"))
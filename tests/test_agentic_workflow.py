@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from workflows import agentic_workflow
+from workflows.agentic_workflow import AgenticWorkflow
+
+DELAY = 0.2
+
+
+class FakeTeamAgent:
+    async def aprocess(self, user_input, session=None):
+        return {"success": True, "response": "answer", "agent": "direct_agent", "route": "direct"}
+
+
+class FakeMCPClient:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def aexecute_agent(self, agent_name, input_data):
+        await asyncio.sleep(DELAY)
+        if self.fail:
+            raise RuntimeError("mcp down")
+        return {"success": True, "timestamp": "now"}
+
+
+def make_workflow(mcp_client):
+    workflow = AgenticWorkflow.__new__(AgenticWorkflow)
+    workflow.team_agent = FakeTeamAgent()
+    workflow.mcp_client = mcp_client
+    workflow.mcp_enabled = True
+    return workflow
+
+
+def test_log_and_mcp_run_concurrently(monkeypatch):
+    logged = []
+
+    async def slow_log(**interaction):
+        await asyncio.sleep(DELAY)
+        logged.append(interaction)
+        return True
+
+    monkeypatch.setattr(agentic_workflow, "alog_interaction", slow_log)
+    workflow = make_workflow(FakeMCPClient())
+
+    start = time.perf_counter()
+    result = asyncio.run(workflow.aprocess_query("hello"))
+    elapsed = time.perf_counter() - start
+
+    assert result["mcp_logged"] is True
+    assert len(logged) == 1
+    # Concurrent: close to max(DELAY, DELAY), well short of the sequential DELAY + DELAY
+    assert elapsed < DELAY * 1.5
+
+
+def test_one_side_effect_failing_does_not_hide_the_other(monkeypatch):
+    logged = []
+
+    async def failing_log(**interaction):
+        await asyncio.sleep(DELAY)
+        raise RuntimeError("db down")
+
+    async def slow_log(**interaction):
+        await asyncio.sleep(DELAY)
+        logged.append(interaction)
+        return True
+
+    monkeypatch.setattr(agentic_workflow, "alog_interaction", failing_log)
+    result = asyncio.run(make_workflow(FakeMCPClient()).aprocess_query("hello"))
+    assert result["success"] is True
+    assert result["mcp_logged"] is True
+
+    monkeypatch.setattr(agentic_workflow, "alog_interaction", slow_log)
+    result = asyncio.run(make_workflow(FakeMCPClient(fail=True)).aprocess_query("hello"))
+    assert result["success"] is True
+    assert result["mcp_logged"] is False
+    assert len(logged) == 1
@@ -0,0 +1,37 @@
+import numpy as np
+
+from agents.ann_index import IVFIndex
+
+
+def make_vectors(count=2000, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_normalized_vectors_are_indexed_in_place():
+    vectors = make_vectors()
+    index = IVFIndex(n_lists=16).fit(vectors)
+    assert np.shares_memory(index.vectors, vectors)
+    assert 'vectors' not in index.state()
+
+
+def test_search_matches_exhaustive_when_probing_every_cell():
+    vectors = make_vectors()
+    query = make_vectors(count=1, seed=1)[0]
+    index = IVFIndex(n_lists=16).fit(vectors)
+
+    ids, scores = index.search(query, top_k=5, n_probe=16)
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert list(ids) == list(expected)
+    assert np.allclose(scores, vectors[expected] @ query, atol=1e-5)
+
+
+def test_state_round_trip_uses_the_shared_vectors():
+    vectors = make_vectors()
+    query = make_vectors(count=1, seed=2)[0]
+    index = IVFIndex(n_lists=16, n_probe=4).fit(vectors)
+
+    restored = IVFIndex.from_state(index.state(), vectors)
+    assert np.shares_memory(restored.vectors, vectors)
+    assert list(restored.search(query, top_k=5)[0]) == list(index.search(query, top_k=5)[0])
@@ -0,0 +1,44 @@
+import pytest
+
+from agents.fast_path import FastPath
+
+
+@pytest.fixture
+def fast_path():
+    return FastPath()
+
+
+@pytest.mark.parametrize("query, response", [
+    ("What is 15 + 27?", "15 + 27 = 42"),
+    ("what is 144 divided by 12", "144 divided by 12 = 12"),
+    ("What is 9 / 11?", "9 / 11 = 0.8181818182"),
+    ("what is -5 + 3", "-5 + 3 = -2"),
+    ("what is 10 - 4", "10 - 4 = 6"),
+    ("what is 2024 minus 2023", "2024 minus 2023 = 1"),
+    ("what is the square root of 16?", "square root of 16 = 4"),
+    ("convert 10 km to miles", "10 km = 6.213712 miles"),
+])
+def test_answers_arithmetic_and_conversions(fast_path, query, response):
+    assert fast_path.answer(query)["response"] == response
+
+
+@pytest.mark.parametrize("query", [
+    "What is 9/11?",
+    "what is 24/7?",
+    "what is 12/25/2024",
+    "what is 1-800-555-1234",
+    "What is 2023-2024?",
+    "what is 1990-05-12",
+    "what is 10-4",
+    "what is -5",
+    "what is +5",
+    "what is 42",
+    "what is (7)",
+])
+def test_leaves_dates_idioms_and_lone_numbers_to_the_agents(fast_path, query):
+    assert fast_path.answer(query) is None
+
+
+def test_rejects_unbounded_expressions(fast_path):
+    assert fast_path.answer("what is 2 ** 1000") is None
+    assert fast_path.answer("what is 1 / 0") is None
@@ -0,0 +1,61 @@
+import threading
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from db.interaction_writer import InteractionWriter
+from db.models import Base, ChatInteraction
+
+
+def make_writer(tmp_path, prepare=None):
+    engine = create_engine(f"sqlite:///{tmp_path / 'interactions.db'}")
+    Base.metadata.create_all(engine)
+    writer = InteractionWriter(sessionmaker(bind=engine), flush_seconds=0.01,
+                               spill_path=str(tmp_path / "spill.jsonl"), prepare=prepare)
+    writer.retry_seconds = 0
+    return writer, engine
+
+
+def count_rows(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(ChatInteraction)).scalar()
+
+
+def test_worker_survives_a_non_database_error(tmp_path):
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("schema check failed")
+
+    writer, engine = make_writer(tmp_path, prepare)
+    writer.submit("first", "direct_agent", "a")
+    assert writer.flush()
+    assert writer.get_stats()["spilled"] == 1
+    assert writer.get_stats()["last_error"] == "schema check failed"
+
+    # The worker is still alive: the next batch is written and the spilled row replayed
+    writer.submit("second", "direct_agent", "b")
+    assert writer.flush()
+    writer.close()
+    assert writer._worker.is_alive() is False
+    assert count_rows(engine) == 2
+    assert writer.get_stats()["replayed"] == 1
+
+
+def test_submitted_is_counted_across_threads(tmp_path):
+    writer, engine = make_writer(tmp_path)
+
+    def submit_many():
+        for index in range(200):
+            writer.submit(f"query {index}", "direct_agent", "answer")
+
+    threads = [threading.Thread(target=submit_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+    assert writer.get_stats()["submitted"] == 1600
+    assert count_rows(engine) == 1600
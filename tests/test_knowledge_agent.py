@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+
+from agents import agent2_knowledge
+from agents.agent2_knowledge import KnowledgeAgent
+
+
+class FakeIndex:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.threads = []
+
+    def search(self, query, top_k=6):
+        self.threads.append(threading.current_thread())
+        time.sleep(self.delay)
+        return [{"line": f"passage about {query}"}]
+
+    def pack(self, chunks, token_budget):
+        return chunks
+
+
+def test_sync_request_retrieves_inline_and_is_never_dropped():
+    index = FakeIndex(delay=0.05)
+    agent = KnowledgeAgent(index=index)
+    agent.retrieval_timeout = 0.01
+
+    request, result = agent._request("hash tables")
+
+    assert index.threads == [threading.current_thread()]
+    assert result["knowledge_chunks_used"] == 1
+    assert "passage about hash tables" in request["messages"][1]["content"]
+    assert agent.get_stats()["timeouts"] == 0
+
+
+def test_async_timeout_answers_without_context_and_counts_it(monkeypatch):
+    agent = KnowledgeAgent(index=FakeIndex(delay=0.2))
+    agent.retrieval_timeout = 0.01
+
+    class FakeCompletions:
+        async def create(self, **request):
+            agent.last_request = request
+            message = type("Message", (), {"content": "answer"})
+            return type("Response", (), {"choices": [type("Choice", (), {"message": message})]})
+
+    class FakeClient:
+        chat = type("Chat", (), {"completions": FakeCompletions()})
+
+    monkeypatch.setattr(agent2_knowledge, "get_async_client", lambda: FakeClient())
+    result = asyncio.run(agent.aprocess("hash tables"))
+
+    assert result["success"] is True
+    assert result["knowledge_chunks_used"] == 0
+    assert len(agent.last_request["messages"]) == 2
+    stats = agent.get_stats()
+    assert stats["timeouts"] == 1 and stats["without_context"] == 1
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+from agents import llm_client
+
+
+async def create_client():
+    return llm_client.get_async_client()
+
+
+def test_reset_closes_async_client_on_idle_loop():
+    loop = asyncio.new_event_loop()
+    client = loop.run_until_complete(create_client())
+    llm_client.reset_clients()
+    assert client._client.is_closed
+    loop.close()
+
+
+def test_reset_closes_async_client_on_loop_running_in_another_thread():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    client = asyncio.run_coroutine_threadsafe(create_client(), loop).result(timeout=5)
+    llm_client.reset_clients()
+    # The close was scheduled on that loop; let it run
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result(timeout=5)
+    assert client._client.is_closed
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def test_reset_from_a_coroutine_on_the_clients_loop():
+    async def main():
+        client = llm_client.get_async_client()
+        llm_client.reset_clients()
+        await asyncio.sleep(0.05)
+        return client
+
+    assert asyncio.run(main())._client.is_closed
@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+import pytest
+
+from agents.agent4_memory import DAY_SECONDS, MemoryAgent
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_STORE_DIR", str(tmp_path / "memory_store"))
+    monkeypatch.setenv("MEMORY_HOT_LIMIT", "3")
+    monkeypatch.setenv("MEMORY_BACKGROUND_COMPACTION", "off")
+    return MemoryAgent()
+
+
+def test_old_important_memory_survives_eviction(agent):
+    agent._store_memory("my name is Ada and I live in London", importance=1.0)
+    for index in range(4):
+        agent._store_memory(f"passing remark number {index}", importance=0.5)
+
+    # Five years old: its recency bottomed out at 0 four years ago, but importance still wins
+    agent.memory_store.column('timestamp')[0] = time.time() - 5 * 365 * DAY_SECONDS
+    agent._reset_retention_heap()
+    scores = agent._retention_scores(agent.memory_store)
+    assert scores[0] > scores[1:].max()
+
+    agent._clean_old_memories()
+
+    contents = list(agent.memory_store.column('content'))
+    assert len(contents) == 3
+    assert "my name is Ada and I live in London" in contents
+
+
+def test_eviction_drops_the_lowest_scores(agent):
+    for index, importance in enumerate([0.9, 0.1, 0.8, 0.2, 0.7]):
+        agent._store_memory(f"memory number {index}", importance=importance)
+    timestamps = agent.memory_store.column('timestamp')
+    timestamps[:] = time.time() - np.array([800, 10, 400, 700, 2]) * DAY_SECONDS
+    agent._reset_retention_heap()
+    expected = np.sort(np.argsort(-agent._retention_scores(agent.memory_store))[:3])
+    expected_contents = [f"memory number {index}" for index in expected]
+
+    agent._clean_old_memories()
+
+    assert list(agent.memory_store.column('content')) == expected_contents
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, inspect, insert, select
+
+from db.interaction_writer import OPTIONAL_FIELDS
+from db.models import Base, ChatInteraction
+from db.retention import archive_interactions
+
+
+def make_engine(tmp_path, timestamps):
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}")
+    Base.metadata.create_all(engine)
+    rows = [dict(OPTIONAL_FIELDS, user_input="q", chosen_agent="direct_agent", response="a", timestamp=moment)
+            for moment in timestamps]
+    with engine.begin() as connection:
+        connection.execute(insert(ChatInteraction), rows)
+    return engine
+
+
+def test_only_months_with_rows_get_an_archive_table(tmp_path):
+    now = datetime.utcnow()
+    # Two old rows a year apart, with nothing in the months between them, plus one recent row
+    old = datetime(now.year - 2, 3, 15)
+    older = datetime(now.year - 3, 3, 15)
+    engine = make_engine(tmp_path, [older, old, old, now - timedelta(days=1)])
+
+    moved = archive_interactions(engine, older_than_days=90, batch_size=1)
+
+    assert moved == {f"chat_interactions_{older:%Y%m}": 1, f"chat_interactions_{old:%Y%m}": 2}
+    archives = [name for name in inspect(engine).get_table_names() if name.startswith("chat_interactions_")]
+    assert sorted(archives) == sorted(moved)
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(ChatInteraction)).scalar() == 1
@@ -0,0 +1,35 @@
+import pytest
+
+from agents.router import LocalRouter
+
+
+@pytest.fixture
+def router(tmp_path):
+    return LocalRouter(model_file=str(tmp_path / "router_model.pkl"))
+
+
+@pytest.mark.parametrize("query, route", [
+    ("Remember that my phone number is 555-1234", "memory"),
+    ("My birthday is 1990-05-12, remember it", "memory"),
+    ("Search the knowledge base for Python 3.10-3.12 changes", "rag"),
+    ("Explain the history of WW2 1939-1945", "knowledge"),
+])
+def test_hyphenated_numbers_do_not_win_the_arithmetic_rule(router, query, route):
+    assert router.route(query)[0] == route
+
+
+@pytest.mark.parametrize("query", [
+    "15 + 27",
+    "what is 15 + 27?",
+    "What's 144 divided by 12",
+    "calculate 3*4",
+    "10 - 4",
+    "9 / 3 =",
+])
+def test_arithmetic_routes_direct(router, query):
+    assert router.route(query) == ("direct", 0.95)
+
+
+@pytest.mark.parametrize("query", ["555-1234", "what is 2023-2024", "12/25"])
+def test_unspaced_minus_and_slash_are_not_arithmetic(router, query):
+    assert router._match_rules(query) is None
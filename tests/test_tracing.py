@@ -0,0 +1,96 @@
+import asyncio
+
+from agents.llm_client import instrument_client
+from agents.tracing import InMemorySpanExporter, Tracer, tracer
+from benchmarks.fake_llm import FakeGroq
+
+
+def use_memory_exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    return exporter
+
+
+def test_spans_nest_and_record_errors():
+    local = Tracer(enabled=True, exporter=InMemorySpanExporter())
+    with local.span("outer") as outer:
+        with local.span("inner", route="rag"):
+            pass
+        outer.set(cache_hit=False)
+    try:
+        with local.span("failing"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+
+    inner, outer, failing = local.exporter.get_finished_spans()
+    assert inner["parent_id"] == outer["context"]["span_id"]
+    assert inner["context"]["trace_id"] == outer["context"]["trace_id"]
+    assert inner["attributes"] == {"route": "rag"}
+    assert failing["status"]["status_code"] == "ERROR"
+    assert local.get_stats()["stages"]["failing"]["errors"] == 1
+
+
+def test_disabled_tracer_records_nothing():
+    local = Tracer(enabled=False, exporter=InMemorySpanExporter())
+    with local.span("outer") as span:
+        span.set(route="direct")
+
+    @local.traced("decorated")
+    def work():
+        return 42
+
+    assert work() == 42
+    assert local.exporter.get_finished_spans() == []
+    assert local.get_stats()["stages"] == {}
+
+
+def test_stream_span_covers_the_whole_stream(monkeypatch):
+    exporter = use_memory_exporter(monkeypatch)
+    client = instrument_client(FakeGroq(latency=0.02, reply=lambda messages: "one two three four",
+                                        token_latency=0.02))
+
+    stream = client.chat.completions.create(model="m", messages=[], stream=True)
+    assert exporter.get_finished_spans() == []
+    chunks = list(stream)
+
+    span, = exporter.get_finished_spans()
+    duration_ms = (span["end_time"] - span["start_time"]) / 1e6
+    assert len(chunks) == 4
+    assert span["attributes"]["stream"] is True
+    assert 20 <= span["attributes"]["ttft_ms"] < duration_ms
+    # First-token latency plus a token latency per chunk
+    assert duration_ms >= 20 + 4 * 20
+
+
+def test_async_stream_span_ends_on_exhaustion(monkeypatch):
+    exporter = use_memory_exporter(monkeypatch)
+
+    class AsyncStream:
+        def __init__(self):
+            self.chunks = ["a", "b"]
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            if not self.chunks:
+                raise StopAsyncIteration
+            await asyncio.sleep(0.01)
+            return self.chunks.pop(0)
+
+    class Completions:
+        async def create(self, **request):
+            return AsyncStream()
+
+    class Client:
+        chat = type("Chat", (), {"completions": Completions()})()
+
+    async def consume():
+        stream = await instrument_client(Client()).chat.completions.create(model="m", stream=True)
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(consume()) == ["a", "b"]
+    span, = exporter.get_finished_spans()
+    assert "ttft_ms" in span["attributes"]
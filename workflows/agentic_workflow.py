@@ -1,6 +1,10 @@
 from typing import Dict, Any
+import asyncio
+import time
+from agents.runtime import SessionState
 from agents.team_agent import TeamAgent
-from db.database import save_interaction
+from agents.tokens import count_tokens
+from db.database import alog_interaction, log_interaction
 from mcp.mcp_client import MCPClient
 
 class AgenticWorkflow:
@@ -51,6 +55,12 @@ class AgenticWorkflow:
                     "type": "rag",
                     "description": "Handles knowledge retrieval and document-based responses",
                     "capabilities": ["document_retrieval", "vector_search", "knowledge_synthesis"]
+                },
+                {
+                    "name": "fanout_agent",
+                    "type": "fanout",
+                    "description": "Answers questions that need both personal memory and the knowledge base",
+                    "capabilities": ["concurrent_retrieval", "context_merging", "deadline_aware"]
                 }
             ]
             
@@ -63,61 +73,116 @@ class AgenticWorkflow:
                 else:
                     print(f"Failed to register {agent_config['name']}: {result.get('error', 'Unknown error')}")
             
-            print(f"MCP Integration complete - {registered_count}/5 agents registered")
+            print(f"MCP Integration complete - {registered_count}/{len(agents_to_register)} agents registered")
             return registered_count > 0
             
         except Exception as e:
             print(f"MCP setup failed: {str(e)}")
             return False
 
-    def process_query(self, user_input: str) -> Dict[str, Any]:
+    def _mcp_request(self, user_input: str, route: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        response = result["response"]
+        return {
+            "query": user_input,
+            "agent_type": route,
+            "local_response": response[:100] + "..." if len(response) > 100 else response
+        }
+
+    def _apply_mcp_result(self, result: Dict[str, Any], mcp_result: Dict[str, Any]):
+        if mcp_result["success"]:
+            result["mcp_logged"] = True
+            result["mcp_timestamp"] = mcp_result.get("timestamp")
+        else:
+            result["mcp_logged"] = False
+            result["mcp_error"] = mcp_result.get("error")
+
+    def _workflow_result(self, result: Dict[str, Any], route: str, success: bool) -> Dict[str, Any]:
+        return {
+            "success": success,
+            "response": result["response"],
+            "chosen_agent": route,
+            "mcp_enabled": self.mcp_enabled,
+            "mcp_logged": result.get("mcp_logged", False)
+        }
+
+    def _interaction(self, user_input: str, response: str, chosen_agent: str, route: str = None,
+                     start: float = None, session: SessionState = None, error: bool = False) -> Dict[str, Any]:
+        return dict(
+            user_input=user_input,
+            chosen_agent=chosen_agent,
+            response=response,
+            session_id=session.session_id if session is not None else None,
+            route=route,
+            latency_ms=round((time.perf_counter() - start) * 1000, 2) if start is not None else None,
+            # Estimated locally; the agents do not pass the API's usage counts through
+            prompt_tokens=count_tokens(user_input),
+            completion_tokens=count_tokens(response),
+            error=error
+        )
+
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "response": f"Error in workflow processing: {str(e)}",
+            "chosen_agent": "error",
+            "mcp_enabled": self.mcp_enabled,
+            "mcp_logged": False
+        }
+
+    def process_query(self, user_input: str, session: SessionState = None) -> Dict[str, Any]:
+        start = time.perf_counter()
         try:
-            result = self.team_agent.process(user_input)
+            result = self.team_agent.process(user_input, session)
+            # Agents report failure either as success=False or error=True
+            success = result.get("success", True) and not result.get("error")
+            route = result.get("route", "direct")
+            interaction = self._interaction(user_input, result["response"], result.get("agent", route), route,
+                                            start, session, error=not success)
+            log_interaction(**interaction)
             
-            if self.mcp_enabled and result["success"]:
-                agent_name = f"{result['chosen_agent']}_agent"
-                mcp_data = {
-                    "query": user_input,
-                    "agent_type": result["chosen_agent"],
-                    "local_response": result["response"][:100] + "..." if len(result["response"]) > 100 else result["response"]
-                }
-                
-                mcp_result = self.mcp_client.execute_agent(agent_name, mcp_data)
-                if mcp_result["success"]:
-                    result["mcp_logged"] = True
-                    result["mcp_timestamp"] = mcp_result.get("timestamp")
-                else:
-                    result["mcp_logged"] = False
-                    result["mcp_error"] = mcp_result.get("error")
-            
-            if result["success"]:
-                save_interaction(
-                    user_input=user_input,
-                    chosen_agent=result["chosen_agent"],
-                    response=result["response"]
-                )
+            if self.mcp_enabled and success:
+                mcp_result = self.mcp_client.execute_agent(f"{route}_agent", self._mcp_request(user_input, route, result))
+                self._apply_mcp_result(result, mcp_result)
             
-            return {
-                "success": result["success"],
-                "response": result["response"],
-                "chosen_agent": result["chosen_agent"],
-                "mcp_enabled": self.mcp_enabled,
-                "mcp_logged": result.get("mcp_logged", False)
-            }
+            return self._workflow_result(result, route, success)
             
         except Exception as e:
-            error_response = f"Error in workflow processing: {str(e)}"
+            error_result = self._error_result(e)
+            interaction = self._interaction(user_input, error_result["response"], "error", start=start,
+                                            session=session, error=True)
+            log_interaction(**interaction)
+            return error_result
+
+    async def aprocess_query(self, user_input: str, session: SessionState = None) -> Dict[str, Any]:
+        """Async process_query(): the MCP call is awaited; the DB write is queued, or awaited on the async engine."""
+        start = time.perf_counter()
+        try:
+            result = await self.team_agent.aprocess(user_input, session)
+            success = result.get("success", True) and not result.get("error")
+            route = result.get("route", "direct")
+            interaction = self._interaction(user_input, result["response"], result.get("agent", route), route,
+                                            start, session, error=not success)
             
-            save_interaction(
-                user_input=user_input,
-                chosen_agent="error",
-                response=error_response
-            )
+            # The DB write and the MCP call are independent, so they run concurrently; with
+            # return_exceptions one failing does not hide the other
+            side_effects = [alog_interaction(**interaction)]
+            if self.mcp_enabled and success:
+                side_effects.append(self.mcp_client.aexecute_agent(f"{route}_agent", self._mcp_request(user_input, route, result)))
+            outcomes = await asyncio.gather(*side_effects, return_exceptions=True)
             
-            return {
-                "success": False,
-                "response": error_response,
-                "chosen_agent": "error",
-                "mcp_enabled": self.mcp_enabled,
-                "mcp_logged": False
-            } 
\ No newline at end of file
+            if isinstance(outcomes[0], Exception):
+                print(f"Error logging interaction: {outcomes[0]}")
+            if len(outcomes) > 1:
+                mcp_result = outcomes[1]
+                if isinstance(mcp_result, Exception):
+                    mcp_result = {"success": False, "error": str(mcp_result)}
+                self._apply_mcp_result(result, mcp_result)
+            
+            return self._workflow_result(result, route, success)
+            
+        except Exception as e:
+            error_result = self._error_result(e)
+            interaction = self._interaction(user_input, error_result["response"], "error", start=start,
+                                            session=session, error=True)
+            await alog_interaction(**interaction)
+            return error_result